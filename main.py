@@ -5,21 +5,23 @@ A command-line tool for scraping and analyzing competitor websites
 """
 
 import os
-import json
 import sys
 import asyncio
-from datetime import datetime
 from pathlib import Path
 from scrapers.homepage_scraper import HomepageScraper
 from scrapers.sitemap_analyzer import SitemapAnalyzer
 from scrapers.price_stock_scraper import PriceStockScraper
 from scrapers.meta_seo_scraper import MetaSEOScraper
+from scrapers.profile_pipeline import ProfilePipeline
 from utils.prompt_executor import PromptExecutor
+from utils.company_store import CompanyStore
+from utils.crawl_journal import list_jobs
 
 class CompetitiveIntelligenceCLI:
     def __init__(self):
         self.data_dir = Path("data/companies")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = CompanyStore()
         self.current_company = None  # Track current company session
         
     def display_menu(self):
@@ -39,7 +41,9 @@ class CompetitiveIntelligenceCLI:
         print("6. Analyze SEO & meta tags")
         print("7. View company data")
         print("8. List all companies")
-        print("9. Exit")
+        print("9. Profile URL (content + pricing + SEO in one fetch)")
+        print("10. Resume crawl job")
+        print("11. Exit")
         print("="*60)
         
     def safe_input(self, prompt):
@@ -59,13 +63,13 @@ class CompetitiveIntelligenceCLI:
     def get_user_choice(self):
         """Get user menu choice"""
         while True:
-            choice = self.safe_input("\nChoose option (1-9): ")
+            choice = self.safe_input("\nChoose option (1-11): ")
             if choice is None:
                 return None
-            if choice in [str(i) for i in range(1, 10)]:
+            if choice in [str(i) for i in range(1, 12)]:
                 return int(choice)
             else:
-                print("❌ Invalid choice. Please enter a number between 1-9.")
+                print("❌ Invalid choice. Please enter a number between 1-11.")
                 # Don't continue the loop immediately, let user see the error
                 continue
     
@@ -90,27 +94,19 @@ class CompetitiveIntelligenceCLI:
     
     def select_existing_company(self):
         """Select from existing companies"""
-        company_files = list(self.data_dir.glob("*_data.json"))
+        try:
+            companies = [company['name'] for company in self.store.list_companies()]
+        except Exception as e:
+            print(f"❌ Error reading companies: {e}")
+            return None
         
-        if not company_files:
+        if not companies:
             print("📭 No companies found. Please add a company first.")
             return None
         
         print("\n📋 Available companies:")
-        companies = []
-        for i, company_file in enumerate(company_files, 1):
-            try:
-                with open(company_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                company_name = data.get('company_name', 'Unknown')
-                companies.append(company_name)
-                print(f"{i}. {company_name}")
-            except Exception as e:
-                print(f"❌ Error reading {company_file}: {e}")
-        
-        if not companies:
-            print("📭 No valid companies found.")
-            return None
+        for i, company_name in enumerate(companies, 1):
+            print(f"{i}. {company_name}")
         
         try:
             choice = self.safe_input(f"\nSelect company (1-{len(companies)}): ")
@@ -136,29 +132,14 @@ class CompetitiveIntelligenceCLI:
             print("❌ Company name cannot be empty.")
             return None
             
-        # Check if company already exists
-        company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-        if company_file.exists():
-            print(f"✅ Company '{company_name}' already exists. Setting as current company.")
-            self.current_company = company_name
-            return company_name
-            
-        # Create initial company data structure
-        company_data = {
-            "company_name": company_name,
-            "created_at": datetime.now().isoformat(),
-            "last_updated": None,
-            "homepage": None,
-            "features": {},
-            "analysis_results": {}
-        }
-        
-        # Save company data
+        # Save company data (an existing company is just selected)
         try:
-            with open(company_file, 'w', encoding='utf-8') as f:
-                json.dump(company_data, f, indent=2, ensure_ascii=False)
+            if not self.store.add_company(company_name):
+                print(f"✅ Company '{company_name}' already exists. Setting as current company.")
+                self.current_company = company_name
+                return company_name
             print(f"✅ Company '{company_name}' added successfully!")
-            print(f"📁 Data saved to: {company_file}")
+            print(f"📁 Data saved to: {self.store.db_path}")
             self.current_company = company_name
             return company_name
         except Exception as e:
@@ -170,30 +151,24 @@ class CompetitiveIntelligenceCLI:
         print("\n📋 Tracked Companies")
         print("-" * 30)
         
-        company_files = list(self.data_dir.glob("*_data.json"))
+        try:
+            companies = self.store.list_companies()
+        except Exception as e:
+            print(f"❌ Error reading companies: {e}")
+            return
         
-        if not company_files:
+        if not companies:
             print("📭 No companies found. Add a company first!")
             return
             
-        for i, company_file in enumerate(company_files, 1):
-            try:
-                with open(company_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                company_name = data.get('company_name', 'Unknown')
-                last_updated = data.get('last_updated', 'Never')
-                homepage_status = "✅" if data.get('homepage') else "❌"
-                features_count = len(data.get('features', {}))
-                
-                print(f"{i}. {company_name}")
-                print(f"   📅 Last updated: {last_updated}")
-                print(f"   🏠 Homepage: {homepage_status}")
-                print(f"   🔧 Features: {features_count}")
-                print()
-                
-            except Exception as e:
-                print(f"❌ Error reading {company_file}: {e}")
+        for i, company in enumerate(companies, 1):
+            homepage_status = "✅" if company['has_homepage'] else "❌"
+            
+            print(f"{i}. {company['name']}")
+            print(f"   📅 Last updated: {company['last_updated'] or 'Never'}")
+            print(f"   🏠 Homepage: {homepage_status}")
+            print(f"   🔧 Features: {company['feature_count']}")
+            print()
     
     def scrape_homepage(self):
         """Scrape homepage for a company"""
@@ -251,10 +226,14 @@ class CompetitiveIntelligenceCLI:
         keywords_input = self.safe_input("Enter keywords to filter URLs (comma-separated, or press Enter for all): ")
         keywords = [kw.strip() for kw in keywords_input.split(',')] if keywords_input else None
         
+        # Incremental refresh only fetches pages that are new or changed since the last run
+        incremental_input = self.safe_input("Incremental refresh, only new/changed pages? (y/n, default: y): ")
+        incremental = incremental_input.lower() != 'n' if incremental_input else True
+        
         # Run the sitemap analyzer
         try:
             analyzer = SitemapAnalyzer()
-            success = asyncio.run(analyzer.analyze_and_scrape_sitemap(company_name, sitemap_url, keywords))
+            success = asyncio.run(analyzer.analyze_and_scrape_sitemap(company_name, sitemap_url, keywords, incremental))
             
             if success:
                 print(f"\n✅ Sitemap analysis completed for {company_name}")
@@ -267,6 +246,40 @@ class CompetitiveIntelligenceCLI:
         # Always wait for user to press Enter before returning to menu
         self.safe_input("\nPress Enter to continue...")
 
+    def resume_crawl_job(self, job_id=None):
+        """Continue a sitemap crawl that was interrupted, skipping the pages it already saved"""
+        print("\n🔁 Resume Crawl Job")
+        print("-" * 30)
+        
+        if not job_id:
+            jobs = [job for job in list_jobs() if job.status != "complete"]
+            if not jobs:
+                print("📭 No unfinished crawl jobs.")
+                self.safe_input("\nPress Enter to continue...")
+                return
+            for i, job in enumerate(jobs, 1):
+                print(f"{i}. {job.summary()}")
+            selected = self.safe_input(f"\nSelect job (1-{len(jobs)}): ")
+            if not selected or not selected.isdigit() or not 1 <= int(selected) <= len(jobs):
+                print("❌ Invalid selection.")
+                return
+            job_id = jobs[int(selected) - 1].job_id
+        
+        try:
+            analyzer = SitemapAnalyzer()
+            success = asyncio.run(analyzer.resume_job(job_id))
+            
+            if success:
+                print(f"\n✅ Crawl job {job_id} completed")
+            else:
+                print(f"\n❌ Crawl job {job_id} did not finish; run resume again to continue it")
+                
+        except Exception as e:
+            print(f"❌ Error resuming crawl job: {e}")
+        
+        # Always wait for user to press Enter before returning to menu
+        self.safe_input("\nPress Enter to continue...")
+
     def run_analysis_prompt(self):
         """Run analysis prompt on company data"""
         print("\n🔍 Run Analysis Prompt")
@@ -314,14 +327,14 @@ class CompetitiveIntelligenceCLI:
                     return
             else:
                 # Single selection
-            choice = int(choice_input)
-            if 1 <= choice <= len(available_sources):
-                data_source = available_sources[choice - 1]
-            elif choice == len(available_sources) + 1:
-                data_source = 'all'
-            else:
-                print("❌ Invalid choice.")
-                return
+                choice = int(choice_input)
+                if 1 <= choice <= len(available_sources):
+                    data_source = available_sources[choice - 1]
+                elif choice == len(available_sources) + 1:
+                    data_source = 'all'
+                else:
+                    print("❌ Invalid choice.")
+                    return
         except ValueError:
             print("❌ Invalid input. Please enter numbers separated by commas.")
             return
@@ -376,15 +389,11 @@ class CompetitiveIntelligenceCLI:
         if not company_name:
             return
             
-        company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-        
-        if not company_file.exists():
-            print(f"❌ Company '{company_name}' not found.")
-            return
-            
         try:
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self.store.load_company(company_name)
+            if data is None:
+                print(f"❌ Company '{company_name}' not found.")
+                return
             
             print(f"\n📊 Company: {data.get('company_name', 'Unknown')}")
             print(f"📅 Created: {data.get('created_at', 'Unknown')}")
@@ -485,6 +494,43 @@ class CompetitiveIntelligenceCLI:
         # Always wait for user to press Enter before returning to menu
         self.safe_input("\nPress Enter to continue...")
     
+    def profile_url(self):
+        """Fetch a URL once and extract content, pricing and SEO data from it"""
+        print("\n🧬 Profile URL")
+        print("-" * 30)
+        
+        company_name = self.get_current_company()
+        if not company_name:
+            return
+            
+        url = self.safe_input("Enter page URL to profile: ")
+        if not url:
+            print("❌ URL cannot be empty.")
+            return
+            
+        # Validate URL format
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        homepage_choice = self.safe_input("Save page content as the homepage? (y/n, default: feature page): ")
+        as_homepage = bool(homepage_choice) and homepage_choice.lower() in ['y', 'yes']
+            
+        # Run the combined pipeline
+        try:
+            pipeline = ProfilePipeline()
+            success = asyncio.run(pipeline.profile_and_save(company_name, url, as_homepage))
+            
+            if success:
+                print(f"\n✅ URL profile completed for {company_name}")
+            else:
+                print(f"\n❌ URL profile failed for {company_name}")
+                
+        except Exception as e:
+            print(f"❌ Error during URL profile: {e}")
+        
+        # Always wait for user to press Enter before returning to menu
+        self.safe_input("\nPress Enter to continue...")
+    
     def run(self):
         """Main CLI loop"""
         print("🚀 Starting B2B Competitive Intelligence CLI...")
@@ -513,6 +559,10 @@ class CompetitiveIntelligenceCLI:
                 elif choice == 8:
                     self.list_companies()
                 elif choice == 9:
+                    self.profile_url()
+                elif choice == 10:
+                    self.resume_crawl_job()
+                elif choice == 11:
                     print("👋 Goodbye!")
                     self.current_company = None  # Clear session
                     break
@@ -526,4 +576,8 @@ class CompetitiveIntelligenceCLI:
 
 if __name__ == "__main__":
     cli = CompetitiveIntelligenceCLI()
-    cli.run()
\ No newline at end of file
+    # python main.py resume [job_id]: continue an interrupted sitemap crawl without the menu
+    if len(sys.argv) > 1 and sys.argv[1] == "resume":
+        cli.resume_crawl_job(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        cli.run()
\ No newline at end of file
@@ -0,0 +1,464 @@
+"""
+Single-pass content extractor: the clean_content rules applied in one walk over an lxml tree
+"""
+
+import re
+import time
+from pathlib import Path
+import requests
+from bs4 import BeautifulSoup
+from scrapers.parsed_page import ParsedPage
+
+# Never content; their tail text still belongs to the parent
+DROP_TAGS = {'script', 'style', 'noscript', 'meta', 'link'}
+NAVIGATION_TAGS = {'nav', 'footer', 'header'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+CONTENT_TAGS = HEADING_TAGS | {'p', 'div', 'span', 'li', 'td', 'th', 'article', 'section', 'main'}
+# Elements that start a new line of text in block mode; everything else is inline
+BLOCK_TAGS = (CONTENT_TAGS - {'span'}) | {
+    'body', 'header', 'footer', 'nav', 'aside', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'thead', 'tbody',
+    'tfoot', 'tr', 'caption', 'blockquote', 'pre', 'figure', 'figcaption', 'form', 'fieldset', 'address',
+    'details', 'summary', 'br', 'hr'
+}
+# Not visible page text in block mode (legacy mode never emitted these either)
+BLOCK_DROP_TAGS = DROP_TAGS | {'head', 'template'}
+CONTENT_MODES = ('blocks', 'nested')
+
+# Same substrings as the old [class*=...] / [id*=...] selectors, one regex each
+NAVIGATION_CLASS_PATTERN = re.compile(
+    r'nav|menu|sidebar|footer|header|breadcrumb|pagination|social|share|cookie|popup|modal|banner|overlay'
+)
+NAVIGATION_ID_PATTERN = re.compile(r'nav|menu|sidebar|footer|header')
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+def is_navigation(element, text, link_count):
+    """The old removal rules, decided once per element from its (already cleaned) text
+
+    text is None when it is known to be 100+ characters, where no rule can apply.
+    """
+    if text is None:
+        return False
+    tag = element.tag
+    if tag in NAVIGATION_TAGS and len(text) < 100 and link_count > len(text.split()) * 0.5:
+        return True
+    if len(text) < 30:
+        class_attr = element.get('class')
+        if class_attr and NAVIGATION_CLASS_PATTERN.search(class_attr):
+            return True
+        id_attr = element.get('id')
+        if id_attr and NAVIGATION_ID_PATTERN.search(id_attr):
+            return True
+    return False
+
+def collect_text_parts(root):
+    """Nested mode: the text of every content element in document order, as the old clean_content did
+
+    A paragraph inside three divs is emitted four times; use collect_blocks to emit it once.
+
+    Each element's text is built from its children's text as they finish, so nothing is
+    re-read from the tree. A content element reserves its output slot when it is entered;
+    if it (or an ancestor) turns out to be navigation, everything it emitted is dropped.
+    """
+    emitted = []
+    # Frame: [element, children iterator, text parts, link count, first emitted index, own slot]
+    stack = []
+
+    def enter(element):
+        slot = None
+        if element.tag in CONTENT_TAGS:
+            slot = len(emitted)
+            emitted.append(None)
+        parts = []
+        text = element.text.strip() if element.text else ''
+        if text:
+            parts.append(text)
+        stack.append([element, iter(element), parts, 0, slot if slot is not None else len(emitted), slot])
+
+    enter(root)
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is not None:
+            # Comments, processing instructions and dropped tags contribute only their tail
+            if not isinstance(child.tag, str) or child.tag in DROP_TAGS:
+                tail = child.tail.strip() if child.tail else ''
+                if tail:
+                    frame[2].append(tail)
+                continue
+            enter(child)
+            continue
+
+        stack.pop()
+        element, _, parts, link_count, first, slot = frame
+        text = ''.join(parts)
+        kept = not is_navigation(element, text, link_count)
+        if not kept:
+            del emitted[first:]
+        elif slot is not None and len(text) > 2:
+            emitted[slot] = text
+
+        if stack:
+            parent = stack[-1]
+            if kept:
+                if text:
+                    parent[2].append(text)
+                parent[3] += link_count + (1 if element.tag == 'a' else 0)
+            tail = element.tail.strip() if element.tail else ''
+            if tail:
+                parent[2].append(tail)
+
+    return [text for text in emitted if text]
+
+def collect_blocks(root):
+    """Block mode: every text node exactly once, as (heading level or 0, text) blocks in document order
+
+    Inline text accumulates in a buffer that is flushed whenever a block element starts or ends.
+    Navigation removal uses the same rules as nested mode; an element's stripped text is only
+    assembled while it is under 100 characters, since no rule looks at longer text.
+    """
+    blocks = []
+    buffer = []
+    # Frame: [element, children iterator, short text parts or None, text length, link count,
+    #         blocks before entry, buffer length at entry]
+    stack = []
+
+    def flush(level=0):
+        if buffer:
+            blocks.append((level, buffer[:]))
+            buffer.clear()
+
+    def add_text(frame, raw):
+        buffer.append(raw)
+        text = raw.strip()
+        if text:
+            frame[3] += len(text)
+            if frame[2] is not None:
+                frame[2].append(text)
+                if frame[3] >= 100:
+                    frame[2] = None
+
+    def enter(element):
+        if element.tag in BLOCK_TAGS:
+            flush()
+        frame = [element, iter(element), [], 0, 0, len(blocks), len(buffer)]
+        stack.append(frame)
+        if element.text:
+            add_text(frame, element.text)
+
+    enter(root)
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is not None:
+            if not isinstance(child.tag, str) or child.tag in BLOCK_DROP_TAGS:
+                if child.tail:
+                    add_text(frame, child.tail)
+                continue
+            enter(child)
+            continue
+
+        stack.pop()
+        element, _, parts, length, link_count, first_block, first_buffer = frame
+        text = ''.join(parts) if parts is not None else None
+        kept = not is_navigation(element, text, link_count)
+        if not kept:
+            if len(blocks) > first_block:
+                # Blocks were flushed inside it; the text before it goes back to the buffer
+                before = blocks[first_block][1][:first_buffer]
+                del blocks[first_block:]
+                buffer[:] = before
+            else:
+                del buffer[first_buffer:]
+        elif element.tag in HEADING_TAGS:
+            flush(int(element.tag[1]))
+        elif element.tag in BLOCK_TAGS:
+            flush()
+
+        if stack:
+            parent = stack[-1]
+            if kept:
+                parent[3] += length
+                if parent[2] is not None:
+                    if parts is None or parent[3] >= 100:
+                        parent[2] = None
+                    else:
+                        parent[2].extend(parts)
+                parent[4] += link_count + (1 if element.tag == 'a' else 0)
+            if element.tail:
+                add_text(parent, element.tail)
+
+    flush()
+    return [(level, ' '.join(''.join(pieces).split())) for level, pieces in blocks]
+
+def render_blocks(blocks):
+    """One line per block, headings marked with # by level"""
+    lines = []
+    for level, text in blocks:
+        if level and text:
+            lines.append(f"{'#' * level} {text}")
+        elif len(text) > 2:
+            lines.append(text)
+    return '\n'.join(lines)
+
+def join_sentences(text):
+    """Normalize whitespace and keep sentences longer than 10 characters, in one pass"""
+    sentences = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        sentence = ' '.join(sentence.split())
+        if len(sentence) > 10:
+            sentences.append(sentence)
+    return '. '.join(sentences)
+
+def extract_content(html_content, mode="blocks"):
+    """Clean HTML content to extract meaningful text while preserving ALL essential information
+
+    html_content may be raw HTML or a ParsedPage shared with other extractors. mode 'blocks'
+    emits each piece of text once with '#' heading markers; 'nested' reproduces the old
+    output, where text repeats once per enclosing content element.
+    """
+    page = ParsedPage.of(html_content)
+    if not page.html:
+        return ""
+
+    root = page.tree
+    if root is None:
+        return ""
+
+    if mode == "blocks":
+        text = render_blocks(collect_blocks(root))
+        # If no structured content found, get all text
+        return text or ' '.join(page.text.split())
+
+    text_parts = collect_text_parts(root)
+
+    # If no structured content found, get all text
+    if not text_parts:
+        text_parts = [page.text]
+
+    return join_sentences(' '.join(text_parts))
+
+# Original BeautifulSoup implementation, kept for the benchmark
+def legacy_clean_content(html_content):
+    if not html_content:
+        return ""
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    for element in soup(["script", "style", "noscript", "meta", "link"]):
+        element.decompose()
+
+    navigation_elements = soup.find_all(['nav', 'footer', 'header'])
+    for element in navigation_elements:
+        text_content = element.get_text(strip=True)
+        if len(text_content) < 100 and len(element.find_all('a')) > len(text_content.split()) * 0.5:
+            element.decompose()
+
+    navigation_selectors = [
+        '[class*="nav"]', '[class*="menu"]', '[class*="sidebar"]',
+        '[class*="footer"]', '[class*="header"]',
+        '[id*="nav"]', '[id*="menu"]', '[id*="sidebar"]',
+        '[id*="footer"]', '[id*="header"]',
+        '[class*="breadcrumb"]', '[class*="pagination"]',
+        '[class*="social"]', '[class*="share"]',
+        '[class*="cookie"]', '[class*="popup"]', '[class*="modal"]',
+        '[class*="banner"]', '[class*="overlay"]'
+    ]
+
+    for selector in navigation_selectors:
+        for element in soup.select(selector):
+            if element:
+                text_content = element.get_text(strip=True)
+                if len(text_content) < 30:
+                    element.decompose()
+
+    for element in soup.find_all():
+        if not element.get_text(strip=True) and not element.find(['img', 'svg']):
+            element.decompose()
+
+    text_parts = []
+    content_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'div', 'span', 'li', 'td', 'th', 'article', 'section', 'main'])
+
+    for element in content_elements:
+        text = element.get_text(strip=True)
+        if text and len(text) > 2:
+            if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+                text_parts.append(f"\n{text}\n")
+            else:
+                text_parts.append(text)
+
+    if not text_parts:
+        text_parts = [soup.get_text()]
+
+    text = ' '.join(text_parts)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+
+    sentences = re.split(r'[.!?]+', text)
+    cleaned_sentences = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if len(sentence) > 10:
+            cleaned_sentences.append(sentence)
+
+    text = '. '.join(cleaned_sentences)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\.\s*\.', '.', text)
+
+    return text.strip()
+
+# Words the synthetic pages are written from, including the trust-signal and availability terms the rule packs look for
+SYNTHETIC_WORDS = (
+    "teams ship faster with one platform for billing usage analytics and workflow automation across every region "
+    "enterprise security compliance soc2 iso gdpr hipaa certified scalable api integration webhook sdk self-hosted "
+    "cloud saas hybrid beta preview early access coming soon available now contact sales request demo custom pricing "
+    "dedicated support white-label production ready live service business inquiry get quote"
+).split()
+
+def synthetic_pages(count=12, seed=7, max_sections=120):
+    """name -> HTML for count marketing-style pages of growing size (deterministic for a seed)
+
+    Each page has the shapes the extractors care about: a link-heavy header and footer, short
+    cookie/menu elements, deeply nested feature sections with inline markup, pricing cards,
+    a table, an FAQ list and script/style blocks. Used when there are no saved real pages.
+    """
+    import random
+    rng = random.Random(seed)
+
+    def sentence(words=12):
+        text = ' '.join(rng.choice(SYNTHETIC_WORDS) for _ in range(words))
+        return text[0].upper() + text[1:] + rng.choice(('.', '.', '!', '?'))
+
+    def inline(words=12):
+        parts = sentence(words).split(' ')
+        cut = rng.randrange(1, len(parts))
+        return f"{' '.join(parts[:cut])} <strong>{parts[cut]}</strong> <a href='/x'>{' '.join(parts[cut + 1:])}</a>"
+
+    pages = {}
+    for index in range(count):
+        sections = max(1, max_sections * (index + 1) // count)
+        body = ["<header class='site-header'><nav><a href='/'>Home</a> <a href='/pricing'>Pricing</a> "
+                "<a href='/docs'>Docs</a> <a href='/login'>Log in</a></nav></header>",
+                "<div class='cookie-banner'>We use cookies</div><div id='menu-toggle'>Menu</div>",
+                f"<section class='hero'><h1>{sentence(6)}</h1><p>{inline(20)}</p></section>"]
+        for section in range(sections):
+            depth = rng.randint(1, 6)
+            paragraphs = ''.join(f"<p>{inline(rng.randint(8, 30))}</p>" for _ in range(rng.randint(1, 4)))
+            items = ''.join(f"<li><span>{sentence(rng.randint(4, 10))}</span></li>" for _ in range(rng.randint(0, 5)))
+            level = rng.randint(2, 4)
+            inner = f"<h{level}>{sentence(5)}</h{level}><div class='copy'>{paragraphs}<ul>{items}</ul></div>"
+            body.append("<div class='block'>" * depth + inner + "</div>" * depth)
+            if section % 10 == 0:
+                cards = ''.join(
+                    f"<div class='plan-card'><h3>Plan {plan}</h3><div class='price'>${rng.randint(5, 400)}/month</div>"
+                    f"<p>{sentence(10)}</p></div>" for plan in ('Starter', 'Team', 'Business'))
+                rows = ''.join(f"<tr><td>{sentence(3)}</td><td>{rng.randint(1, 99)} seats</td></tr>" for _ in range(4))
+                body.append(f"<section class='pricing'>{cards}<table>{rows}</table></section>")
+        faq = ''.join(f"<dt>{sentence(6)}</dt><dd>{inline(18)}</dd>" for _ in range(5))
+        body.append(f"<section class='faq'><h2>FAQ</h2><dl>{faq}</dl></section>")
+        body.append("<footer class='footer'><a href='/about'>About</a> <a href='/careers'>Careers</a> "
+                    "<a href='/privacy'>Privacy</a></footer>")
+        pages[f"synthetic_{index:02d}.html"] = (
+            f"<html><head><title>{sentence(6)}</title><style>.block{{margin:0}}</style>"
+            f"<script>window.dataLayer = [];</script></head><body>{''.join(body)}</body></html>"
+        )
+    return pages
+
+def load_pages(page_dir=None, count=12):
+    """name -> HTML from saved pages in page_dir, or synthetic pages when there are none"""
+    if page_dir is not None:
+        saved = {page.name: page.read_text(encoding='utf-8', errors='replace') for page in sorted(Path(page_dir).glob("*.html"))}
+        if saved:
+            return saved
+        print(f"⚠️ No saved pages in {page_dir}; using {count} synthetic pages")
+    return synthetic_pages(count)
+
+def save_pages(urls, page_dir):
+    """Download pages into page_dir so the benchmark can be rerun on the same HTML"""
+    page_dir.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=20)
+            response.raise_for_status()
+            name = re.sub(r'[^a-z0-9]+', '_', url.lower().split('://', 1)[-1]).strip('_')
+            (page_dir / f"{name}.html").write_text(response.text, encoding='utf-8')
+            print(f"📥 Saved {url}")
+        except Exception as e:
+            print(f"❌ Could not save {url}: {e}")
+
+def text_similarity(a, b):
+    """Share of words the two outputs have in common (multiset overlap)"""
+    words_a = a.split()
+    words_b = b.split()
+    if not words_a and not words_b:
+        return 1.0
+    counts = {}
+    for word in words_a:
+        counts[word] = counts.get(word, 0) + 1
+    common = 0
+    for word in words_b:
+        if counts.get(word):
+            counts[word] -= 1
+            common += 1
+    return 2 * common / (len(words_a) + len(words_b))
+
+# Benchmark function
+def benchmark_extraction(page_dir=None, urls=None, count=12):
+    """Time the old and new extractors and check their output is identical
+
+    Runs on saved HTML pages in page_dir (urls are downloaded there first), or on count
+    synthetic pages when there are none.
+    """
+    if urls:
+        page_dir = Path(page_dir or "data/pages")
+        save_pages(urls, page_dir)
+
+    results = {}
+    for name, html_content in load_pages(page_dir, count).items():
+        start = time.perf_counter()
+        legacy_text = legacy_clean_content(html_content)
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_text = extract_content(html_content, mode="nested")
+        new_elapsed = time.perf_counter() - start
+
+        assert new_text == legacy_text, f"{name}: single-pass output differs from legacy_clean_content"
+        similarity = text_similarity(legacy_text, new_text)
+        results[name] = {"legacy": legacy_elapsed, "single_pass": new_elapsed, "similarity": similarity}
+        print(f"📄 {name} ({len(html_content) / 1024:.0f} KB): "
+              f"{legacy_elapsed:.2f}s → {new_elapsed:.2f}s ({legacy_elapsed / new_elapsed:.1f}x), "
+              f"{similarity:.0%} same words")
+
+    legacy_total = sum(result["legacy"] for result in results.values())
+    new_total = sum(result["single_pass"] for result in results.values())
+    print(f"📈 Total: {legacy_total:.2f}s → {new_total:.2f}s ({legacy_total / new_total:.1f}x), output identical on {len(results)} pages")
+    return results
+
+# Size comparison function
+def compare_content_modes(page_dir=None, count=12):
+    """How much smaller block mode output is than the old nested output (saved pages, or synthetic ones)
+
+    Every block mode line must also be in the nested output; block mode only drops the repeats.
+    """
+    results = {}
+    for name, html_content in load_pages(page_dir, count).items():
+        nested_text = extract_content(html_content, mode="nested")
+        block_text = extract_content(html_content, mode="blocks")
+        # Nested mode glues inline text and re-punctuates sentences like the old clean_content, so compare letters only
+        nested_flat = re.sub(r'\W+', '', nested_text)
+        missing = [line for line in block_text.splitlines() if re.sub(r'\W+', '', line) not in nested_flat]
+        assert not missing, f"{name}: {len(missing)} block lines missing from nested output, e.g. {missing[0]!r}"
+        results[name] = {"nested": len(nested_text), "blocks": len(block_text)}
+        reduction = len(nested_text) / len(block_text) if block_text else 0
+        print(f"📄 {name}: {len(nested_text):,} → {len(block_text):,} characters ({reduction:.1f}x smaller)")
+
+    nested_total = sum(result["nested"] for result in results.values())
+    block_total = sum(result["blocks"] for result in results.values())
+    print(f"📉 Total: {nested_total:,} → {block_total:,} characters "
+          f"({nested_total / block_total:.1f}x smaller, ~{(nested_total - block_total) // 4:,} fewer LLM tokens)")
+    return results
+
+if __name__ == "__main__":
+    # Synthetic pages by default; benchmark_extraction(urls=[...]) downloads real pages into data/pages to compare on
+    benchmark_extraction()
+    compare_content_modes()
@@ -0,0 +1,437 @@
+"""
+Shared crawler session so all scrapers can reuse one warm browser
+"""
+
+import asyncio
+import re
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
+from crawl4ai import AsyncWebCrawler
+from scrapers.parsed_page import MAX_PAGE_BYTES
+from scrapers.render_profiles import DEFAULT_PROFILE, apply_render_profile, browser_config, run_config
+from utils.extraction_pool import ExtractionPool
+from utils.http_cache import HttpCache, content_hash
+
+# Static responses a real browser may still get past (bot protection, rate limits); same rule as pre-flight screening
+BROWSER_MAY_PASS = {401, 403, 429}
+
+# Empty mount points that client-side frameworks render into
+SPA_ROOT_PATTERN = re.compile(
+    r'<div[^>]*\bid=["\'](?:root|app|__next|__nuxt|___gatsby|svelte)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+
+class FetchResult:
+    """What a scraper gets back from the session, whichever way the page was fetched"""
+
+    def __init__(self, url, cleaned_html="", success=True, error_message=None, status_code=None, fetched_via="http", headers=None,
+                 truncated=None, original_size=None, render_profile=None, load_seconds=None):
+        self.url = url
+        self.cleaned_html = cleaned_html or ""
+        # 'bytes' when the page was cut off at the session's max_page_bytes
+        self.truncated = truncated
+        self.original_size = original_size
+        self.success = success
+        self.error_message = error_message
+        self.status_code = status_code
+        self.fetched_via = fetched_via
+        # Which render profile the browser used (None for plain HTTP) and how long the fetch took
+        self.render_profile = render_profile
+        self.load_seconds = load_seconds
+        self.headers = headers
+        # Set by the revalidation cache: 304 from the server, or same body hash as the last save
+        self.not_modified = status_code == 304
+        self.unchanged = False
+        self.content_hash = None
+
+class CrawlerSession:
+    """Keep one AsyncWebCrawler (and its headless browser) open for a whole batch of pages
+
+    fetch_mode:
+        'auto'    - try a pooled plain HTTP GET first, render in the browser only when the page needs JavaScript
+        'browser' - always render in the browser
+        'http'    - never launch the browser
+
+    extraction_workers: processes used to parse and extract fetched pages (default: one per core,
+    0 to extract inline on the event loop).
+
+    max_page_bytes: pages are downloaded (and browser output kept) only up to this size; anything
+    larger is truncated and flagged, so one huge docs or changelog page can't stall the crawl.
+
+    Each crawl names a render profile (scrapers/render_profiles.py) saying what the browser may
+    download. A lean profile whose render comes back nearly empty is retried with 'full', and
+    that domain renders with 'full' from then on.
+    """
+
+    def __init__(self, verbose=True, fetch_mode="auto", min_words=50, pool_size=10, timeout=20, cache=None, extraction_workers=None,
+                 max_page_bytes=MAX_PAGE_BYTES, mode_samples=3):
+        self.verbose = verbose
+        # Per-domain decision ('http' or 'browser'): a domain goes straight to the browser only after
+        # its first mode_samples static fetches all came back as JavaScript shells
+        self.domain_modes = {}
+        self.mode_samples = mode_samples
+        self.js_shell_counts = {}
+        # Domains where a lean profile wasn't enough
+        self.domain_profiles = {}
+        self.max_page_bytes = max_page_bytes
+        self.fetch_mode = fetch_mode
+        self.min_words = min_words
+        self.timeout = timeout
+        self.crawler = None
+        self.pages_crawled = 0
+        self.fetch_counts = {"http": 0, "browser": 0}
+        # 'http' or render profile -> [pages, seconds]
+        self.load_timings = {}
+        self._start_lock = asyncio.Lock()
+        # Whoever owns the cache saves it and reports hit/miss counts at the end of the run
+        self.owns_cache = cache is None
+        self.cache = cache if cache is not None else HttpCache()
+        # CPU-bound extraction runs here so fetching and parsing overlap across cores
+        self.extraction = ExtractionPool(extraction_workers)
+
+        # Pooled keep-alive connections for the static fast path
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers.update({
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"
+        })
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Launch the browser on first use; later calls are no-ops"""
+        async with self._start_lock:
+            if self.crawler is None:
+                self.crawler = AsyncWebCrawler(config=browser_config(self.verbose))
+                self.crawler.crawler_strategy.set_hook("on_page_context_created", apply_render_profile)
+                await self.crawler.start()
+        return self.crawler
+
+    async def close(self):
+        """Shut the browser, HTTP pool and extraction workers down at the end of the batch and report cache use"""
+        if self.crawler is not None:
+            await self.crawler.close()
+            self.crawler = None
+        self.http.close()
+        await self.extraction.close()
+        self.print_load_timings()
+        if self.owns_cache:
+            self.cache.save()
+            self.cache.print_summary()
+
+    async def crawl(self, url, consumer=None, profile=DEFAULT_PROFILE):
+        """Fetch one page using the session's fetch mode
+
+        consumer names who will extract and save the page (e.g. 'acme:pricing'). When given, the
+        request is revalidated against the cache and the result is flagged not_modified/unchanged
+        if that consumer already saved this content.
+
+        profile is the render profile used if the page has to go to the browser.
+        """
+        # Only revalidate when the consumer has saved the content we hold validators for
+        conditional = self.cache.conditional_headers(url) if consumer and self.cache.is_processed(url, consumer) else {}
+
+        domain = urlparse(url).netloc
+        if self.fetch_mode == "browser" or (self.fetch_mode == "auto" and self.domain_modes.get(domain) == "browser"):
+            return await self.render_with_revalidation(url, consumer, conditional, profile=profile)
+
+        start = time.perf_counter()
+        result, reason = await asyncio.to_thread(self.fetch_static, url, conditional)
+        result.load_seconds = time.perf_counter() - start
+        self.record_load_time("http", result.load_seconds)
+        if result.not_modified:
+            self.cache.record_not_modified()
+            return result
+        if not result.success:
+            # Errors and non-HTML say nothing about whether the site needs JavaScript, so the domain's mode is left alone;
+            # only a block or rate limit that a real browser may get past is rendered, for this page alone
+            if self.fetch_mode == "auto" and result.status_code in BROWSER_MAY_PASS:
+                print(f"🧭 {url} retrying in the browser ({reason})")
+                return await self.render_with_revalidation(url, consumer, conditional, profile=profile)
+            self.fetch_counts["http"] += 1
+            self.pages_crawled += 1
+            return result
+        if reason is None or self.fetch_mode == "http":
+            if reason is None:
+                self.domain_modes[domain] = "http"
+            self.fetch_counts["http"] += 1
+            self.pages_crawled += 1
+            return self.check_unchanged(result, consumer)
+
+        # The static HTML is a JavaScript shell; once a domain's first few pages all are, later pages skip the probe
+        print(f"🧭 {url} needs a browser ({reason})")
+        self.js_shell_counts[domain] = self.js_shell_counts.get(domain, 0) + 1
+        if domain not in self.domain_modes and self.js_shell_counts[domain] >= self.mode_samples:
+            self.domain_modes[domain] = "browser"
+        return await self.render_with_revalidation(url, consumer, conditional, result.headers, profile)
+
+    async def render_with_revalidation(self, url, consumer, conditional, known_headers=None, profile=DEFAULT_PROFILE):
+        """Ask the server whether the page changed before paying for a browser render"""
+        headers = known_headers
+        if headers is None:
+            headers = await asyncio.to_thread(self.probe_headers, url, conditional)
+            if headers is not None and headers.get("status") == 304:
+                self.cache.record_not_modified()
+                return FetchResult(url, status_code=304, fetched_via="cache")
+
+        result = await self.render(url, profile)
+        result.headers = headers
+        return self.check_unchanged(result, consumer)
+
+    async def extract(self, fn, *args):
+        """Run a module-level extraction function in the session's process pool"""
+        return await self.extraction.run(fn, *args)
+
+    def check_unchanged(self, result, consumer):
+        """Hash the fetched body, store validators and flag it if the consumer already saved it"""
+        if not result.success:
+            return result
+
+        result.content_hash = content_hash(result.cleaned_html)
+        self.cache.update(result.url, result.headers, result.content_hash)
+        if consumer and self.cache.is_processed(result.url, consumer, result.content_hash):
+            result.unchanged = True
+            self.cache.record_hit()
+        else:
+            self.cache.record_miss()
+        return result
+
+    def probe_headers(self, url, conditional):
+        """Conditional HEAD to collect validators (or a 304) for pages that must be rendered"""
+        try:
+            response = self.http.head(url, headers=conditional, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException:
+            return None
+        headers = {key: value for key, value in response.headers.items() if key in ("ETag", "Last-Modified")}
+        headers["status"] = response.status_code
+        return headers
+
+    async def render(self, url, profile=DEFAULT_PROFILE):
+        """Render one page with the shared browser, retrying with the 'full' profile if a lean render comes back empty"""
+        domain = urlparse(url).netloc
+        profile = self.domain_profiles.get(domain, profile)
+        crawler = await self.start()
+
+        start = time.perf_counter()
+        result = await crawler.arun(url=url, config=run_config(profile))
+        load_seconds = time.perf_counter() - start
+
+        if profile != "full" and result.success and html_word_count(result.cleaned_html) < self.min_words:
+            print(f"🎛️ {url} rendered almost empty with the {profile} profile, retrying with full")
+            self.domain_profiles[domain] = "full"
+            # The wasted lean attempt gets its own timing line; the page itself is counted once, under full
+            self.record_load_time(f"{profile} (retried)", load_seconds)
+            profile = "full"
+            start = time.perf_counter()
+            result = await crawler.arun(url=url, config=run_config(profile))
+            load_seconds = time.perf_counter() - start
+
+        self.record_load_time(profile, load_seconds)
+        self.fetch_counts["browser"] += 1
+        self.pages_crawled += 1
+
+        # The browser has the whole page already; keep only the budget so extraction stays bounded
+        cleaned_html = result.cleaned_html or ""
+        original_size = len(cleaned_html)
+        truncated = None
+        if self.max_page_bytes is not None and original_size > self.max_page_bytes:
+            cleaned_html = cleaned_html[:self.max_page_bytes]
+            truncated = "bytes"
+            print(f"✂️ {url}: kept {self.max_page_bytes:,} of {original_size:,} characters")
+
+        return FetchResult(
+            url,
+            cleaned_html=cleaned_html,
+            success=result.success,
+            error_message=result.error_message,
+            status_code=getattr(result, "status_code", None),
+            fetched_via="browser",
+            truncated=truncated,
+            original_size=original_size,
+            render_profile=profile,
+            load_seconds=load_seconds
+        )
+
+    def record_load_time(self, profile, seconds):
+        pages_and_seconds = self.load_timings.setdefault(profile, [0, 0.0])
+        pages_and_seconds[0] += 1
+        pages_and_seconds[1] += seconds
+
+    def print_load_timings(self):
+        """Average page-load time per render profile (and for plain HTTP fetches)"""
+        if not self.load_timings:
+            return
+        print("⏱️ Page load time by profile:")
+        for profile, (pages, seconds) in sorted(self.load_timings.items()):
+            print(f"   {profile}: {pages} pages, {seconds / pages:.2f}s avg")
+
+    def fetch_static(self, url, conditional=None):
+        """Plain (optionally conditional) HTTP GET; returns (FetchResult, reason or None)
+
+        A successful result with a reason is a JavaScript shell that needs the browser; a failed
+        result's reason is just the error.
+        """
+        try:
+            response = self.http.get(url, headers=conditional or {}, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            return FetchResult(url, success=False, error_message=str(e), fetched_via="http"), f"request failed: {e}"
+
+        with response:
+            if response.status_code == 304:
+                return FetchResult(url, status_code=304, fetched_via="cache"), None
+
+            if response.status_code >= 400:
+                message = f"HTTP {response.status_code}"
+                return FetchResult(url, success=False, error_message=message, status_code=response.status_code), message
+
+            content_type = response.headers.get("Content-Type", "")
+            if "html" not in content_type.lower():
+                message = f"not HTML ({content_type or 'no content type'})"
+                return FetchResult(url, success=False, error_message=message, status_code=response.status_code), message
+
+            try:
+                raw_html, truncated, original_size = self.read_capped(response)
+            except requests.RequestException as e:
+                return FetchResult(url, success=False, error_message=str(e), fetched_via="http"), f"request failed: {e}"
+
+        validators = {key: value for key, value in response.headers.items() if key in ("ETag", "Last-Modified")}
+        cleaned_html, reason = self.inspect_static_html(raw_html)
+        return FetchResult(url, cleaned_html=cleaned_html, status_code=response.status_code, headers=validators,
+                           truncated=truncated, original_size=original_size), reason
+
+    def read_capped(self, response):
+        """Read a streamed body up to max_page_bytes; returns (text, 'bytes' if cut off else None, full size if known)"""
+        declared_size = response.headers.get("Content-Length")
+        declared_size = int(declared_size) if declared_size and declared_size.isdigit() else None
+
+        chunks = []
+        size = 0
+        truncated = None
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if self.max_page_bytes is not None and size > self.max_page_bytes:
+                truncated = "bytes"
+                break
+        body = b"".join(chunks)
+        if truncated:
+            body = body[:self.max_page_bytes]
+            print(f"✂️ {response.url}: downloaded {self.max_page_bytes:,} of "
+                  f"{f'{declared_size:,}' if declared_size else 'more than that'} bytes")
+
+        # Same charset as response.text where the headers give one; a character cut in half at the limit is replaced
+        encoding = response.encoding or "utf-8"
+        try:
+            text = body.decode(encoding, errors="replace")
+        except LookupError:
+            text = body.decode("utf-8", errors="replace")
+        return text, truncated, declared_size if truncated else size
+
+    def inspect_static_html(self, raw_html):
+        """Drop scripts/styles like the browser's cleaned_html and decide whether the page needs JavaScript"""
+        if not raw_html or not raw_html.strip():
+            return "", "empty response"
+
+        try:
+            tree = lxml_html.document_fromstring(raw_html)
+        except (etree.ParserError, ValueError):
+            try:
+                tree = lxml_html.document_fromstring(raw_html.encode("utf-8"))
+            except (etree.ParserError, ValueError) as e:
+                return "", f"unparseable HTML: {e}"
+
+        # Keep JSON-LD for the SEO scraper, drop every other script, style and noscript block
+        for element in tree.xpath('//script[not(@type="application/ld+json")] | //style | //noscript'):
+            element.drop_tree()
+        cleaned_html = lxml_html.tostring(tree, encoding="unicode")
+
+        body = tree.find("body")
+        body_text = body.text_content() if body is not None else ""
+        word_count = len(body_text.split())
+
+        if word_count == 0:
+            return cleaned_html, "empty body"
+        if SPA_ROOT_PATTERN.search(raw_html) and word_count < self.min_words * 4:
+            return cleaned_html, "SPA root element"
+        if word_count < self.min_words:
+            return cleaned_html, f"only {word_count} words"
+        return cleaned_html, None
+
+def html_word_count(html):
+    """Words of visible text in an HTML string"""
+    if not html or not html.strip():
+        return 0
+    try:
+        return len(lxml_html.document_fromstring(html).text_content().split())
+    except (etree.ParserError, ValueError):
+        return 0
+
+async def crawl_page(url, session=None, consumer=None, profile=DEFAULT_PROFILE):
+    """Crawl a single page, reusing the given session or opening a one-off session"""
+    if session is not None:
+        return await session.crawl(url, consumer, profile)
+
+    async with CrawlerSession() as one_off_session:
+        return await one_off_session.crawl(url, consumer, profile)
+
+async def run_extraction(session, fn, *args):
+    """Extract in the session's process pool; a single page without a session is extracted inline"""
+    if session is not None:
+        return await session.extract(fn, *args)
+    return fn(*args)
+
+# Benchmark function
+async def benchmark_session_reuse(urls):
+    """Compare pages/sec for a browser per page vs one shared session"""
+    print(f"⏱️ Benchmarking {len(urls)} pages")
+
+    # Old behaviour: a fresh browser launch and teardown for every page
+    start = time.perf_counter()
+    for url in urls:
+        async with CrawlerSession(fetch_mode="browser") as one_off_session:
+            await one_off_session.crawl(url)
+    per_page_elapsed = time.perf_counter() - start
+
+    # New behaviour: one warm browser for the whole batch
+    start = time.perf_counter()
+    async with CrawlerSession(fetch_mode="browser") as session:
+        for url in urls:
+            await session.crawl(url)
+    shared_elapsed = time.perf_counter() - start
+
+    # Static fast path, escalating to the shared browser only when needed
+    start = time.perf_counter()
+    async with CrawlerSession(fetch_mode="auto") as session:
+        for url in urls:
+            await session.crawl(url)
+        auto_counts = session.fetch_counts
+    auto_elapsed = time.perf_counter() - start
+
+    per_page_rate = len(urls) / per_page_elapsed if per_page_elapsed else 0
+    shared_rate = len(urls) / shared_elapsed if shared_elapsed else 0
+    auto_rate = len(urls) / auto_elapsed if auto_elapsed else 0
+    print(f"🐢 Browser per page: {per_page_rate:.2f} pages/sec ({per_page_elapsed:.1f}s)")
+    print(f"🚀 Shared session:   {shared_rate:.2f} pages/sec ({shared_elapsed:.1f}s)")
+    print(f"⚡ HTTP fast path:   {auto_rate:.2f} pages/sec ({auto_elapsed:.1f}s, {auto_counts['http']} static / {auto_counts['browser']} rendered)")
+    if per_page_rate:
+        print(f"📈 Speedup: {shared_rate / per_page_rate:.1f}x shared, {auto_rate / per_page_rate:.1f}x fast path")
+    return {"per_page": per_page_rate, "shared": shared_rate, "auto": auto_rate}
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_session_reuse([
+        "https://exa.ai/",
+        "https://exa.ai/pricing",
+        "https://exa.ai/about",
+        "https://exa.ai/blog",
+        "https://exa.ai/careers"
+    ]))
@@ -4,25 +4,37 @@ Like looking at the title, description, and other hidden info
 """
 
 import asyncio
-import json
-import re
 from datetime import datetime
-from pathlib import Path
-from urllib.parse import urljoin, urlparse
-from crawl4ai import AsyncWebCrawler
-from bs4 import BeautifulSoup
-import requests
+from scrapers.crawler_session import CrawlerSession, crawl_page, run_extraction
+from scrapers.parsed_page import ParsedPage
+from utils.rule_packs import page_matcher, rule_terms
+from utils.company_store import CompanyStore
+from utils.http_cache import consumer_key
+
+def extract_seo_page(html_content, url):
+    """Process-pool task: (meta tags, B2B SEO analysis) for one page"""
+    scraper = MetaSEOScraper()
+    page = ParsedPage(html_content, url)
+    meta_data = scraper.extract_meta_tags(page, url)
+    return meta_data, scraper.calculate_b2b_seo_score(meta_data, page, url)
 
 class MetaSEOScraper:
-    def __init__(self):
-        self.data_dir = Path("data/companies")
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        """Company store, opened on the first save (extract_seo_page instances never open it)"""
+        if self._store is None:
+            self._store = CompanyStore()
+        return self._store
         
     def extract_meta_tags(self, html_content, url):
-        """Find all the hidden info that search engines look at"""
-        if not html_content:
+        """Find all the hidden info that search engines look at (html_content may be raw HTML or a shared ParsedPage)"""
+        page = ParsedPage.of(html_content, url)
+        if not page.html:
             return {}
             
-        soup = BeautifulSoup(html_content, 'html.parser')
         meta_data = {
             'title': '',
             'description': '',
@@ -38,13 +50,10 @@ class MetaSEOScraper:
         }
         
         # Get the page title
-        title_tag = soup.find('title')
-        if title_tag:
-            meta_data['title'] = title_tag.get_text(strip=True)
+        meta_data['title'] = page.title
         
         # Look for all the meta tags
-        meta_tags = soup.find_all('meta')
-        for meta in meta_tags:
+        for meta in page.meta_tags:
             name = meta.get('name', '').lower()
             property_attr = meta.get('property', '').lower()
             content = meta.get('content', '')
@@ -74,23 +83,19 @@ class MetaSEOScraper:
                 meta_data['other_meta'][name] = content
         
         # Find the main URL for this page
-        canonical_link = soup.find('link', rel='canonical')
-        if canonical_link and canonical_link.get('href'):
-            meta_data['canonical'] = canonical_link.get('href')
+        if page.canonical:
+            meta_data['canonical'] = page.canonical
         
         # Look for structured data
-        schema_scripts = soup.find_all('script', type='application/ld+json')
-        for script in schema_scripts:
-            try:
-                schema_data = json.loads(script.string)
-                meta_data['schema_markup'].append(schema_data)
-            except (json.JSONDecodeError, TypeError):
-                continue
+        meta_data['schema_markup'].extend(page.json_ld)
         
         return meta_data
     
     def calculate_b2b_seo_score(self, meta_data, html_content, url):
-        """Give the website a B2B-focused SEO score from 0-100"""
+        """Give the website a B2B-focused SEO score from 0-100 (html_content may be raw HTML or a shared ParsedPage)"""
+        page = ParsedPage.of(html_content, url)
+        # Keyword lists live in rules/seo.json
+        matcher = page_matcher()
         score = 0
         max_score = 100
         seo_analysis = {
@@ -108,9 +113,7 @@ class MetaSEOScraper:
             seo_analysis['factors']['title_length'] = len(title)
             
             # Check for B2B keywords in title
-            b2b_keywords = ['enterprise', 'business', 'professional', 'solution', 'platform', 'api', 'integration']
-            title_lower = title.lower()
-            b2b_keyword_count = sum(1 for keyword in b2b_keywords if keyword in title_lower)
+            b2b_keyword_count = len(rule_terms(matcher.scan(title), 'seo.title_keywords'))
             seo_analysis['b2b_indicators']['b2b_keywords_in_title'] = b2b_keyword_count
             
             if b2b_keyword_count > 0:
@@ -136,9 +139,7 @@ class MetaSEOScraper:
             seo_analysis['factors']['description_length'] = len(description)
             
             # Check for B2B value propositions in description
-            b2b_value_props = ['enterprise', 'scalable', 'secure', 'integration', 'api', 'automation', 'efficiency']
-            desc_lower = description.lower()
-            b2b_value_count = sum(1 for prop in b2b_value_props if prop in desc_lower)
+            b2b_value_count = len(rule_terms(matcher.scan(description), 'seo.description_value_props'))
             seo_analysis['b2b_indicators']['b2b_value_props_in_description'] = b2b_value_count
             
             if b2b_value_count > 0:
@@ -156,10 +157,9 @@ class MetaSEOScraper:
             seo_analysis['recommendations'].append("Missing meta description")
         
         # Check B2B content structure (15 points)
-        soup = BeautifulSoup(html_content, 'html.parser')
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        headings = page.headings
         
-        h1_count = len(soup.find_all('h1'))
+        h1_count = sum(1 for level, _ in headings if level == 1)
         if h1_count == 1:
             score += 10
             seo_analysis['factors']['single_h1'] = True
@@ -169,9 +169,8 @@ class MetaSEOScraper:
             seo_analysis['recommendations'].append(f"Multiple H1 tags found ({h1_count})")
         
         # Check for B2B content sections
-        b2b_sections = ['features', 'pricing', 'enterprise', 'api', 'integration', 'security', 'compliance']
-        heading_text = ' '.join([h.get_text().lower() for h in headings])
-        b2b_section_count = sum(1 for section in b2b_sections if section in heading_text)
+        heading_text = ' '.join([text for _, text in headings])
+        b2b_section_count = len(rule_terms(matcher.scan(heading_text), 'seo.heading_sections'))
         seo_analysis['b2b_indicators']['b2b_sections_found'] = b2b_section_count
         
         if b2b_section_count >= 3:
@@ -184,9 +183,7 @@ class MetaSEOScraper:
         seo_analysis['factors']['h1_count'] = h1_count
         
         # Check for B2B trust signals (10 points)
-        trust_signals = ['security', 'compliance', 'soc2', 'iso', 'gdpr', 'hipaa', 'enterprise', 'certified']
-        page_text = soup.get_text().lower()
-        trust_signal_count = sum(1 for signal in trust_signals if signal in page_text)
+        trust_signal_count = len(rule_terms(page.keyword_matches, 'seo.trust_signals'))
         seo_analysis['b2b_indicators']['trust_signals_found'] = trust_signal_count
         
         if trust_signal_count >= 2:
@@ -198,19 +195,8 @@ class MetaSEOScraper:
         seo_analysis['factors']['trust_signals_count'] = trust_signal_count
         
         # Check if they link to other pages on their site (10 points)
-        internal_links = []
-        external_links = []
-        
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            if href:
-                if href.startswith('http'):
-                    if urlparse(href).netloc == urlparse(url).netloc:
-                        internal_links.append(href)
-                    else:
-                        external_links.append(href)
-                elif href.startswith('/') or not href.startswith('#'):
-                    internal_links.append(urljoin(url, href))
+        internal_links = page.links['internal']
+        external_links = page.links['external']
         
         seo_analysis['factors']['internal_links'] = len(internal_links)
         seo_analysis['factors']['external_links'] = len(external_links)
@@ -264,7 +250,7 @@ class MetaSEOScraper:
         
         # Check if the page is too big (5 points)
         # This is a basic check - in production, you'd use actual page speed APIs
-        content_length = len(html_content)
+        content_length = page.original_size
         if content_length < 500000:  # Less than 500KB
             score += 5
             seo_analysis['factors']['reasonable_page_size'] = True
@@ -272,6 +258,8 @@ class MetaSEOScraper:
             seo_analysis['recommendations'].append("Page size is large, consider optimization")
         
         seo_analysis['factors']['page_size_bytes'] = content_length
+        # Huge pages are only analysed up to the parse budget
+        seo_analysis['factors']['truncated'] = page.truncated
         
         # Check if it works on phones (5 points)
         viewport = meta_data.get('viewport', '')
@@ -300,71 +288,52 @@ class MetaSEOScraper:
         else:
             return 'F'
     
-    async def scrape_seo_data(self, company_name, url):
+    async def scrape_seo_data(self, company_name, url, session=None):
         """Go to a webpage and check how good it is for search engines"""
         try:
             print(f"🔍 Scraping SEO data from: {url}")
             
-            async with AsyncWebCrawler(verbose=True) as crawler:
-                result = await crawler.arun(
-                    url=url,
-                    word_count_threshold=10,
-                    extraction_strategy="LLMExtractionStrategy",
-                    chunking_strategy="RegexChunking",
-                    bypass_cache=True
-                )
-                
-                if not result.success:
-                    print(f"❌ Failed to scrape {url}: {result.error_message}")
-                    return None
-                
-                print(f"✅ Successfully scraped SEO data")
-                
-                # Get all the meta info and give it a B2B-focused score
-                meta_data = self.extract_meta_tags(result.cleaned_html, url)
-                seo_analysis = self.calculate_b2b_seo_score(meta_data, result.cleaned_html, url)
-                
-                # Put everything together
-                page_data = {
-                    "url": url,
-                    "scraped_at": datetime.now().isoformat(),
-                    "meta_tags": meta_data,
-                    "seo_analysis": seo_analysis,
-                    "raw_content_length": len(result.cleaned_html)
-                }
-                
-                return page_data
+            result = await crawl_page(url, session, consumer_key(company_name, 'seo'), 'seo')
+            
+            if not result.success:
+                print(f"❌ Failed to scrape {url}: {result.error_message}")
+                return None
+            
+            # Nothing changed since the last save, so skip extraction entirely
+            if result.not_modified or result.unchanged:
+                print(f"♻️ Unchanged since last scrape: {url}")
+                return {"url": url, "unchanged": True}
+            
+            print(f"✅ Successfully scraped SEO data")
+            
+            # Get all the meta info and give it a B2B-focused score
+            meta_data, seo_analysis = await run_extraction(session, extract_seo_page, result.cleaned_html, url)
+            
+            # Put everything together
+            page_data = {
+                "url": url,
+                "scraped_at": datetime.now().isoformat(),
+                "meta_tags": meta_data,
+                "seo_analysis": seo_analysis,
+                "raw_content_length": len(result.cleaned_html),
+                "content_hash": result.content_hash,
+                "truncated": result.truncated or seo_analysis.get('factors', {}).get('truncated')
+            }
+            
+            return page_data
                 
         except Exception as e:
             print(f"❌ Error scraping SEO data {url}: {e}")
             return None
     
     def save_seo_data(self, company_name, seo_data):
-        """Save the SEO info to a file"""
+        """Save the SEO info to the company store"""
         try:
-            company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-            
-            if not company_file.exists():
-                print(f"❌ Company file not found: {company_file}")
+            # Each save adds a snapshot, so earlier SEO states stay queryable
+            if not self.store.save_seo(company_name, seo_data):
                 return False
-                
-            # Get the existing data
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Make sure we have a place to put SEO data
-            if 'seo_data' not in data:
-                data['seo_data'] = {}
-            
-            # Add the new SEO data
-            data['seo_data'].update(seo_data)
-            data['last_updated'] = datetime.now().isoformat()
             
-            # Save it back to the file
-            with open(company_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 SEO data saved to: {company_file}")
+            print(f"💾 SEO data saved to: {self.store.db_path}")
             return True
             
         except Exception as e:
@@ -377,19 +346,28 @@ class MetaSEOScraper:
         print(f"🌐 URL: {url}")
         print("-" * 50)
         
-        # Go check the SEO
-        page_data = await self.scrape_seo_data(company_name, url)
+        # One page isn't worth starting extraction worker processes for
+        async with CrawlerSession(extraction_workers=0) as session:
+            # Go check the SEO
+            page_data = await self.scrape_seo_data(company_name, url, session)
         
-        if not page_data:
-            print("❌ Scraping failed. No data to save.")
-            return False
+            if not page_data:
+                print("❌ Scraping failed. No data to save.")
+                return False
+            
+            if page_data.get("unchanged"):
+                print(f"✅ Stored SEO data for {company_name} is already up to date")
+                return True
+        
+            # Make a name for this page
+            page_id = self.create_page_id(url)
         
-        # Make a name for this page
-        page_id = self.create_page_id(url)
+            # Save everything
+            seo_data = {page_id: page_data}
+            success = self.save_seo_data(company_name, seo_data)
         
-        # Save everything
-        seo_data = {page_id: page_data}
-        success = self.save_seo_data(company_name, seo_data)
+            if success:
+                session.cache.mark_processed(url, consumer_key(company_name, 'seo'), page_data["content_hash"])
         
         if success:
             seo_score = page_data['seo_analysis']['score']
@@ -0,0 +1,311 @@
+"""
+Parse a page once and share the tree (and views derived from it) between all extractors
+"""
+
+import json
+from functools import cached_property
+from urllib.parse import urljoin, urlparse
+from lxml import etree, html as lxml_html
+from utils.rule_packs import page_matcher
+
+# Text inside these never counts as page text
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+# Parse budgets: past either one the rest of the page is dropped and the page is marked truncated.
+# Sizes are measured in characters of the decoded HTML.
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+MAX_PAGE_NODES = 100_000
+PARSE_CHUNK_SIZE = 64 * 1024
+
+def element_text(element, strip=False):
+    """Text of one element, like get_text() / get_text(strip=True) (comments excluded)"""
+    texts = element.xpath('.//text()')
+    if strip:
+        return ''.join(text.strip() for text in texts)
+    return ''.join(texts)
+
+class ParsedPage:
+    """One lxml parse of a page plus lazily computed, memoized views of it
+
+    Extractors take either raw HTML or a ParsedPage (see ParsedPage.of), so a page handed to
+    several extractors is parsed exactly once. parse_count counts parses for this page;
+    ParsedPage.total_parses counts them for the whole process.
+
+    The page is fed to the parser in chunks and parsing stops at max_bytes of HTML or max_nodes
+    elements (None for no limit); truncated is then 'bytes' or 'nodes', so peak memory stays
+    bounded however large the page is.
+    """
+
+    total_parses = 0
+
+    def __init__(self, html_content, url="", max_bytes=MAX_PAGE_BYTES, max_nodes=MAX_PAGE_NODES):
+        self.html = html_content or ""
+        self.url = url
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.original_size = len(self.html)
+        self.truncated = None
+        self.node_count = 0
+        self.parse_count = 0
+        self.class_matches = {}
+
+    @classmethod
+    def of(cls, page_or_html, url=""):
+        """Reuse a ParsedPage as-is, or wrap raw HTML in a new one"""
+        if page_or_html is None or isinstance(page_or_html, (str, bytes)):
+            return cls(page_or_html, url)
+        return page_or_html
+
+    @cached_property
+    def tree(self):
+        """The parsed document, up to the budgets (None for empty or unparseable HTML)"""
+        self.parse_count += 1
+        ParsedPage.total_parses += 1
+        if not self.html.strip():
+            return None
+        try:
+            return self.parse_within_budget(self.html)
+        except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+            try:
+                return self.parse_within_budget(self.html.encode('utf-8'))
+            except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+                return None
+
+    def parse_within_budget(self, html_content):
+        """Feed the HTML in chunks, stopping at the byte or node budget"""
+        parser = etree.HTMLPullParser(events=('start',))
+        parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        limit = len(html_content) if self.max_bytes is None else min(len(html_content), self.max_bytes)
+        self.node_count = 0
+        self.truncated = None
+
+        position = 0
+        while position < limit:
+            parser.feed(html_content[position:min(position + PARSE_CHUNK_SIZE, limit)])
+            position += PARSE_CHUNK_SIZE
+            for _ in parser.read_events():
+                self.node_count += 1
+            if self.max_nodes is not None and self.node_count > self.max_nodes:
+                self.truncated = 'nodes'
+                break
+        else:
+            if limit < len(html_content):
+                self.truncated = 'bytes'
+
+        if self.truncated:
+            print(f"✂️ {self.url or 'Page'} truncated at the {self.truncated} budget "
+                  f"({min(position, limit):,} of {len(html_content):,} characters parsed, {self.node_count:,} elements)")
+        return parser.close()
+
+    @cached_property
+    def text(self):
+        """All page text, like soup.get_text()"""
+        if self.tree is None:
+            return ""
+        excluded = ' or '.join(f'ancestor::{tag}' for tag in NON_TEXT_TAGS)
+        return ''.join(self.tree.xpath(f'//text()[not({excluded})]'))
+
+    @cached_property
+    def text_lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def title(self):
+        if self.tree is None:
+            return ""
+        titles = self.tree.xpath('//title')
+        return element_text(titles[0], strip=True) if titles else ""
+
+    @cached_property
+    def headings(self):
+        """(level, text) for every h1-h6 in document order"""
+        if self.tree is None:
+            return []
+        return [(int(element.tag[1]), element_text(element))
+                for element in self.tree.iter('h1', 'h2', 'h3', 'h4', 'h5', 'h6')]
+
+    @cached_property
+    def meta_tags(self):
+        """Attributes of every <meta> tag"""
+        if self.tree is None:
+            return []
+        return [dict(element.attrib) for element in self.tree.iter('meta')]
+
+    @cached_property
+    def canonical(self):
+        """href of the first <link rel="canonical">, if any"""
+        if self.tree is None:
+            return None
+        for element in self.tree.iter('link'):
+            if 'canonical' in (element.get('rel') or '').lower().split() and element.get('href'):
+                return element.get('href')
+        return None
+
+    @cached_property
+    def json_ld(self):
+        """Every JSON-LD block that parses"""
+        if self.tree is None:
+            return []
+        blocks = []
+        for script in self.tree.xpath('//script[@type="application/ld+json"]'):
+            try:
+                blocks.append(json.loads(script.text))
+            except (json.JSONDecodeError, TypeError):
+                continue
+        return blocks
+
+    @cached_property
+    def links(self):
+        """Link targets split into {'internal': [...], 'external': [...]} relative to the page URL"""
+        internal_links = []
+        external_links = []
+        if self.tree is None:
+            return {'internal': internal_links, 'external': external_links}
+
+        page_host = urlparse(self.url).netloc
+        for element in self.tree.iter('a'):
+            href = element.get('href')
+            if href:
+                if href.startswith('http'):
+                    if urlparse(href).netloc == page_host:
+                        internal_links.append(href)
+                    else:
+                        external_links.append(href)
+                elif href.startswith('/') or not href.startswith('#'):
+                    internal_links.append(urljoin(self.url, href))
+        return {'internal': internal_links, 'external': external_links}
+
+    @cached_property
+    def keyword_matches(self):
+        """Rule-pack hits in the page text ({'<pack>.<rule>': {term: [matched text]}}), from one scan"""
+        return page_matcher().scan(self.text_lower)
+
+    def elements_with_class(self, substring):
+        """Elements whose class attribute contains substring, like [class*="..."] (memoized)"""
+        if substring not in self.class_matches:
+            if self.tree is None:
+                self.class_matches[substring] = []
+            else:
+                self.class_matches[substring] = self.tree.xpath('//*[contains(@class, $value)]', value=substring)
+        return self.class_matches[substring]
+
+def synthetic_changelog(size):
+    """A changelog-style page of roughly size characters"""
+    entry = ("<div class='release'><h2>v1.{i}.0</h2><p>Fixed a race in the sync engine when a workspace "
+             "was renamed mid-export.</p><ul><li>Faster search</li><li>SSO fixes</li></ul></div>")
+    count = max(1, size // len(entry.format(i=0)))
+    return ("<html><head><title>Changelog</title></head><body><h1>Changelog</h1>"
+            + ''.join(entry.format(i=i) for i in range(count)) + "</body></html>")
+
+def peak_rss_reset():
+    """Reset the process's peak RSS (Linux); returns False where that isn't possible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss():
+    """Peak RSS of this process in bytes since the last reset (Linux only)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    return None
+
+def measure_extraction_memory(size, max_bytes, max_nodes):
+    """Run every default extractor on one synthetic page; (Python peak, process peak growth or None, truncated)"""
+    import tracemalloc
+    from scrapers.profile_pipeline import DEFAULT_EXTRACTORS
+
+    html_content = synthetic_changelog(size)
+    can_reset = peak_rss_reset()
+    baseline = peak_rss() if can_reset else None
+    tracemalloc.start()
+
+    page = ParsedPage(html_content, "https://example.com/changelog", max_bytes=max_bytes, max_nodes=max_nodes)
+    results = {}
+    for name, extractor in DEFAULT_EXTRACTORS.items():
+        results[name] = extractor(page, page.url, results)
+
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    process_growth = peak_rss() - baseline if can_reset else None
+    return python_peak, process_growth, page.truncated
+
+# Memory check function
+def check_parse_memory(size=20 * 1024 * 1024, max_bytes=MAX_PAGE_BYTES, max_nodes=MAX_PAGE_NODES):
+    """Peak memory of extracting a huge page with and without the parse budgets
+
+    Each run happens in a fresh process so the peak RSS (which includes lxml's own allocations,
+    invisible to tracemalloc) belongs to that run alone. With budgets the peak must stay within
+    a fixed multiple of max_bytes, whatever the page size.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    peaks = {}
+    for label, budgets in (("budgeted", (max_bytes, max_nodes)), ("unbounded", (None, None))):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            peaks[label] = executor.submit(measure_extraction_memory, size, *budgets).result()
+
+    print(f"📄 Synthetic page: {size / 1024 / 1024:.0f} MB, budget {max_bytes / 1024 / 1024:.0f} MB / {max_nodes:,} elements")
+    for label, (python_peak, process_growth, truncated) in peaks.items():
+        process_text = f", process peak +{process_growth / 1024 / 1024:.0f} MB" if process_growth is not None else ""
+        print(f"   🧠 {label}: Python peak {python_peak / 1024 / 1024:.0f} MB{process_text}, truncated: {truncated}")
+
+    python_peak, process_growth, truncated = peaks["budgeted"]
+    bounded = truncated is not None and (process_growth if process_growth is not None else python_peak) < 40 * max_bytes
+    print("✅ Peak memory bounded by the parse budget" if bounded else "❌ Peak memory not bounded by the parse budget")
+    return bounded
+
+# Test function
+def test_parsed_page():
+    """Run every extractor on one page and check it was parsed once"""
+    from scrapers.content_extractor import extract_content
+    from scrapers.price_stock_scraper import PriceStockScraper
+    from scrapers.meta_seo_scraper import MetaSEOScraper
+
+    html_content = """<html><head><title>Acme Enterprise API Platform</title>
+    <meta name="description" content="Secure, scalable integration platform">
+    <link rel="canonical" href="https://acme.example/pricing"></head>
+    <body><h1>Pricing</h1><div class="pricing-plan">Pro plan $49 per month, billed annually</div>
+    <a href="/features">Features</a><a href="https://partner.example">Partner</a></body></html>"""
+
+    page = ParsedPage(html_content, "https://acme.example/pricing")
+    price_scraper = PriceStockScraper()
+    seo_scraper = MetaSEOScraper()
+
+    extract_content(page)
+    price_scraper.extract_pricing_data(page, page.url)
+    price_scraper.extract_availability_data(page, page.url)
+    meta_data = seo_scraper.extract_meta_tags(page, page.url)
+    seo_analysis = seo_scraper.calculate_b2b_seo_score(meta_data, page, page.url)
+
+    print(f"🧮 Parses for 5 extractors: {page.parse_count}")
+    print(f"📊 SEO Score: {seo_analysis['score']}/100")
+    return page.parse_count == 1
+
+def test_parse_memory(size=4 * 1024 * 1024, max_bytes=256 * 1024, max_nodes=5_000):
+    """Extract a page far over a small budget in a fresh process and check its peak RSS stays bounded
+
+    Returns None (skipped) where the peak RSS can't be reset, since tracemalloc alone misses lxml.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        _, process_growth, truncated = executor.submit(measure_extraction_memory, size, max_bytes, max_nodes).result()
+    if process_growth is None:
+        print("⏭️ Skipped parse memory test: peak RSS can't be reset on this platform")
+        return None
+
+    print(f"🧠 {size / 1024 / 1024:.0f} MB page, {max_bytes / 1024:.0f} KB budget: "
+          f"process peak +{process_growth / 1024 / 1024:.1f} MB, truncated: {truncated}")
+    return truncated is not None and process_growth < 40 * max_bytes
+
+if __name__ == "__main__":
+    test_parsed_page()
+    test_parse_memory()
+    check_parse_memory()
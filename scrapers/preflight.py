@@ -0,0 +1,201 @@
+"""
+Pre-flight screening: cheap HEAD / ranged-GET checks before a URL is sent to the browser
+"""
+
+import asyncio
+import re
+from collections import Counter, namedtuple
+from urllib.parse import urlparse
+import requests
+from utils.http_cache import normalize_url
+
+# action is 'crawl' (crawl_url, which is the redirect target when the URL moved) or 'skip' (reason says why)
+PreflightResult = namedtuple('PreflightResult', ['url', 'action', 'reason', 'crawl_url', 'status', 'content_type', 'content_length'])
+
+# Binary downloads and non-page files: never worth a request, let alone a render
+NON_PAGE_EXTENSIONS = {
+    '.pdf', '.zip', '.gz', '.tgz', '.tar', '.rar', '.7z', '.dmg', '.exe', '.msi', '.pkg', '.deb', '.rpm', '.apk',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.tif', '.tiff', '.avif',
+    '.mp3', '.mp4', '.mov', '.avi', '.webm', '.wav', '.ogg', '.m4a',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.csv', '.json', '.xml', '.txt', '.rss',
+    '.woff', '.woff2', '.ttf', '.eot', '.css', '.js'
+}
+
+# Redirect targets that mean "log in first": whole path segments or query keys/values, so /authors or /lessons don't count
+LOGIN_PATH_WORDS = ('login', 'log-in', 'signin', 'sign-in', 'sign_in', 'auth', 'sso', 'oauth')
+LOGIN_PATHS = ('session/new',)
+URL_TOKEN_SPLIT = re.compile(r'[/?&=]')
+
+# Statuses that a real browser may still get past (bot protection, rate limits); these are rendered anyway,
+# as is any 5xx, which is often transient or a CDN challenge answering the bare probe
+BROWSER_MAY_PASS = {401, 403, 429}
+
+# Bigger than this isn't a page worth rendering; smaller pages over the crawl's max_page_bytes are truncated instead
+PREFLIGHT_MAX_BYTES = 20 * 1024 * 1024
+
+def url_extension(url):
+    path = urlparse(url).path.lower()
+    last_segment = path.rsplit('/', 1)[-1]
+    return '.' + last_segment.rsplit('.', 1)[-1] if '.' in last_segment else ''
+
+def login_markers(url):
+    """Login words found as whole path segments, query keys or values (and login paths) in a URL"""
+    parts = urlparse(url)
+    path = parts.path.lower()
+    tokens = set(URL_TOKEN_SPLIT.split(f"{path}?{parts.query.lower()}"))
+    # login.php, signin.html
+    tokens.update(token.rsplit('.', 1)[0] for token in list(tokens))
+    found = {word for word in LOGIN_PATH_WORDS if word in tokens}
+    found.update(login_path for login_path in LOGIN_PATHS if f"/{login_path}" in f"{path}/")
+    return found
+
+def is_login_redirect(url, final_url):
+    """True if the redirect lands on a login/SSO page the original URL wasn't"""
+    return bool(login_markers(final_url) - login_markers(url))
+
+def response_size(response):
+    """Body size from Content-Range (ranged GET) or Content-Length, or None if not given"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[-1].strip()
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit() and response.request.method == 'HEAD':
+        return int(length)
+    # A 200 to a ranged GET ignores the range, so Content-Length is the whole body
+    if length.isdigit() and response.status_code == 200:
+        return int(length)
+    return None
+
+class Preflight:
+    """Screen URLs with HEAD (or a one-byte ranged GET when HEAD isn't allowed) before rendering
+
+    Drops binary files, oversized bodies, hard 4xx and redirects to a login wall or to a
+    page that's already in the batch; URLs that moved are routed to their redirect target.
+    """
+
+    # max_concurrency matches CrawlerSession's connection pool, whose HTTP session is usually passed in
+    def __init__(self, http=None, max_concurrency=10, per_host_concurrency=4, timeout=10, max_bytes=PREFLIGHT_MAX_BYTES):
+        self.http = http if http is not None else requests.Session()
+        self.owns_http = http is None
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.skip_counts = Counter()
+        self.routed = 0
+
+    def probe(self, url):
+        """HEAD the URL, falling back to a ranged GET; returns the response (body not read) or the error"""
+        try:
+            response = self.http.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code not in (405, 501) and response.status_code < 500:
+                return response
+        except requests.RequestException:
+            pass
+        try:
+            response = self.http.get(url, headers={'Range': 'bytes=0-0'}, timeout=self.timeout, allow_redirects=True, stream=True)
+            response.close()
+            return response
+        except requests.RequestException as e:
+            return e
+
+    def check(self, url, response, batch_urls):
+        """Decide what to do with one probed URL"""
+        if isinstance(response, Exception):
+            # The browser gets its own try; a flaky HEAD isn't proof the page is gone
+            return PreflightResult(url, 'crawl', None, url, None, None, None)
+
+        status = response.status_code
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        size = response_size(response)
+        final_url = response.url or url
+
+        def skip(reason):
+            return PreflightResult(url, 'skip', reason, final_url, status, content_type, size)
+
+        if response.history and is_login_redirect(url, final_url):
+            return skip('login redirect')
+        if status in (404, 410) or (400 <= status < 500 and status not in BROWSER_MAY_PASS):
+            return skip(f'http {status}')
+        if status >= 500:
+            # Not proof the page is gone: the browser gets its own try
+            return PreflightResult(url, 'crawl', None, url, status, content_type, size)
+        if content_type and 'html' not in content_type and status < 400:
+            return skip('not html')
+        if size is not None and self.max_bytes is not None and size > self.max_bytes:
+            return skip('oversized')
+        if response.history and normalize_url(final_url) != normalize_url(url):
+            if normalize_url(final_url) in batch_urls:
+                return skip('redirect duplicate')
+            return PreflightResult(url, 'crawl', 'redirected', final_url, status, content_type, size)
+        return PreflightResult(url, 'crawl', None, url, status, content_type, size)
+
+    async def screen(self, urls):
+        """Check every URL concurrently; returns PreflightResults in input order"""
+        self.skip_counts = Counter()
+        self.routed = 0
+        batch_urls = {normalize_url(url) for url in urls}
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = {}
+
+        async def screen_one(url):
+            if url_extension(url) in NON_PAGE_EXTENSIONS:
+                return PreflightResult(url, 'skip', 'non-page file', url, None, None, None)
+            host_limit = host_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(self.per_host_concurrency))
+            async with host_limit:
+                async with global_limit:
+                    response = await asyncio.to_thread(self.probe, url)
+            return self.check(url, response, batch_urls)
+
+        results = await asyncio.gather(*(screen_one(url) for url in urls))
+
+        # Two sitemap URLs redirecting to the same new page only need rendering once
+        claimed = set()
+        screened = []
+        for result in results:
+            if result.action == 'crawl':
+                target = normalize_url(result.crawl_url)
+                if target in claimed:
+                    result = result._replace(action='skip', reason='redirect duplicate')
+                else:
+                    claimed.add(target)
+            if result.action == 'skip':
+                self.skip_counts[result.reason] += 1
+            elif result.reason == 'redirected':
+                self.routed += 1
+            screened.append(result)
+        return screened
+
+    def print_summary(self, total):
+        skipped = sum(self.skip_counts.values())
+        print(f"🛫 Pre-flight: {total - skipped}/{total} URLs worth rendering, {skipped} skipped"
+              + (f", {self.routed} routed to their redirect target" if self.routed else ""))
+        for reason, count in self.skip_counts.most_common():
+            print(f"   ⏭️ {reason}: {count}")
+
+    def close(self):
+        if self.owns_http:
+            self.http.close()
+
+# Test function
+async def test_preflight():
+    """Screen a few URLs against a local test server (python -m http.server 8765 in a folder with index.html)"""
+    preflight = Preflight()
+    urls = [
+        "http://localhost:8765/index.html",
+        "http://localhost:8765/missing.html",
+        "http://localhost:8765/sitemap.xml",
+        "http://localhost:8765/brochure.pdf",
+        "http://localhost:8765/",
+    ]
+    results = await preflight.screen(urls)
+    for result in results:
+        print(f"   {result.action:5} {result.url} {result.reason or ''}")
+    preflight.print_summary(len(urls))
+    preflight.close()
+    return results
+
+if __name__ == "__main__":
+    asyncio.run(test_preflight())
@@ -0,0 +1,252 @@
+"""
+Price lexer: one compiled scan over page text that emits typed pricing tokens
+"""
+
+import re
+import time
+from collections import namedtuple
+
+# kind is 'price', 'discount', 'trial', 'billing', 'quote' or 'currency'. amount is the price,
+# the discount percent or the trial length; period is month/year/week/day; unit is user/seat/...
+PriceToken = namedtuple('PriceToken', ['kind', 'amount', 'currency', 'period', 'unit', 'offset', 'text'])
+
+CURRENCY_SYMBOLS = {
+    'US$': 'USD', 'C$': 'CAD', 'A$': 'AUD', '$': 'USD',
+    '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY', '₩': 'KRW'
+}
+
+# Singular, lowercase; plurals are handled by the lexer
+CURRENCY_WORDS = {
+    'usd': 'USD', 'dollar': 'USD', 'us dollar': 'USD',
+    'cad': 'CAD', 'canadian dollar': 'CAD',
+    'aud': 'AUD', 'australian dollar': 'AUD',
+    'eur': 'EUR', 'euro': 'EUR',
+    'gbp': 'GBP', 'pound': 'GBP', 'sterling': 'GBP', 'british pound': 'GBP',
+    'inr': 'INR', 'rupee': 'INR', 'indian rupee': 'INR',
+    'jpy': 'JPY', 'yen': 'JPY', 'japanese yen': 'JPY',
+    'cny': 'CNY', 'yuan': 'CNY', 'chinese yuan': 'CNY', 'renminbi': 'CNY',
+    'chf': 'CHF', 'franc': 'CHF', 'swiss franc': 'CHF',
+    'krw': 'KRW', 'won': 'KRW', 'korean won': 'KRW'
+}
+
+# Words that are too common to count as a currency mention without an amount next to them
+AMOUNT_ONLY_WORDS = {'won', 'franc'}
+
+PERIOD_WORDS = {
+    'month': 'month', 'mo': 'month', 'monthly': 'month',
+    'year': 'year', 'yr': 'year', 'annum': 'year', 'yearly': 'year', 'annually': 'year', 'annual': 'year',
+    'week': 'week', 'wk': 'week', 'weekly': 'week',
+    'day': 'day', 'daily': 'day'
+}
+
+UNIT_WORDS = {
+    'user': 'user', 'seat': 'seat', 'member': 'user', 'license': 'license', 'licence': 'license',
+    'agent': 'agent', 'editor': 'user', 'host': 'host', 'node': 'node'
+}
+
+QUOTE_PHRASES = ['contact sales', 'request quote', 'request a quote', 'custom pricing', 'enterprise pricing']
+
+# Price sanity bounds (upper bound raised for won/yen amounts with thousands separators). A $0
+# token is kept for free plans on pricing cards; the whole-page scan ignores zero amounts.
+MIN_PRICE = 0
+MAX_PRICE = 100000
+
+def alternation(words):
+    """Regex alternation for words, longest first, with flexible whitespace"""
+    ordered = sorted(set(words), key=len, reverse=True)
+    return '|'.join(r'\s*'.join(re.escape(part) for part in word.split()) for word in ordered)
+
+def build_price_pattern(currency_symbols=CURRENCY_SYMBOLS, currency_words=CURRENCY_WORDS,
+                        period_words=PERIOD_WORDS, unit_words=UNIT_WORDS, quote_phrases=QUOTE_PHRASES):
+    """Compile the single lexer regex; alternatives are tried in order at each position"""
+    symbol = alternation(currency_symbols)
+    word = alternation(currency_words)
+    mention_words = alternation(w for w in currency_words if w not in AMOUNT_ONLY_WORDS)
+    period_nouns = alternation(w for w in period_words if not w.endswith('ly') and w != 'annual')
+    period_adverbs = alternation(w for w in period_words if w.endswith('ly') or w == 'annual')
+    unit = alternation(unit_words)
+    quote = alternation(quote_phrases)
+    amount = r'\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?'
+    connector = r'\s*(?:/|\bper\b|\ba\b|\ban\b|\beach\b)\s*'
+
+    # Only digits, symbols, '/' and the first letter of a word any token can start with are worth
+    # trying the alternatives at; checking that first skips most positions in ordinary prose
+    words = list(currency_words) + list(period_words) + list(quote_phrases) + ['per', 'save', 'free', 'from', 'starting', 'billed']
+    first_letters = ''.join(sorted({word[0].lower() for word in words}))
+    first_symbols = ''.join(sorted({re.escape(sym[0]) for sym in currency_symbols}))
+    start = rf'(?=[\d/{first_symbols}]|\b[{first_letters}])'
+
+    return re.compile(
+        rf'{start}(?:'
+        # Discounts and trials first, so their numbers aren't read as bare prices
+        rf'(?:\bsave\s*(?P<save>\d+)\s*%|(?<![\w.])(?P<off>\d+)\s*(?:%|percent)\s*(?:off|discount)\b)'
+        rf'|(?:(?<![\w.])(?P<trial>\d+)[\s-]*(?P<trial_span>day|week|month)s?[\s-]*(?:free[\s-]*)?trial'
+        rf'|\bfree\s*(?:trial\s*)?(?:for\s*)?(?P<trial_after>\d+)[\s-]*(?P<trial_after_span>day|week|month)s?\b)'
+        rf'|(?P<quote>\b(?:{quote})\b)'
+        # A price: optional "from"/"starting at", optional symbol, amount, then optional
+        # currency word, unit and period in either order ("$10 per user/month", "10 EUR a month per seat")
+        rf'|(?:(?P<prefix>\bfrom|\bstarting\s*at)\s*)?(?P<symbol>{symbol})?\s*(?<![\w.,])(?P<amount>{amount})(?![\d,]\d)'
+        rf'(?:\s*(?P<word>\b(?:{word})s?\b))?'
+        rf'(?:{connector}(?P<unit>\b(?:{unit})s?\b))?'
+        rf'(?:{connector}(?P<period>\b(?:{period_nouns})s?\b)|\s*(?P<period_adverb>\b(?:{period_adverbs})\b))?'
+        rf'(?:{connector}(?P<unit_after>\b(?:{unit})s?\b))?'
+        # Billing mentions without an amount
+        rf'|(?P<billed>\bbilled\s+(?:{period_adverbs})\b)'
+        rf'|(?:/|\bper\b)\s*(?P<per>\b(?:{period_nouns})\b)'
+        rf'|(?P<adverb>\b(?:{period_adverbs})\b)'
+        # Currency mentions without an amount
+        rf'|(?P<mention_symbol>{symbol})|(?P<mention_word>\b(?:{mention_words})s?\b))',
+        re.IGNORECASE
+    )
+
+def normalize_word(word, table):
+    """Look up a matched word: lowercase, single spaces, plural s dropped"""
+    word = ' '.join(word.lower().split())
+    if word not in table and word.endswith('s') and word[:-1] in table:
+        word = word[:-1]
+    return table.get(word)
+
+class PriceLexer:
+    """Scan text once and yield PriceTokens in text order"""
+
+    def __init__(self, currency_symbols=CURRENCY_SYMBOLS, currency_words=CURRENCY_WORDS,
+                 period_words=PERIOD_WORDS, unit_words=UNIT_WORDS, quote_phrases=QUOTE_PHRASES):
+        self.currency_symbols = {symbol.upper(): code for symbol, code in currency_symbols.items()}
+        self.currency_words = currency_words
+        self.period_words = period_words
+        self.unit_words = unit_words
+        self.pattern = build_price_pattern(currency_symbols, currency_words, period_words, unit_words, quote_phrases)
+
+    def tokens(self, text):
+        for match in self.pattern.finditer(text):
+            token = self.token(match)
+            if token is not None:
+                yield token
+
+    def token(self, match):
+        groups = match.groupdict()
+        offset = match.start()
+        text = match.group(0)
+
+        if groups['amount'] is not None:
+            currency = self.currency_symbols.get(groups['symbol'].upper()) if groups['symbol'] else None
+            if groups['word']:
+                currency = normalize_word(groups['word'], self.currency_words) or currency
+            period_word = groups['period'] or groups['period_adverb']
+            unit_word = groups['unit'] or groups['unit_after']
+            period = normalize_word(period_word, self.period_words) if period_word else None
+            unit = normalize_word(unit_word, self.unit_words) if unit_word else None
+            # A bare number is just a number
+            if not (currency or period or unit or groups['prefix']):
+                return None
+            amount = float(groups['amount'].replace(',', ''))
+            if not MIN_PRICE <= amount < MAX_PRICE:
+                return None
+            return PriceToken('price', amount, currency, period, unit, offset, text)
+
+        if groups['save'] or groups['off']:
+            return PriceToken('discount', float(groups['save'] or groups['off']), None, None, None, offset, text)
+        if groups['trial'] or groups['trial_after']:
+            span = groups['trial_span'] or groups['trial_after_span']
+            return PriceToken('trial', float(groups['trial'] or groups['trial_after']), None,
+                              normalize_word(span, self.period_words), None, offset, text)
+        if groups['quote']:
+            return PriceToken('quote', None, None, None, None, offset, text)
+        period_word = groups['billed'] or groups['per'] or groups['adverb']
+        if period_word:
+            period = normalize_word(period_word.split()[-1], self.period_words)
+            return PriceToken('billing', None, None, period, None, offset, text)
+        if groups['mention_symbol']:
+            return PriceToken('currency', None, self.currency_symbols.get(groups['mention_symbol'].upper()),
+                              None, None, offset, text)
+        if groups['mention_word']:
+            return PriceToken('currency', None, normalize_word(groups['mention_word'], self.currency_words),
+                              None, None, offset, text)
+        return None
+
+DEFAULT_LEXER = PriceLexer()
+
+def tokenize_prices(text, lexer=None):
+    """All pricing tokens in text, in order"""
+    return list((lexer or DEFAULT_LEXER).tokens(text))
+
+def token_context(text, token, width=40):
+    """The text around a token, on one line"""
+    start = max(0, token.offset - width)
+    end = token.offset + len(token.text) + width
+    return ' '.join(text[start:end].split())
+
+# Original price patterns (one findall each), kept for the benchmark
+LEGACY_PRICE_PATTERNS = [
+    r'\$(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*(?:USD|dollars?)', r'C\$(\d+(?:\.\d{2})?)',
+    r'A\$(\d+(?:\.\d{2})?)', r'€(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*(?:EUR|euros?)',
+    r'£(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*(?:GBP|pounds?)', r'₹(\d+(?:\.\d{2})?)',
+    r'(\d+(?:\.\d{2})?)\s*(?:INR|rupees?)', r'¥(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*(?:JPY|yen)',
+    r'₩(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*(?:KRW|won)',
+    r'(\d+(?:\.\d{2})?)\s*(?:per|/)\s*(?:month|year|mo|yr|user|seat|license)',
+    r'from\s*[€£₹¥₩\$]?(\d+(?:\.\d{2})?)', r'starting\s*at\s*[€£₹¥₩\$]?(\d+(?:\.\d{2})?)',
+    r'(\d+(?:\.\d{2})?)\s*(?:monthly|yearly|per\s*month|per\s*year|per\s*user|per\s*seat)',
+    r'contact\s*sales|request\s*quote|custom\s*pricing|enterprise\s*pricing',
+]
+LEGACY_OTHER_PATTERNS = [
+    r'\$', r'USD', r'US\$', r'dollars?', r'US\s*dollars?', r'€', r'EUR', r'euros?', r'euro', r'£', r'GBP',
+    r'pounds?', r'sterling', r'British\s*pounds?', r'₹', r'INR', r'rupees?', r'rupee', r'Indian\s*rupees?',
+    r'¥', r'JPY', r'yen', r'Japanese\s*yen', r'C\$', r'CAD', r'Canadian\s*dollars?', r'A\$', r'AUD',
+    r'Australian\s*dollars?', r'CHF', r'Swiss\s*francs?', r'¥', r'CNY', r'Chinese\s*yuan', r'renminbi',
+    r'₩', r'KRW', r'Korean\s*won', r'(?:per|/)\s*(month|year|mo|yr|annually|monthly)',
+    r'(monthly|yearly|annual)', r'(billed\s+(?:monthly|yearly|annually))', r'(\d+)%\s*(?:off|discount)',
+    r'save\s*(\d+)%', r'(\d+)\s*(?:percent|%)\s*(?:off|discount)', r'(\d+)\s*(?:day|week|month)s?\s*(?:free|trial)',
+    r'free\s*(?:trial|for)\s*(\d+)\s*(?:day|week|month)s?', r'(\d+)\s*(?:day|week|month)s?\s*(?:trial|free)'
+]
+
+def legacy_price_scan(text):
+    """The old approach: every pattern over the whole text; returns the raw price matches"""
+    prices = []
+    for pattern in LEGACY_PRICE_PATTERNS:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            try:
+                prices.append(float(match))
+            except ValueError:
+                continue
+    for pattern in LEGACY_OTHER_PATTERNS:
+        re.findall(pattern, text, re.IGNORECASE)
+    return prices
+
+def synthetic_pricing_text(plans=2000):
+    """Text shaped like a long pricing / plan comparison page"""
+    lines = []
+    for i in range(plans):
+        price = 9 + (i % 50) * 10
+        lines.append(f"Plan {i}: ${price}.99 per user per month, billed annually. Starting at €{price} a month. "
+                     f"Save {i % 30}% with yearly billing. {14 + i % 16}-day free trial. "
+                     f"Includes {i * 3} API calls, 24/7 support and {i % 9} workspaces. Contact sales for volume pricing.\n"
+                     f"Can I change plans later? Yes, you can upgrade or downgrade at any time from the billing "
+                     f"settings, and the difference is prorated automatically on your next invoice. Teams that "
+                     f"outgrow plan {i} usually move to the next tier once they need single sign-on or audit logs.")
+    return '\n'.join(lines)
+
+# Benchmark function
+def benchmark_price_lexer(plans=2000):
+    """Compare the old pattern-per-findall scan with the single-pass lexer on a long pricing page"""
+    text = synthetic_pricing_text(plans)
+
+    start = time.perf_counter()
+    legacy_prices = legacy_price_scan(text)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens = tokenize_prices(text)
+    lexer_elapsed = time.perf_counter() - start
+
+    prices = [token for token in tokens if token.kind == 'price']
+    print(f"⏱️ {len(text):,} characters of pricing text")
+    print(f"🐢 {len(LEGACY_PRICE_PATTERNS) + len(LEGACY_OTHER_PATTERNS)} patterns: {legacy_elapsed:.3f}s, "
+          f"{len(legacy_prices):,} price matches (figures counted by several patterns)")
+    print(f"⚡ One lexer pass: {lexer_elapsed:.3f}s, {len(prices):,} prices, "
+          f"{len(tokens) - len(prices):,} other tokens ({legacy_elapsed / lexer_elapsed:.1f}x)")
+    for token in prices[:3]:
+        print(f"   💰 {token.amount} {token.currency} /{token.unit or '-'} /{token.period or '-'} at {token.offset}")
+    return {"legacy": legacy_elapsed, "lexer": lexer_elapsed}
+
+if __name__ == "__main__":
+    benchmark_price_lexer()
@@ -4,192 +4,135 @@ Like checking if something is in stock or how much it costs
 """
 
 import asyncio
-import json
-import re
+from collections import Counter
 from datetime import datetime
-from pathlib import Path
 from urllib.parse import urljoin, urlparse
-from crawl4ai import AsyncWebCrawler
-from bs4 import BeautifulSoup
 import requests
+from scrapers.crawler_session import CrawlerSession, crawl_page, run_extraction
+from scrapers.parsed_page import ParsedPage
+from scrapers.price_lexer import tokenize_prices, token_context
+from scrapers.pricing_structure import structured_plans
+from utils.rule_packs import rule_texts
+from utils.company_store import CompanyStore
+from utils.http_cache import consumer_key
+
+def extract_pricing_page(html_content, url):
+    """Process-pool task: (pricing data, availability data) for one page"""
+    scraper = PriceStockScraper()
+    page = ParsedPage(html_content, url)
+    return scraper.extract_pricing_data(page, url), scraper.extract_availability_data(page, url)
 
 class PriceStockScraper:
-    def __init__(self):
-        self.data_dir = Path("data/companies")
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        """Company store, opened on the first save
+
+        Process-pool tasks build scrapers only to extract, so they never open a database connection.
+        """
+        if self._store is None:
+            self._store = CompanyStore()
+        return self._store
         
     def extract_pricing_data(self, html_content, url):
-        """Look for prices on the webpage"""
-        if not html_content:
+        """Look for prices on the webpage (html_content may be raw HTML or a shared ParsedPage)
+
+        Plans and prices come from JSON-LD offers or pricing tables/cards when the page has them;
+        only pages without any are scanned as plain text.
+        """
+        page = ParsedPage.of(html_content, url)
+        if not page.html:
             return {}
             
-        soup = BeautifulSoup(html_content, 'html.parser')
         pricing_data = {
             'prices': [],
             'plans': [],
+            'plan_prices': {},  # plan name -> amount, currency, period, unit, source
+            'pricing_source': None,  # 'json-ld', 'html' or 'text'
             'currency': None,
             'currencies_found': [],  # Track all currencies found on the page
             'billing_periods': [],
             'discounts': [],
-            'free_trials': []
+            'free_trials': [],
+            'custom_pricing': False  # "Contact sales" / "custom pricing" instead of (or as well as) list prices
         }
         
-        # Look for prices in all major currencies
-        price_patterns = [
-            # Dollar formats
-            r'\$(\d+(?:\.\d{2})?)',  # $99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:USD|dollars?)',  # 99.99 USD
-            r'C\$(\d+(?:\.\d{2})?)',  # C$99.99 (Canadian)
-            r'A\$(\d+(?:\.\d{2})?)',  # A$99.99 (Australian)
-            
-            # Euro formats
-            r'€(\d+(?:\.\d{2})?)',  # €99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:EUR|euros?)',  # 99.99 EUR
-            
-            # Pound formats
-            r'£(\d+(?:\.\d{2})?)',  # £99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:GBP|pounds?)',  # 99.99 GBP
-            
-            # Rupee formats
-            r'₹(\d+(?:\.\d{2})?)',  # ₹99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:INR|rupees?)',  # 99.99 INR
-            
-            # Yen formats
-            r'¥(\d+(?:\.\d{2})?)',  # ¥99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:JPY|yen)',  # 99.99 JPY
-            
-            # Won format
-            r'₩(\d+(?:\.\d{2})?)',  # ₩99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:KRW|won)',  # 99.99 KRW
+        # Fast path: structured data and pricing cards give plan -> price directly
+        plans, source, plan_texts = structured_plans(page)
+        if plans:
+            pricing_data['plan_prices'] = plans
+            pricing_data['plans'] = list(plans)[:10]
+            pricing_data['pricing_source'] = source
+            # Trials, discounts and billing notes are looked for in the cards themselves, or in the
+            # page text when the plans came from JSON-LD and there are no cards
+            tokens = tokenize_prices('\n'.join(plan_texts) if plan_texts else page.text)
+            seen_prices = set()
+            for name, info in plans.items():
+                if info.get('custom'):
+                    pricing_data['custom_pricing'] = True
+                if info.get('amount') is None:
+                    continue
+                price_key = (info['amount'], info['currency'], info['period'], info['unit'])
+                if price_key not in seen_prices:
+                    seen_prices.add(price_key)
+                    pricing_data['prices'].append({
+                        'amount': info['amount'],
+                        'currency': info['currency'],
+                        'period': info['period'],
+                        'unit': info['unit'],
+                        'plan': name
+                    })
+        else:
+            # Fallback: one lexer pass over all the page text
+            text_content = page.text
+            tokens = tokenize_prices(text_content)
+            pricing_data['pricing_source'] = 'text'
             
-            # B2B-specific patterns
-            r'(\d+(?:\.\d{2})?)\s*(?:per|/)\s*(?:month|year|mo|yr|user|seat|license)',  # 99.99 per user/month
-            r'from\s*[€£₹¥₩\$]?(\d+(?:\.\d{2})?)',  # from $99.99, from €99.99, etc.
-            r'starting\s*at\s*[€£₹¥₩\$]?(\d+(?:\.\d{2})?)',  # starting at $99.99
-            r'(\d+(?:\.\d{2})?)\s*(?:monthly|yearly|per\s*month|per\s*year|per\s*user|per\s*seat)',  # 99.99 per user
-            r'contact\s*sales|request\s*quote|custom\s*pricing|enterprise\s*pricing',  # B2B pricing models
-        ]
-        
-        # Get all the text from the page
-        text_content = soup.get_text()
-        
-        # Find all the prices with their currency context
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            for match in matches:
-                try:
-                    price = float(match)
-                    if 0 < price < 10000:  # Only keep prices that make sense
-                        # Try to determine currency from the pattern
-                        currency = None
-                        if '$' in pattern and 'C$' not in pattern and 'A$' not in pattern:
-                            currency = 'USD'
-                        elif 'C$' in pattern:
-                            currency = 'CAD'
-                        elif 'A$' in pattern:
-                            currency = 'AUD'
-                        elif '€' in pattern:
-                            currency = 'EUR'
-                        elif '£' in pattern:
-                            currency = 'GBP'
-                        elif '₹' in pattern:
-                            currency = 'INR'
-                        elif '¥' in pattern:
-                            currency = 'JPY'
-                        elif '₩' in pattern:
-                            currency = 'KRW'
-                        
-                        # Store price with currency info
-                        price_info = {
-                            'amount': price,
-                            'currency': currency,
-                            'pattern_used': pattern
-                        }
-                        pricing_data['prices'].append(price_info)
-                except ValueError:
+            # Each figure is one token, so a price matched several ways is only counted once
+            seen_prices = set()
+            for token in tokens:
+                if token.kind != 'price' or token.amount <= 0:
                     continue
+                price_key = (token.amount, token.currency, token.period, token.unit)
+                if price_key not in seen_prices:
+                    seen_prices.add(price_key)
+                    pricing_data['prices'].append({
+                        'amount': token.amount,
+                        'currency': token.currency,
+                        'period': token.period,
+                        'unit': token.unit,
+                        'offset': token.offset,
+                        'context': token_context(text_content, token)
+                    })
+        
+        # Currencies in the order they first appear; the primary one is the one most prices use
+        price_currencies = Counter(price['currency'] for price in pricing_data['prices'] if price['currency'])
+        for currency in [price['currency'] for price in pricing_data['prices']] + [token.currency for token in tokens]:
+            if currency and currency not in pricing_data['currencies_found']:
+                pricing_data['currencies_found'].append(currency)
+        if price_currencies:
+            pricing_data['currency'] = price_currencies.most_common(1)[0][0]
+        elif pricing_data['currencies_found']:
+            pricing_data['currency'] = pricing_data['currencies_found'][0]
+        
+        # Billing periods ("per month", "billed annually"), discounts ("20% off") and trials ("14-day free trial")
+        pricing_data['billing_periods'].extend(price['period'] for price in pricing_data['prices'] if price['period'])
+        for token in tokens:
+            if token.kind == 'billing' and token.period:
+                pricing_data['billing_periods'].append(token.period)
+            elif token.kind == 'discount':
+                pricing_data['discounts'].append(f"{token.amount:g}")
+            elif token.kind == 'trial':
+                pricing_data['free_trials'].append(f"{token.amount:g} {token.period}")
+            elif token.kind == 'quote':
+                pricing_data['custom_pricing'] = True
         
-        # Look for plan names like "Basic Plan" or "Pro Package"
-        plan_selectors = [
-            '[class*="plan"]', '[class*="pricing"]', '[class*="tier"]',
-            '[class*="package"]', '[class*="subscription"]'
-        ]
-        
-        for selector in plan_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                plan_text = element.get_text(strip=True)
-                if plan_text and len(plan_text) > 10:
-                    pricing_data['plans'].append(plan_text)
-        
-        # Check what currency they're using (USD, EUR, GBP, INR, JPY, etc.)
-        currency_patterns = {
-            'USD': [r'\$', r'USD', r'US\$', r'dollars?', r'US\s*dollars?'],
-            'EUR': [r'€', r'EUR', r'euros?', r'euro'],
-            'GBP': [r'£', r'GBP', r'pounds?', r'sterling', r'British\s*pounds?'],
-            'INR': [r'₹', r'INR', r'rupees?', r'rupee', r'Indian\s*rupees?'],
-            'JPY': [r'¥', r'JPY', r'yen', r'Japanese\s*yen'],
-            'CAD': [r'C\$', r'CAD', r'Canadian\s*dollars?'],
-            'AUD': [r'A\$', r'AUD', r'Australian\s*dollars?'],
-            'CHF': [r'CHF', r'Swiss\s*francs?'],
-            'CNY': [r'¥', r'CNY', r'Chinese\s*yuan', r'renminbi'],
-            'KRW': [r'₩', r'KRW', r'Korean\s*won']
-        }
-        
-        # Look for currency symbols and text
-        for currency, patterns in currency_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_content, re.IGNORECASE):
-                    if currency not in pricing_data['currencies_found']:
-                        pricing_data['currencies_found'].append(currency)
-                    if not pricing_data['currency']:  # Set primary currency to first found
-                        pricing_data['currency'] = currency
-                    break
-        
-        # Look for billing info like "per month" or "yearly"
-        billing_patterns = [
-            r'(?:per|/)\s*(month|year|mo|yr|annually|monthly)',
-            r'(monthly|yearly|annual)',
-            r'(billed\s+(?:monthly|yearly|annually))'
-        ]
-        
-        for pattern in billing_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            pricing_data['billing_periods'].extend(matches)
-        
-        # Look for discounts like "20% off" or "save 15%"
-        discount_patterns = [
-            r'(\d+)%\s*(?:off|discount)',
-            r'save\s*(\d+)%',
-            r'(\d+)\s*(?:percent|%)\s*(?:off|discount)'
-        ]
-        
-        for pattern in discount_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            pricing_data['discounts'].extend(matches)
-        
-        # Look for free trials like "14 day free trial"
-        trial_patterns = [
-            r'(\d+)\s*(?:day|week|month)s?\s*(?:free|trial)',
-            r'free\s*(?:trial|for)\s*(\d+)\s*(?:day|week|month)s?',
-            r'(\d+)\s*(?:day|week|month)s?\s*(?:trial|free)'
-        ]
-        
-        for pattern in trial_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            pricing_data['free_trials'].extend(matches)
-        
-        # Get rid of duplicates and keep only the first 10 plans
-        # Remove duplicate prices (based on amount and currency)
-        unique_prices = []
-        seen_prices = set()
-        for price_info in pricing_data['prices']:
-            price_key = (price_info['amount'], price_info['currency'])
-            if price_key not in seen_prices:
-                unique_prices.append(price_info)
-                seen_prices.add(price_key)
-        pricing_data['prices'] = unique_prices[:20]  # Keep up to 20 unique prices
+        # Get rid of duplicates
+        pricing_data['prices'] = pricing_data['prices'][:20]  # Keep up to 20 unique prices
+        pricing_data['truncated'] = page.truncated  # Only part of a huge page was searched
         
-        pricing_data['plans'] = list(set(pricing_data['plans']))[:10]  # Don't keep too many plans
         pricing_data['billing_periods'] = list(set(pricing_data['billing_periods']))
         pricing_data['discounts'] = list(set(pricing_data['discounts']))
         pricing_data['free_trials'] = list(set(pricing_data['free_trials']))
@@ -197,11 +140,11 @@ class PriceStockScraper:
         return pricing_data
     
     def extract_availability_data(self, html_content, url):
-        """Check B2B availability and service status"""
-        if not html_content:
+        """Check B2B availability and service status (html_content may be raw HTML or a shared ParsedPage)"""
+        page = ParsedPage.of(html_content, url)
+        if not page.html:
             return {}
             
-        soup = BeautifulSoup(html_content, 'html.parser')
         availability_data = {
             'service_status': [],
             'availability_indicators': [],
@@ -209,114 +152,61 @@ class PriceStockScraper:
             'contact_requirements': []
         }
         
-        # Look for B2B service availability patterns
-        availability_patterns = [
-            r'(?:available\s*now|ready\s*for\s*deployment|live\s*service)',
-            r'(?:coming\s*soon|beta|preview|early\s*access)',
-            r'(?:contact\s*sales|request\s*demo|schedule\s*call)',
-            r'(?:enterprise\s*ready|production\s*ready|scalable)'
-        ]
-        
-        text_content = soup.get_text()
-        
-        for pattern in availability_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            availability_data['service_status'].extend(matches)
-        
-        # Look for deployment and service options
-        deployment_patterns = [
-            r'(?:cloud|saas|on-premise|hybrid|self-hosted)',
-            r'(?:api\s*access|sdk|integration|webhook)',
-            r'(?:white-label|custom\s*deployment|dedicated)'
-        ]
-        
-        for pattern in deployment_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            availability_data['deployment_options'].extend(matches)
-        
-        # Look for contact requirements (B2B sales process)
-        contact_patterns = [
-            r'(?:contact\s*sales|speak\s*to\s*sales|sales\s*team)',
-            r'(?:request\s*quote|get\s*quote|custom\s*pricing)',
-            r'(?:enterprise\s*contact|business\s*inquiry)'
-        ]
-        
-        for pattern in contact_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            availability_data['contact_requirements'].extend(matches)
-        
-        # Get rid of duplicates
-        availability_data['service_status'] = list(set(availability_data['service_status']))
-        availability_data['deployment_options'] = list(set(availability_data['deployment_options']))
-        availability_data['contact_requirements'] = list(set(availability_data['contact_requirements']))
+        # Service status, deployment and sales-contact terms come from rules/availability.json,
+        # found by the page's single rule-pack scan
+        matches = page.keyword_matches
+        availability_data['service_status'] = rule_texts(matches, 'availability.service_status')
+        availability_data['deployment_options'] = rule_texts(matches, 'availability.deployment_options')
+        availability_data['contact_requirements'] = rule_texts(matches, 'availability.contact_requirements')
         
         return availability_data
     
-    async def scrape_pricing_page(self, company_name, url):
+    async def scrape_pricing_page(self, company_name, url, session=None):
         """Go to a webpage and grab all the pricing info"""
         try:
             print(f"💰 Scraping pricing data from: {url}")
             
-            async with AsyncWebCrawler(verbose=True) as crawler:
-                result = await crawler.arun(
-                    url=url,
-                    word_count_threshold=10,
-                    extraction_strategy="LLMExtractionStrategy",
-                    chunking_strategy="RegexChunking",
-                    bypass_cache=True
-                )
-                
-                if not result.success:
-                    print(f"❌ Failed to scrape {url}: {result.error_message}")
-                    return None
-                
-                print(f"✅ Successfully scraped pricing page")
-                
-                # Get the prices and availability info from the page
-                pricing_data = self.extract_pricing_data(result.cleaned_html, url)
-                availability_data = self.extract_availability_data(result.cleaned_html, url)
-                
-                # Put everything together
-                page_data = {
-                    "url": url,
-                    "scraped_at": datetime.now().isoformat(),
-                    "pricing": pricing_data,
-                    "availability": availability_data,
-                    "raw_content_length": len(result.cleaned_html)
-                }
-                
-                return page_data
+            result = await crawl_page(url, session, consumer_key(company_name, 'pricing'), 'seo')
+            
+            if not result.success:
+                print(f"❌ Failed to scrape {url}: {result.error_message}")
+                return None
+            
+            # Nothing changed since the last save, so skip extraction entirely
+            if result.not_modified or result.unchanged:
+                print(f"♻️ Unchanged since last scrape: {url}")
+                return {"url": url, "unchanged": True}
+            
+            print(f"✅ Successfully scraped pricing page")
+            
+            # Get the prices and availability info from the page
+            pricing_data, availability_data = await run_extraction(session, extract_pricing_page, result.cleaned_html, url)
+            
+            # Put everything together
+            page_data = {
+                "url": url,
+                "scraped_at": datetime.now().isoformat(),
+                "pricing": pricing_data,
+                "availability": availability_data,
+                "raw_content_length": len(result.cleaned_html),
+                "content_hash": result.content_hash,
+                "truncated": result.truncated or pricing_data.get('truncated')
+            }
+            
+            return page_data
                 
         except Exception as e:
             print(f"❌ Error scraping pricing page {url}: {e}")
             return None
     
     def save_pricing_data(self, company_name, pricing_data):
-        """Save the pricing info to a file"""
+        """Save the pricing info to the company store"""
         try:
-            company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-            
-            if not company_file.exists():
-                print(f"❌ Company file not found: {company_file}")
+            # Each save adds a snapshot, so earlier prices stay queryable
+            if not self.store.save_pricing(company_name, pricing_data):
                 return False
-                
-            # Get the existing data
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Make sure we have a place to put pricing data
-            if 'pricing_data' not in data:
-                data['pricing_data'] = {}
             
-            # Add the new pricing data
-            data['pricing_data'].update(pricing_data)
-            data['last_updated'] = datetime.now().isoformat()
-            
-            # Save it back to the file
-            with open(company_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 Pricing data saved to: {company_file}")
+            print(f"💾 Pricing data saved to: {self.store.db_path}")
             return True
             
         except Exception as e:
@@ -329,19 +219,28 @@ class PriceStockScraper:
         print(f"🌐 URL: {url}")
         print("-" * 50)
         
-        # Go get the pricing info
-        page_data = await self.scrape_pricing_page(company_name, url)
+        # One page isn't worth starting extraction worker processes for
+        async with CrawlerSession(extraction_workers=0) as session:
+            # Go get the pricing info
+            page_data = await self.scrape_pricing_page(company_name, url, session)
         
-        if not page_data:
-            print("❌ Scraping failed. No data to save.")
-            return False
+            if not page_data:
+                print("❌ Scraping failed. No data to save.")
+                return False
+            
+            if page_data.get("unchanged"):
+                print(f"✅ Stored pricing data for {company_name} is already up to date")
+                return True
+        
+            # Make a name for this page
+            page_id = self.create_page_id(url)
         
-        # Make a name for this page
-        page_id = self.create_page_id(url)
+            # Save everything
+            pricing_data = {page_id: page_data}
+            success = self.save_pricing_data(company_name, pricing_data)
         
-        # Save everything
-        pricing_data = {page_id: page_data}
-        success = self.save_pricing_data(company_name, pricing_data)
+            if success:
+                session.cache.mark_processed(url, consumer_key(company_name, 'pricing'), page_data["content_hash"])
         
         if success:
             print(f"✅ Pricing scraping completed for {company_name}")
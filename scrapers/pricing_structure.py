@@ -0,0 +1,321 @@
+"""
+Structured pricing: plan -> price from JSON-LD offers and HTML pricing cards/tables
+"""
+
+import re
+from scrapers.price_lexer import tokenize_prices, normalize_word, PERIOD_WORDS, UNIT_WORDS
+
+PRODUCT_TYPES = {'Product', 'Service', 'SoftwareApplication', 'WebApplication', 'MobileApplication', 'IndividualProduct'}
+OFFER_TYPES = {'Offer', 'AggregateOffer'}
+PRICE_SPEC_TYPES = {'PriceSpecification', 'UnitPriceSpecification', 'CompoundPriceSpecification'}
+
+# UN/CEFACT unit codes and ISO 8601 durations used for billing periods in schema.org markup
+JSON_LD_PERIODS = {
+    'MON': 'month', 'ANN': 'year', 'WEE': 'week', 'DAY': 'day',
+    'P1M': 'month', 'P1Y': 'year', 'P12M': 'year', 'P1W': 'week', 'P1D': 'day'
+}
+
+# Whole class words (split on -, _, spaces and camelCase) that mark a candidate pricing card or a wrapper around cards;
+# substrings don't count, so 'planet', 'explanation' and 'frontier' aren't cards
+CARD_CLASS_WORDS = frozenset({'plan', 'plans', 'pricing', 'tier', 'tiers', 'package', 'packages', 'subscription', 'subscriptions', 'pricecard'})
+# Words that only mark a card together (price-card, price_card, priceCard)
+CARD_CLASS_PAIRS = frozenset({('price', 'card')})
+CLASS_WORD_SPLIT = re.compile(r'[\s_-]+')
+CAMEL_CASE_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+AMOUNT_PATTERN = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?')
+
+def json_type(node):
+    types = node.get('@type', [])
+    return set(types) if isinstance(types, list) else {types}
+
+def iter_json_nodes(data):
+    """Every dict in a JSON-LD document, including @graph members and nested values"""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            yield item
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+def parse_amount(value):
+    """49, '49.00', '$1,299' -> float (None if there's no number)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = AMOUNT_PATTERN.search(value)
+        if match:
+            return float(match.group(0).replace(',', ''))
+    return None
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def spec_period_and_unit(spec):
+    """Billing period and per-unit from a price specification (unitCode, billingDuration, unitText, referenceQuantity)"""
+    period = None
+    unit = None
+    for key in ('billingDuration', 'unitCode'):
+        value = spec.get(key)
+        if isinstance(value, str) and value.upper() in JSON_LD_PERIODS:
+            period = JSON_LD_PERIODS[value.upper()]
+    reference = spec.get('referenceQuantity')
+    if isinstance(reference, dict):
+        code = str(reference.get('unitCode', '')).upper()
+        period = period or JSON_LD_PERIODS.get(code)
+    unit_text = spec.get('unitText')
+    if isinstance(unit_text, str):
+        for word in re.findall(r'[a-z]+', unit_text.lower()):
+            period = period or normalize_word(word, PERIOD_WORDS)
+            unit = unit or normalize_word(word, UNIT_WORDS)
+    return period, unit
+
+def offer_plan(offer, product_name=None):
+    """(plan name, price info) for one Offer, or None if it has no price"""
+    name = offer.get('name') or product_name
+    item = offer.get('itemOffered')
+    if not name and isinstance(item, dict):
+        name = item.get('name')
+
+    amount = parse_amount(offer.get('price', offer.get('lowPrice')))
+    currency = offer.get('priceCurrency')
+    period, unit = spec_period_and_unit(offer)
+    for spec in as_list(offer.get('priceSpecification')):
+        if not isinstance(spec, dict):
+            continue
+        spec_amount = parse_amount(spec.get('price', spec.get('minPrice')))
+        if amount is None and spec_amount is not None:
+            amount = spec_amount
+        currency = currency or spec.get('priceCurrency')
+        spec_period, spec_unit = spec_period_and_unit(spec)
+        period = period or spec_period
+        unit = unit or spec_unit
+
+    if amount is None:
+        return None
+    return str(name or 'Offer').strip(), {
+        'amount': amount,
+        'currency': currency.upper() if isinstance(currency, str) else None,
+        'period': period,
+        'unit': unit,
+        'source': 'json-ld'
+    }
+
+def mark_read(offer, seen_offers):
+    """Remember an offer and its price specifications so the walk doesn't read them again"""
+    seen_offers.add(id(offer))
+    for spec in as_list(offer.get('priceSpecification')):
+        seen_offers.add(id(spec))
+
+def price_label(info):
+    """'49 USD/month per user': tells apart offers that share a name"""
+    label = f"{info['amount']:g}" + (f" {info['currency']}" if info['currency'] else '')
+    label += f"/{info['period']}" if info['period'] else ''
+    return label + (f" per {info['unit']}" if info['unit'] else '')
+
+def json_ld_plans(blocks):
+    """plan name -> price info from Product/Offer/PriceSpecification JSON-LD blocks
+
+    Offers that share a name (monthly and yearly offers of one product, say) are kept apart
+    as 'Name (price)'; only exact repeats are dropped.
+    """
+    plans = {}
+    seen_offers = set()
+
+    def add(result):
+        if not result:
+            return
+        name, info = result
+        if plans.get(name) == info:
+            return
+        if name in plans:
+            base = name = f"{name} ({price_label(info)})"
+            position = 2
+            while name in plans:
+                if plans[name] == info:
+                    return
+                name = f"{base} #{position}"
+                position += 1
+        plans[name] = info
+
+    for block in blocks:
+        for node in iter_json_nodes(block):
+            types = json_type(node)
+            if types & PRODUCT_TYPES:
+                for offer in as_list(node.get('offers')):
+                    if isinstance(offer, dict) and id(offer) not in seen_offers:
+                        mark_read(offer, seen_offers)
+                        add(offer_plan(offer, node.get('name')))
+            elif types & OFFER_TYPES and id(node) not in seen_offers:
+                mark_read(node, seen_offers)
+                add(offer_plan(node))
+            elif types & PRICE_SPEC_TYPES and id(node) not in seen_offers:
+                # A bare price specification (not inside an offer we've already read)
+                seen_offers.add(id(node))
+                add(offer_plan({'name': node.get('name'), 'priceSpecification': node}))
+    return plans
+
+def node_text(element):
+    """Text of an element with a space between text nodes, so 'Pro' and '$49' don't run together"""
+    return ' '.join(text.strip() for text in element.xpath('.//text()[not(ancestor::script or ancestor::style)]') if text.strip())
+
+def token_price(token, source):
+    return {'amount': token.amount, 'currency': token.currency, 'period': token.period, 'unit': token.unit, 'source': source}
+
+def card_name(card, text):
+    """A card's plan name: its first heading, else an element whose class says name/title, else its first words"""
+    for element in card.iter(*HEADING_TAGS):
+        name = node_text(element)
+        if name:
+            return name[:80]
+    for element in card.iter():
+        classes = (element.get('class') or '').lower() if isinstance(element.tag, str) else ''
+        if element is not card and ('name' in classes or 'title' in classes):
+            name = node_text(element)
+            if name:
+                return name[:80]
+    return ' '.join(text.split()[:4])
+
+def is_card_class(classes):
+    """True if a class attribute names a pricing card by whole words"""
+    words = [word for word in CLASS_WORD_SPLIT.split(CAMEL_CASE_BOUNDARY.sub(' ', classes).lower()) if word]
+    return any(word in CARD_CLASS_WORDS for word in words) or any(pair in CARD_CLASS_PAIRS for pair in zip(words, words[1:]))
+
+def html_plans(page):
+    """plan name -> price info from pricing tables and pricing cards, plus the texts read
+
+    One walk over the document collects candidate cards (elements with a plan/pricing/tier class)
+    and tables. A card is the largest candidate holding exactly one priced plan: a wrapper around
+    several plans and a price badge inside one plan are both skipped.
+    """
+    if page.tree is None:
+        return {}, []
+
+    cards = []
+    tables = []
+    for element in page.tree.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if element.tag == 'table':
+            tables.append(element)
+            continue
+        classes = element.get('class') or ''
+        if classes and is_card_class(classes):
+            cards.append(element)
+
+    plans = {}
+    texts = []
+
+    # Pricing tables: plan names across the header row, the first row with prices under them
+    for table in tables:
+        rows = [row for row in table.iter('tr')]
+        if len(rows) < 2:
+            continue
+        names = [node_text(cell) for cell in rows[0] if isinstance(cell.tag, str)]
+        for row in rows[1:]:
+            cells = [cell for cell in row if isinstance(cell.tag, str)]
+            prices = {}
+            for index, cell in enumerate(cells):
+                tokens = [token for token in tokenize_prices(node_text(cell)) if token.kind == 'price']
+                if tokens and index < len(names) and names[index]:
+                    prices[names[index][:80]] = token_price(tokens[0], 'table')
+            if len(prices) >= 2:
+                for name, info in prices.items():
+                    plans.setdefault(name, info)
+                texts.append(node_text(table))
+                break
+
+    # Pricing cards: count the separately priced plans under each candidate, innermost first
+    # (reversed document order visits descendants before their ancestors)
+    candidates = set(cards)
+    parents = {}
+    for card in cards:
+        parents[card] = next((ancestor for ancestor in card.iterancestors() if ancestor in candidates), None)
+    units = {card: 0 for card in cards}
+    card_texts = {}
+    card_tokens = {}
+    for card in reversed(cards):
+        if units[card] == 0:
+            text = node_text(card)
+            tokens = tokenize_prices(text)
+            if any(token.kind in ('price', 'quote') for token in tokens):
+                units[card] = 1
+                card_texts[card] = text
+                card_tokens[card] = tokens
+        if parents[card] is not None:
+            units[parents[card]] += units[card]
+
+    for card in cards:
+        parent = parents[card]
+        if units[card] != 1 or (parent is not None and units[parent] == 1):
+            continue
+        text = card_texts.get(card) or node_text(card)
+        tokens = card_tokens.get(card) or tokenize_prices(text)
+        name = card_name(card, text)
+        if name in plans:
+            continue
+        price_tokens = [token for token in tokens if token.kind == 'price']
+        if price_tokens:
+            plans[name] = token_price(price_tokens[0], 'card')
+        else:
+            plans[name] = {'amount': None, 'currency': None, 'period': None, 'unit': None, 'source': 'card', 'custom': True}
+        texts.append(text)
+
+    return plans, texts
+
+def structured_plans(page):
+    """(plan name -> price info, where it came from, texts worth scanning for trials/discounts)
+
+    JSON-LD offers win; otherwise pricing tables and cards. Returns ({}, None, []) when the page
+    has neither, and the caller falls back to scanning the whole text.
+    """
+    plans = json_ld_plans(page.json_ld)
+    if plans:
+        return plans, 'json-ld', []
+    plans, texts = html_plans(page)
+    # A pricing page has at least one plan with an actual price
+    if any(info.get('amount') is not None for info in plans.values()):
+        return plans, 'html', texts
+    return {}, None, []
+
+# Test function
+def test_pricing_structure():
+    """Read plans from JSON-LD and from nested pricing cards"""
+    from scrapers.parsed_page import ParsedPage
+
+    json_ld_page = ParsedPage("""<html><head><script type="application/ld+json">
+    {"@context": "https://schema.org", "@type": "Product", "name": "Acme Cloud",
+     "offers": [{"@type": "Offer", "name": "Starter", "price": "19.00", "priceCurrency": "USD",
+                 "priceSpecification": {"@type": "UnitPriceSpecification", "price": 19, "priceCurrency": "USD",
+                                        "unitText": "per user per month"}},
+                {"@type": "Offer", "name": "Business", "price": 49, "priceCurrency": "EUR",
+                 "priceSpecification": {"@type": "UnitPriceSpecification", "billingDuration": "P1Y"}}]}
+    </script></head><body><p>Our prices: $19, $49, $5 add-ons, $1,000 credits</p></body></html>""")
+
+    cards_page = ParsedPage("""<html><body><div class="pricing-section">
+    <div class="plan-card"><h3>Free</h3><p>$0 / month</p></div>
+    <div class="plan-card"><h3>Pro</h3><div class="plan-price">$29 per seat per month</div></div>
+    <div class="plan-card"><h3>Enterprise</h3><p>Contact sales</p></div>
+    </div></body></html>""")
+
+    # Two offers with the same name must both survive
+    same_name_page = ParsedPage("""<html><head><script type="application/ld+json">
+    {"@type": "Product", "name": "Acme Cloud", "offers": [
+        {"@type": "Offer", "name": "Pro", "price": 29, "priceCurrency": "USD", "priceSpecification": {"unitCode": "MON"}},
+        {"@type": "Offer", "name": "Pro", "price": 290, "priceCurrency": "USD", "priceSpecification": {"unitCode": "ANN"}}]}
+    </script></head><body></body></html>""")
+
+    for label, page in (("JSON-LD", json_ld_page), ("Cards", cards_page), ("Same-name offers", same_name_page)):
+        plans, source, _ = structured_plans(page)
+        print(f"🧾 {label} ({source}):")
+        for name, info in plans.items():
+            print(f"   {name}: {info['amount']} {info['currency']} /{info['unit'] or '-'} /{info['period'] or '-'}")
+    return structured_plans(cards_page)[0]
+
+if __name__ == "__main__":
+    test_pricing_structure()
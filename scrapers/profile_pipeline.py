@@ -0,0 +1,233 @@
+"""
+Profile a URL in one pass: fetch once, run every extractor on the same HTML
+"""
+
+import asyncio
+from datetime import datetime
+from scrapers.crawler_session import CrawlerSession, crawl_page, run_extraction
+from scrapers.homepage_scraper import HomepageScraper, clean_page_content
+from scrapers.price_stock_scraper import PriceStockScraper
+from scrapers.meta_seo_scraper import MetaSEOScraper
+from scrapers.parsed_page import ParsedPage
+from utils.http_cache import consumer_key
+
+# Default extractors are module-level so they can run together in the session's process pool
+def extract_page_content(html_content, url, results):
+    return clean_page_content(html_content)[0]
+
+def extract_pricing(html_content, url, results):
+    return PriceStockScraper().extract_pricing_data(html_content, url)
+
+def extract_availability(html_content, url, results):
+    return PriceStockScraper().extract_availability_data(html_content, url)
+
+def extract_meta_tags(html_content, url, results):
+    return MetaSEOScraper().extract_meta_tags(html_content, url)
+
+def extract_seo_analysis(html_content, url, results):
+    return MetaSEOScraper().calculate_b2b_seo_score(results['meta_tags'], html_content, url)
+
+DEFAULT_EXTRACTORS = {
+    'content': extract_page_content,
+    'pricing': extract_pricing,
+    'availability': extract_availability,
+    'meta_tags': extract_meta_tags,
+    'seo_analysis': extract_seo_analysis
+}
+
+def run_default_extractors(html_content, url, names):
+    """Process-pool task: run the named default extractors on one shared parse of the page
+
+    Returns (results, errors, stats); stats['parses'] should always be 1 and stats['truncated']
+    says whether the page was too big to parse whole.
+    """
+    page = ParsedPage(html_content, url)
+    results = {}
+    errors = {}
+    for name in names:
+        try:
+            results[name] = DEFAULT_EXTRACTORS[name](page, url, results)
+        except Exception as e:
+            errors[name] = str(e)
+            results[name] = None
+    return results, errors, {'parses': page.parse_count, 'truncated': page.truncated}
+
+class ProfilePipeline:
+    def __init__(self):
+        self.homepage_scraper = HomepageScraper()
+        self.store = self.homepage_scraper.store
+        # One connection for every save the pipeline makes
+        self.price_scraper = PriceStockScraper(store=self.store)
+        self.seo_scraper = MetaSEOScraper(store=self.store)
+
+        # Extractors each get (html, url, results so far). The defaults run together in the
+        # process pool on one shared ParsedPage; extractors registered later run in-process
+        # after them and get the raw HTML.
+        self.extractors = dict(DEFAULT_EXTRACTORS)
+
+    def register_extractor(self, name, extractor):
+        """Add (or replace) an extractor that runs on every profiled page"""
+        self.extractors[name] = extractor
+
+    async def run_extractors(self, html_content, url, session=None):
+        """Run all registered extractors on one copy of the page HTML; returns (results, stats)"""
+        defaults = [name for name, extractor in self.extractors.items() if DEFAULT_EXTRACTORS.get(name) is extractor]
+        results, errors, stats = await run_extraction(session, run_default_extractors, html_content, url, defaults)
+        print(f"   🧮 {len(defaults)} extractors, {stats['parses']} HTML parse{'s' if stats['parses'] != 1 else ''}")
+        for name, error in errors.items():
+            print(f"   ⚠️ Extractor '{name}' failed: {error}")
+
+        for name, extractor in self.extractors.items():
+            if name in results:
+                continue
+            try:
+                results[name] = extractor(html_content, url, results)
+            except Exception as e:
+                print(f"   ⚠️ Extractor '{name}' failed: {e}")
+                results[name] = None
+        return results, stats
+
+    async def profile_url(self, company_name, url, session=None):
+        """Fetch the page once and build homepage/feature, pricing and SEO entries from it"""
+        try:
+            print(f"🧬 Profiling: {url}")
+
+            result = await crawl_page(url, session, consumer_key(company_name, 'profile'), 'seo')
+
+            if not result.success:
+                print(f"❌ Failed to fetch {url}: {result.error_message}")
+                return None
+
+            # Nothing changed since the last save, so skip every extractor
+            if result.not_modified or result.unchanged:
+                print(f"♻️ Unchanged since last profile: {url}")
+                return {"url": url, "unchanged": True}
+
+            print(f"✅ Fetched {url} once ({len(result.cleaned_html)} characters)")
+
+            results, stats = await self.run_extractors(result.cleaned_html, url, session)
+            scraped_at = datetime.now().isoformat()
+            raw_content_length = len(result.cleaned_html)
+            clean_content = results.get('content') or ""
+
+            return {
+                "url": url,
+                "scraped_at": scraped_at,
+                "raw_content_length": raw_content_length,
+                "content_hash": result.content_hash,
+                "truncated": result.truncated or stats['truncated'],
+                "content": clean_content,
+                "clean_content_length": len(clean_content),
+                "pricing": results.get('pricing') or {},
+                "availability": results.get('availability') or {},
+                "meta_tags": results.get('meta_tags') or {},
+                "seo_analysis": results.get('seo_analysis') or {},
+                "extras": {name: value for name, value in results.items()
+                           if name not in ('content', 'pricing', 'availability', 'meta_tags', 'seo_analysis')}
+            }
+
+        except Exception as e:
+            print(f"❌ Error profiling {url}: {e}")
+            return None
+
+    def save_profile_data(self, company_name, profile, as_homepage=False):
+        """Write the page, pricing and SEO entries to the company store in one transaction"""
+        try:
+            url = profile["url"]
+            page_id = self.seo_scraper.create_page_id(url)
+
+            # Page content goes where options 2 and 3 would have put it
+            if as_homepage:
+                page = {
+                    "url": url,
+                    "content": profile["content"],
+                    "scraped_at": profile["scraped_at"],
+                    "raw_content_length": profile["raw_content_length"],
+                    "clean_content_length": profile["clean_content_length"],
+                    "content_hash": profile["content_hash"],
+                    "truncated": profile["truncated"]
+                }
+            else:
+                page = {
+                    "url": url,
+                    "content": profile["content"],
+                    "scraped_at": profile["scraped_at"],
+                    "content_length": profile["clean_content_length"],
+                    "content_hash": profile["content_hash"],
+                    "truncated": profile["truncated"]
+                }
+
+            # Same shape as option 5
+            pricing = {
+                "url": url,
+                "scraped_at": profile["scraped_at"],
+                "pricing": profile["pricing"],
+                "availability": profile["availability"],
+                "raw_content_length": profile["raw_content_length"],
+                "content_hash": profile["content_hash"],
+                "truncated": profile["truncated"]
+            }
+
+            # Same shape as option 6
+            seo = {
+                "url": url,
+                "scraped_at": profile["scraped_at"],
+                "meta_tags": profile["meta_tags"],
+                "seo_analysis": profile["seo_analysis"],
+                "raw_content_length": profile["raw_content_length"],
+                "content_hash": profile["content_hash"],
+                "truncated": profile["truncated"]
+            }
+
+            page_kind = 'homepage' if as_homepage else 'feature'
+            if not self.store.save_profile(company_name, page_id, page_kind, page, pricing, seo, profile.get("extras")):
+                return False
+
+            print(f"💾 Profile data saved to: {self.store.db_path}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error saving profile data: {e}")
+            return False
+
+    async def profile_and_save(self, company_name, url, as_homepage=False):
+        """Do everything: one fetch, all extractors, one save"""
+        print(f"\n🧬 Profiling URL for: {company_name}")
+        print(f"🌐 URL: {url}")
+        print("-" * 50)
+
+        # One page isn't worth starting extraction worker processes for
+        async with CrawlerSession(extraction_workers=0) as session:
+            profile = await self.profile_url(company_name, url, session)
+
+            if not profile:
+                print("❌ Profiling failed. No data to save.")
+                return False
+
+            if profile.get("unchanged"):
+                print(f"✅ Stored profile for {company_name} is already up to date")
+                return True
+
+            success = self.save_profile_data(company_name, profile, as_homepage)
+            if success:
+                session.cache.mark_processed(url, consumer_key(company_name, 'profile'), profile["content_hash"])
+
+        if success:
+            print(f"✅ Profile completed for {company_name}")
+            print(f"🧹 Content: {profile['clean_content_length']} characters")
+            print(f"💰 Found {len(profile['pricing'].get('prices', []))} prices")
+            print(f"📊 SEO Score: {profile['seo_analysis'].get('score', 'N/A')}/100 (Grade: {profile['seo_analysis'].get('grade', 'N/A')})")
+        else:
+            print(f"❌ Failed to save profile data for {company_name}")
+
+        return success
+
+# Test function
+async def test_profile_pipeline():
+    """Try it out with a test website"""
+    pipeline = ProfilePipeline()
+    success = await pipeline.profile_and_save("TestCompany", "https://stripe.com/pricing")
+    return success
+
+if __name__ == "__main__":
+    asyncio.run(test_profile_pipeline())
@@ -0,0 +1,131 @@
+"""
+Render profiles: what the shared browser is allowed to download for each kind of scrape
+"""
+
+from collections import namedtuple
+from urllib.parse import urlparse
+from crawl4ai import BrowserConfig, CrawlerRunConfig, CacheMode
+
+# blocked_types are Playwright resource types; blocked_hosts match a third-party request host or any of its subdomains
+RenderProfile = namedtuple('RenderProfile', ['name', 'blocked_types', 'block_third_party_scripts', 'blocked_hosts', 'wait_until'])
+
+# Analytics, ad and session-replay hosts: never part of what we read
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googlesyndication.com', 'doubleclick.net', 'adservice.google.com',
+    'facebook.net', 'connect.facebook.net', 'analytics.twitter.com', 'ads-twitter.com', 'ads.linkedin.com',
+    'hotjar.com', 'clarity.ms', 'fullstory.com', 'mixpanel.com', 'segment.com', 'segment.io', 'amplitude.com',
+    'heap.io', 'heapanalytics.com', 'mouseflow.com', 'quantserve.com', 'scorecardresearch.com', 'bat.bing.com',
+    'hs-analytics.net', 'hs-banner.com', 'munchkin.marketo.net', 'cookielaw.org', 'onetrust.com', 'cookiebot.com'
+)
+
+# Chat and support widgets, video embeds
+WIDGET_HOSTS = (
+    'intercom.io', 'intercomcdn.com', 'drift.com', 'driftt.com', 'crisp.chat', 'zdassets.com', 'zopim.com',
+    'tawk.to', 'livechatinc.com', 'hubspot.com', 'hs-scripts.com', 'usemessages.com', 'olark.com',
+    'youtube.com', 'ytimg.com', 'vimeo.com', 'vimeocdn.com', 'wistia.com', 'wistia.net', 'loom.com'
+)
+
+HEAVY_TYPES = frozenset({'image', 'media', 'font'})
+
+RENDER_PROFILES = {
+    # Visible text only: no images, media, fonts or scripts from other sites
+    'text-only': RenderProfile('text-only', HEAVY_TYPES, True, TRACKER_HOSTS + WIDGET_HOSTS, 'domcontentloaded'),
+    # Meta tags and JSON-LD are sometimes injected by tag managers, and prices by billing widgets,
+    # so third-party scripts still run; only trackers and widgets are cut
+    'seo': RenderProfile('seo', HEAVY_TYPES, False, TRACKER_HOSTS + WIDGET_HOSTS, 'domcontentloaded'),
+    # Everything, waiting for the load event: the fallback when a lean render comes back empty
+    'full': RenderProfile('full', frozenset(), False, (), 'load'),
+}
+
+DEFAULT_PROFILE = 'full'
+
+def browser_config(verbose=True):
+    """The one browser every scraper shares; profiles only differ per page"""
+    return BrowserConfig(headless=True, verbose=verbose)
+
+def run_config(profile_name):
+    """Per-page crawl settings for a profile (the profile name travels to the page hook in shared_data)"""
+    profile = RENDER_PROFILES[profile_name]
+    return CrawlerRunConfig(
+        word_count_threshold=10,
+        cache_mode=CacheMode.BYPASS,
+        wait_until=profile.wait_until,
+        shared_data={'render_profile': profile.name},
+        verbose=False
+    )
+
+def site_of(host):
+    """Registrable part of a host name, near enough: 'www.acme.com' and 'cdn.acme.com' -> 'acme.com'"""
+    labels = (host or '').lower().split(':')[0].split('.')
+    # acme.co.uk, acme.com.au
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in ('co', 'com', 'org', 'net', 'ac', 'gov'):
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def host_matches(host, hosts):
+    host = (host or '').lower()
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in hosts)
+
+def should_block(profile, resource_type, request_url, page_url):
+    """True if a request made while rendering page_url isn't needed under the profile"""
+    if resource_type == 'document':
+        return False
+    if resource_type in profile.blocked_types:
+        return True
+    host = urlparse(request_url).hostname
+    if site_of(host) == site_of(urlparse(page_url).hostname):
+        return False
+    return host_matches(host, profile.blocked_hosts) or (profile.block_third_party_scripts and resource_type == 'script')
+
+async def apply_render_profile(page, context=None, config=None, **kwargs):
+    """crawl4ai on_page_context_created hook: route the page's requests through its profile
+
+    The route is installed once per page and reads the page's current profile, so a page reused
+    for a later crawl follows that crawl's profile.
+    """
+    shared_data = getattr(config, 'shared_data', None) or {}
+    page._render_profile = RENDER_PROFILES.get(shared_data.get('render_profile'), RENDER_PROFILES[DEFAULT_PROFILE])
+    page._render_blocked = 0
+    if getattr(page, '_render_routed', False):
+        return page
+
+    async def route_request(route):
+        request = route.request
+        profile = page._render_profile
+        # Page URL is the navigation target until the main document commits
+        page_url = page.url if page.url and page.url != 'about:blank' else request.url
+        if should_block(profile, request.resource_type, request.url, page_url):
+            page._render_blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route('**/*', route_request)
+    page._render_routed = True
+    return page
+
+# Test function
+def test_render_profiles():
+    """Which requests of a typical marketing page each profile lets through"""
+    page_url = "https://www.acme.com/pricing"
+    requests_made = [
+        ("document", "https://www.acme.com/pricing"),
+        ("script", "https://www.acme.com/static/app.js"),
+        ("script", "https://cdn.acme.com/bundle.js"),
+        ("script", "https://www.googletagmanager.com/gtm.js"),
+        ("script", "https://js.intercomcdn.com/frame.js"),
+        ("xhr", "https://api-js.mixpanel.com/track"),
+        ("image", "https://www.acme.com/hero.png"),
+        ("font", "https://fonts.gstatic.com/inter.woff2"),
+        ("stylesheet", "https://www.acme.com/site.css"),
+        ("fetch", "https://www.acme.com/api/plans"),
+    ]
+    for name, profile in RENDER_PROFILES.items():
+        allowed = [url for resource_type, url in requests_made if not should_block(profile, resource_type, url, page_url)]
+        print(f"🎛️ {name}: {len(allowed)}/{len(requests_made)} requests allowed")
+        for url in allowed:
+            print(f"   ✅ {url}")
+    return RENDER_PROFILES
+
+if __name__ == "__main__":
+    test_render_profiles()
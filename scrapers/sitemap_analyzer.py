@@ -3,166 +3,288 @@ Sitemap analyzer to identify feature-related pages
 """
 
 import asyncio
-import json
 import re
-import xml.etree.ElementTree as ET
 from datetime import datetime
-from pathlib import Path
 from urllib.parse import urljoin, urlparse
-import requests
 from scrapers.homepage_scraper import HomepageScraper
+from scrapers.crawler_session import CrawlerSession
+from scrapers.preflight import Preflight
+from scrapers.sitemap_resolver import SitemapResolver
+from scrapers.url_classifier import URLClassifier
+from scrapers.url_templates import cluster_templates, print_template_summary, sample_per_template, sample_with_budget
+from utils.crawl_journal import CrawlJournal
+from utils.http_cache import HttpCache, consumer_key
+from utils.write_behind import FeatureWriter
+
+def parse_lastmod(value):
+    """Parse a W3C lastmod (or our own scraped_at) into a naive local datetime, or None
+
+    A date-only lastmod counts as the end of that day, so a same-day change is never missed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if len(value.strip()) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
 
 class SitemapAnalyzer:
-    def __init__(self):
-        self.data_dir = Path("data/companies")
+    def __init__(self, max_concurrency=5, per_host_concurrency=2, extraction_workers=None, preflight=True):
         self.scraper = HomepageScraper()
+        self.store = self.scraper.store
+        # How many pages to render at once, overall and against a single host
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        # Processes that clean fetched pages while others are still downloading (default: one per core)
+        self.extraction_workers = extraction_workers
+        # HEAD-check URLs first so PDFs, 404s, login walls and duplicate redirects never reach the browser
+        self.preflight = preflight
+        self.preflight_skips = {}
+        # Revalidation cache shared by the sitemap fetches and the page crawl
+        self.cache = HttpCache()
+        self.unchanged_urls = []
+        # Nested sitemap indexes are resolved concurrently over a pooled session
+        self.resolver = SitemapResolver(cache=self.cache)
+        self.classifier = URLClassifier()
+        self.seen_stored_urls = set()
+        # The running crawl job's journal (frontier and per-URL outcomes), for resuming it later
+        self.journal = None
+        
+    async def filter_urls_by_keywords(self, entries, keywords):
+        """Filter streamed sitemap entries based on keywords, yielding matching entries"""
+        # All keywords are compiled into one pattern; matches are summarized, not printed per URL
+        self.classifier = URLClassifier(keywords)
+        
+        if keywords:
+            print(f"🔍 Filtering URLs with keywords: {keywords}")
         
-    def fetch_sitemap(self, sitemap_url):
-        """Fetch sitemap content"""
+        async for entry in entries:
+            if self.classifier.matches(entry.loc):
+                yield entry
+    
+    async def track_stored_urls(self, entries, stored_features):
+        """Pass entries through, noting which already-stored feature URLs are still in the sitemap"""
+        self.seen_stored_urls = set()
+        async for entry in entries:
+            if entry.loc in stored_features:
+                self.seen_stored_urls.add(entry.loc)
+            yield entry
+    
+    def load_stored_features(self, company_name):
+        """Map URL -> stored feature entry for the company (empty if nothing is stored yet)"""
         try:
-            print(f"📥 Fetching sitemap: {sitemap_url}")
-            response = requests.get(sitemap_url, timeout=30)
-            response.raise_for_status()
-            
-            print(f"✅ Sitemap fetched successfully ({len(response.content)} bytes)")
-            return response.content
-            
+            return self.store.features_by_url(company_name)
         except Exception as e:
-            print(f"❌ Error fetching sitemap: {e}")
-            return None
+            print(f"⚠️ Could not read stored features: {e}")
+            return {}
     
-    def parse_sitemap(self, sitemap_content):
-        """Parse XML sitemap and extract URLs"""
+    def select_changed_urls(self, urls, lastmods, stored_features):
+        """Keep only URLs that are new, or whose sitemap lastmod is after the stored scrape"""
+        new_urls = []
+        changed_urls = []
+        unknown_urls = []
+        unchanged = 0
+        
+        for url in urls:
+            stored = stored_features.get(url)
+            if not stored or stored.get("removed"):
+                new_urls.append(url)
+                continue
+            lastmod = parse_lastmod(lastmods.get(url))
+            scraped_at = parse_lastmod(stored.get("scraped_at"))
+            if lastmod is None or scraped_at is None:
+                # No usable lastmod: fetch it and let the revalidation cache decide
+                unknown_urls.append(url)
+            elif lastmod > scraped_at:
+                changed_urls.append(url)
+            else:
+                unchanged += 1
+        
+        print(f"\n🔁 Incremental refresh:")
+        print(f"   🆕 New: {len(new_urls)}")
+        print(f"   ✏️ Changed since last scrape (lastmod): {len(changed_urls)}")
+        print(f"   ❔ No lastmod, revalidating: {len(unknown_urls)}")
+        print(f"   ⏭️ Unchanged, skipped: {unchanged}")
+        return new_urls + changed_urls + unknown_urls
+    
+    def mark_removed_features(self, company_name, sitemap_url, seen_urls):
+        """Flag stored features from this sitemap that are no longer listed in it"""
         try:
-            root = ET.fromstring(sitemap_content)
-            urls = []
-            
-            # Handle different sitemap formats
-            # Standard sitemap format
-            for url_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-                loc_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                if loc_elem is not None:
-                    urls.append(loc_elem.text)
+            if not self.store.company_exists(company_name):
+                return False
             
-            # Sitemap index format (contains other sitemaps)
-            for sitemap_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap'):
-                loc_elem = sitemap_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                if loc_elem is not None:
-                    # Recursively fetch nested sitemaps
-                    nested_content = self.fetch_sitemap(loc_elem.text)
-                    if nested_content:
-                        nested_urls = self.parse_sitemap(nested_content)
-                        urls.extend(nested_urls)
+            sitemap_host = urlparse(sitemap_url).netloc
+            removed = 0
+            restored = 0
+            changed = {}
+            for page_id, feature in self.store.features(company_name).items():
+                # Features from before sitemap_url was recorded are matched by host
+                source = feature.get("sitemap_url")
+                if source != sitemap_url and (source or urlparse(feature.get("url", "")).netloc != sitemap_host):
+                    continue
+                if feature.get("url") in seen_urls:
+                    if feature.pop("removed", None):
+                        feature.pop("removed_at", None)
+                        changed[page_id] = feature
+                        restored += 1
+                elif not feature.get("removed"):
+                    feature["removed"] = True
+                    feature["removed_at"] = datetime.now().isoformat()
+                    changed[page_id] = feature
+                    removed += 1
             
-            print(f"📊 Found {len(urls)} URLs in sitemap")
-            return urls
+            if not changed:
+                return True
             
-        except ET.ParseError as e:
-            print(f"❌ Error parsing XML sitemap: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Error parsing sitemap: {e}")
-            return []
-    
-    def filter_urls_by_keywords(self, urls, keywords):
-        """Filter URLs based on keywords"""
-        if not keywords:
-            return urls
+            # Only the flipped rows are written
+            self.store.save_features(company_name, changed)
             
-        filtered_urls = []
-        keywords_lower = [kw.lower() for kw in keywords]
-        
-        print(f"🔍 Filtering URLs with keywords: {keywords}")
-        
-        for url in urls:
-            url_lower = url.lower()
-            path = urlparse(url).path.lower()
+            if removed:
+                print(f"🗑️ Marked {removed} feature pages as removed from the sitemap")
+            if restored:
+                print(f"↩️ {restored} previously removed feature pages are back in the sitemap")
+            return True
             
-            # Check if any keyword matches the URL or path
-            for keyword in keywords_lower:
-                if keyword in url_lower or keyword in path:
-                    filtered_urls.append(url)
-                    print(f"   ✅ Match: {url} (keyword: {keyword})")
-                    break
-        
-        print(f"📊 Filtered to {len(filtered_urls)} URLs matching keywords")
-        return filtered_urls
+        except Exception as e:
+            print(f"❌ Error marking removed features: {e}")
+            return False
     
     def categorize_urls(self, urls):
         """Categorize URLs by type"""
-        categories = {
-            'features': [],
-            'products': [],
-            'pricing': [],
-            'customers': [],
-            'faq': [],
-            'api': [],
-            'documentation': [],
-            'other': []
-        }
-        
-        for url in urls:
-            url_lower = url.lower()
-            path = urlparse(url).path.lower()
-            
-            # Categorize based on URL patterns
-            if any(word in url_lower for word in ['feature', 'capability', 'function']):
-                categories['features'].append(url)
-            elif any(word in url_lower for word in ['product', 'service', 'solution']):
-                categories['products'].append(url)
-            elif any(word in url_lower for word in ['pricing', 'price', 'cost', 'plan']):
-                categories['pricing'].append(url)
-            elif any(word in url_lower for word in ['customer', 'customers', 'case-study', 'case-studies', 'success-story', 'success-stories', 'testimonial', 'testimonials', 'stories', 'client', 'clients']):
-                categories['customers'].append(url)
-            elif any(word in url_lower for word in ['faq', 'frequently-asked-questions', 'frequently-asked', 'questions']):
-                categories['faq'].append(url)
-            elif any(word in url_lower for word in ['api', 'developer', 'docs', 'documentation']):
-                categories['api'].append(url)
-            elif any(word in url_lower for word in ['doc', 'guide', 'tutorial', 'help']):
-                categories['documentation'].append(url)
-            else:
-                categories['other'].append(url)
-        
-        return categories
+        return self.classifier.categorize(urls)
     
-    async def scrape_feature_pages(self, company_name, urls):
-        """Scrape multiple feature pages"""
+    async def scrape_feature_pages(self, company_name, urls, max_concurrency=None, per_host_concurrency=None, session=None,
+                                   writer=None, sitemap_url=None, lastmods=None, journal=None):
+        """Scrape multiple feature pages concurrently (bounded globally and per host)
+
+        With a writer (FeatureWriter) each page is handed to it as soon as it's scraped and nothing
+        is kept here, so memory doesn't grow with the crawl; the returned dict is then empty.
+        Without one, all feature entries are returned for the caller to save. A journal gets each
+        unchanged, screened-out and failed URL (saved ones are recorded by whoever commits them).
+        """
+        max_concurrency = max_concurrency or self.max_concurrency
+        per_host_concurrency = per_host_concurrency or self.per_host_concurrency
+        
         print(f"\n🕷️ Scraping {len(urls)} feature pages for {company_name}")
+        print(f"⚙️ Concurrency: {max_concurrency} pages at once, {per_host_concurrency} per host")
         print("-" * 50)
         
-        scraped_data = {}
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits = {}
+        
+        async def scrape_one(url, crawl_url, session):
+            # Take the host slot first so a busy host doesn't hold global slots while it waits
+            host = urlparse(crawl_url).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+            async with host_limit:
+                async with global_limit:
+                    try:
+                        homepage_data = await self.scraper.scrape_homepage(
+                            company_name, crawl_url, session, consumer_key(company_name, 'features')
+                        )
+                        return url, homepage_data, None
+                    except Exception as e:
+                        return url, None, e
+        
+        results = {}
+        self.unchanged_urls = []
+        self.preflight_skips = {}
         successful_scrapes = 0
+        completed = 0
         
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] Scraping: {url}")
+        # One warm browser for the whole batch instead of a launch per page
+        own_session = session is None
+        if own_session:
+            session = CrawlerSession(cache=self.cache, extraction_workers=self.extraction_workers)
+        try:
+            # Cheap HEAD checks decide which URLs are worth a render, and where moved pages now live
+            crawl_urls = {url: url for url in urls}
+            if self.preflight:
+                preflight = Preflight(http=session.http)
+                screened = await preflight.screen(urls)
+                preflight.print_summary(len(urls))
+                crawl_urls = {result.url: result.crawl_url for result in screened if result.action == 'crawl'}
+                self.preflight_skips = dict(preflight.skip_counts)
+                if journal is not None:
+                    for result in screened:
+                        # Server errors go to the browser, so every skip is final
+                        if result.action == 'skip':
+                            journal.completed(result.url, f"skipped: {result.reason}")
             
-            try:
-                # Scrape the page
-                homepage_data = await self.scraper.scrape_homepage(company_name, url)
+            tasks = [asyncio.create_task(scrape_one(url, crawl_url, session)) for url, crawl_url in crawl_urls.items()]
+            
+            # Pages finish out of order, so progress counts completions rather than input position
+            for next_done in asyncio.as_completed(tasks):
+                url, homepage_data, error = await next_done
+                completed += 1
                 
-                if homepage_data:
-                    # Create a feature name from the URL
-                    feature_name = self.create_feature_name(url)
-                    scraped_data[feature_name] = {
-                        "url": url,
-                        "content": homepage_data["content"],
-                        "scraped_at": homepage_data["scraped_at"],
-                        "content_length": homepage_data["clean_content_length"]
-                    }
+                if homepage_data and homepage_data.get("unchanged"):
+                    self.unchanged_urls.append(url)
+                    if journal is not None:
+                        journal.completed(url, "unchanged")
+                    successful_scrapes += 1
+                    print(f"\n[{completed}/{len(tasks)}] ♻️ {url}: unchanged, skipped")
+                elif homepage_data:
+                    if writer is not None:
+                        await writer.add(*self.feature_entry(url, homepage_data, sitemap_url, lastmods))
+                    else:
+                        results[url] = homepage_data
                     successful_scrapes += 1
-                    print(f"   ✅ Success: {homepage_data['clean_content_length']} characters")
+                    print(f"\n[{completed}/{len(tasks)}] ✅ {url}: {homepage_data['clean_content_length']} characters")
+                elif error:
+                    print(f"\n[{completed}/{len(tasks)}] ❌ {url}: {error}")
                 else:
-                    print(f"   ❌ Failed to scrape")
-                    
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
+                    print(f"\n[{completed}/{len(tasks)}] ❌ {url}: failed to scrape")
+                if journal is not None and not homepage_data:
+                    journal.record_failure(url, str(error) if error else "failed to scrape")
+        finally:
+            if own_session:
+                await session.close()
         
+        # Build the feature entries in the original URL order so saves stay deterministic
+        scraped_data = {}
+        for url in urls:
+            homepage_data = results.get(url)
+            if homepage_data:
+                feature_name, feature = self.feature_entry(url, homepage_data, sitemap_url, lastmods)
+                scraped_data[feature_name] = feature
+        
+        skipped = sum(self.preflight_skips.values())
         print(f"\n📊 Scraping Summary:")
         print(f"   ✅ Successful: {successful_scrapes}/{len(urls)}")
-        print(f"   ❌ Failed: {len(urls) - successful_scrapes}/{len(urls)}")
+        if self.unchanged_urls:
+            print(f"   ♻️ Unchanged (not re-saved): {len(self.unchanged_urls)}/{len(urls)}")
+        if skipped:
+            reasons = ', '.join(f"{reason}: {count}" for reason, count in sorted(self.preflight_skips.items(), key=lambda item: -item[1]))
+            print(f"   ⏭️ Skipped before rendering: {skipped}/{len(urls)} ({reasons})")
+        print(f"   ❌ Failed: {len(urls) - successful_scrapes - skipped}/{len(urls)}")
         
         return scraped_data
     
+    def feature_entry(self, url, homepage_data, sitemap_url=None, lastmods=None):
+        """(feature name, stored feature entry) for a scraped page"""
+        feature = {
+            "url": url,
+            "content": homepage_data["content"],
+            "scraped_at": homepage_data["scraped_at"],
+            "content_length": homepage_data["clean_content_length"],
+            "content_hash": homepage_data["content_hash"],
+            "truncated": homepage_data.get("truncated")
+        }
+        # A sitemap URL that redirects is stored under the sitemap URL, crawled at its target
+        if homepage_data["url"] != url:
+            feature["final_url"] = homepage_data["url"]
+        # Remember where the page came from and its lastmod for the next incremental run
+        if sitemap_url:
+            feature["sitemap_url"] = sitemap_url
+            feature["lastmod"] = (lastmods or {}).get(url)
+        return self.create_feature_name(url), feature
+    
     def create_feature_name(self, url):
         """Create a feature name from URL"""
         path = urlparse(url).path
@@ -180,60 +302,91 @@ class SitemapAnalyzer:
         return feature_name
     
     def save_feature_data(self, company_name, feature_data):
-        """Save feature data to company JSON file"""
+        """Save feature data to the company store"""
         try:
-            company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-            
-            if not company_file.exists():
-                print(f"❌ Company file not found: {company_file}")
+            if not self.store.save_features(company_name, feature_data):
                 return False
-                
-            # Load existing data
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Update features data
-            if 'features' not in data:
-                data['features'] = {}
-            
-            data['features'].update(feature_data)
-            data['last_updated'] = datetime.now().isoformat()
             
-            # Save updated data
-            with open(company_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 Feature data saved to: {company_file}")
+            print(f"💾 Feature data saved to: {self.store.db_path}")
             return True
             
         except Exception as e:
             print(f"❌ Error saving feature data: {e}")
             return False
     
-    async def analyze_and_scrape_sitemap(self, company_name, sitemap_url, keywords=None):
-        """Main method to analyze sitemap and scrape feature pages"""
+    async def analyze_and_scrape_sitemap(self, company_name, sitemap_url, keywords=None, incremental=False):
+        """Main method to analyze sitemap and scrape feature pages
+
+        With incremental=True only new pages and pages whose sitemap lastmod is newer than the
+        stored scrape are fetched, and stored pages missing from the sitemap are marked removed.
+        The run is a crawl job with a journal in data/jobs; resume_job continues it if it stops.
+        """
+        self.journal = CrawlJournal.create(company_name, sitemap_url, keywords, incremental)
+        print(f"📒 Crawl job {self.journal.job_id} (resume with: python main.py resume {self.journal.job_id})")
+        try:
+            return await self.run_sitemap_analysis(company_name, sitemap_url, keywords, incremental)
+        finally:
+            self.finish_run()
+    
+    async def resume_job(self, job_id):
+        """Continue a stopped crawl job: crawl only its URLs that aren't done yet (failed ones are retried)"""
+        journal = CrawlJournal.open(job_id)
+        if journal is None:
+            return False
+        self.journal = journal
+        params = journal.params
+        print(f"\n📒 {journal.summary()}")
+        try:
+            if not journal.frontier:
+                # Stopped before the URLs were chosen: nothing to skip, so run it again from the sitemap
+                print("⚠️ The job stopped before its URLs were selected; starting it again")
+                return await self.run_sitemap_analysis(params["company_name"], params["sitemap_url"], params.get("keywords"), params.get("incremental"))
+            pending = journal.pending_urls()
+            if not pending:
+                print(f"✅ Job {job_id} is already complete")
+                return True
+            print(f"🔁 Resuming: {len(journal.done)} done, {len(pending)} to crawl ({len(journal.failed)} failed before, retrying)")
+            return await self.crawl_frontier(params["company_name"], params["sitemap_url"], pending, journal.lastmods)
+        finally:
+            self.finish_run()
+    
+    def finish_run(self):
+        """Report cache use for the whole run, however it ended"""
+        self.resolver.close()
+        self.cache.save()
+        self.cache.print_summary()
+        if self.journal is not None:
+            self.journal.close()
+            print(f"📒 {self.journal.summary()}")
+    
+    async def run_sitemap_analysis(self, company_name, sitemap_url, keywords=None, incremental=False):
+        """Fetch, filter and categorize the sitemap, then scrape and save the selected pages"""
         print(f"\n🗺️ Analyzing sitemap for: {company_name}")
         print(f"🌐 Sitemap URL: {sitemap_url}")
         if keywords:
             print(f"🔍 Keywords: {keywords}")
+        if incremental:
+            print("🔁 Mode: incremental (new and changed pages only)")
         print("-" * 50)
         
-        # Fetch sitemap
-        sitemap_content = self.fetch_sitemap(sitemap_url)
-        if not sitemap_content:
-            return False
+        stored_features = self.load_stored_features(company_name) if incremental else {}
         
-        # Parse sitemap
-        all_urls = self.parse_sitemap(sitemap_content)
-        if not all_urls:
+        # Stream the sitemap (and nested indexes) straight into the keyword filter. Parsing memory
+        # stays flat, but the matching URLs (and their lastmods) are collected here, because the
+        # category menu and template sampling need the whole list before anything is crawled.
+        # With no keywords that is every URL in the sitemap, so this list grows with it.
+        entries = self.track_stored_urls(self.resolver.stream(sitemap_url), stored_features)
+        filtered_urls = []
+        lastmods = {}
+        async for entry in self.filter_urls_by_keywords(entries, keywords):
+            filtered_urls.append(entry.loc)
+            if entry.lastmod:
+                lastmods[entry.loc] = entry.lastmod
+        if not self.resolver.urls_found:
             print("❌ No URLs found in sitemap")
             return False
         
-        # Filter URLs by keywords
-        if keywords:
-            filtered_urls = self.filter_urls_by_keywords(all_urls, keywords)
-        else:
-            filtered_urls = all_urls
+        self.classifier.print_keyword_summary(len(filtered_urls))
         
         if not filtered_urls:
             print("❌ No URLs match the provided keywords")
@@ -247,6 +400,10 @@ class SitemapAnalyzer:
             if urls:
                 print(f"   {category}: {len(urls)} URLs")
         
+        # Cluster into path templates (/blog/<slug>) so big sections can be sampled
+        templates = cluster_templates(filtered_urls)
+        print_template_summary(templates)
+        
         # Ask user which categories to scrape
         print(f"\n🎯 Which categories would you like to scrape?")
         print("1. All categories")
@@ -257,8 +414,10 @@ class SitemapAnalyzer:
         print("6. FAQ only")
         print("7. API/Documentation only")
         print("8. Custom selection")
+        print("9. Sample N pages per URL template")
+        print("10. Spread a crawl budget across URL templates")
         
-        choice = input("Choose option (1-8): ").strip()
+        choice = input("Choose option (1-10): ").strip()
         
         urls_to_scrape = []
         if choice == "1":
@@ -291,28 +450,78 @@ class SitemapAnalyzer:
             except:
                 print("❌ Invalid selection, scraping all URLs")
                 urls_to_scrape = filtered_urls
+        elif choice == "9":
+            per_template = input("Pages per template (default: 3): ").strip()
+            per_template = int(per_template) if per_template.isdigit() else 3
+            urls_to_scrape = sample_per_template(templates, per_template)
+            print(f"🧩 {per_template} per template → {len(urls_to_scrape)} of {len(filtered_urls)} URLs")
+        elif choice == "10":
+            budget = input("Total pages to crawl (default: 200): ").strip()
+            budget = int(budget) if budget.isdigit() else 200
+            urls_to_scrape = sample_with_budget(templates, budget)
+            print(f"🧩 Budget of {budget} → {len(urls_to_scrape)} of {len(filtered_urls)} URLs across {len(templates)} templates")
         else:
             print("❌ Invalid choice, scraping all URLs")
             urls_to_scrape = filtered_urls
         
+        # Only the selection is needed from here on
+        del categories, templates
+        
         if not urls_to_scrape:
             print("❌ No URLs selected for scraping")
             return False
         
+        if incremental:
+            # A failed child sitemap would make its pages look removed, so only mark removals on a clean resolve
+            if self.resolver.errors:
+                print("⚠️ Some sitemaps failed; not marking missing pages as removed this run")
+            else:
+                self.mark_removed_features(company_name, sitemap_url, self.seen_stored_urls)
+            
+            urls_to_scrape = self.select_changed_urls(urls_to_scrape, lastmods, stored_features)
+            if not urls_to_scrape:
+                print(f"✅ No new or changed pages; stored data for {company_name} is current")
+                return True
+        
+        if self.journal is not None:
+            self.journal.record_frontier(urls_to_scrape, lastmods)
         print(f"\n🚀 Scraping {len(urls_to_scrape)} selected URLs...")
+        return await self.crawl_frontier(company_name, sitemap_url, urls_to_scrape, lastmods)
+    
+    async def crawl_frontier(self, company_name, sitemap_url, urls_to_scrape, lastmods):
+        """Scrape the selected URLs, saving and journaling each page as it completes"""
+        if self.journal is not None:
+            self.journal.start_run()
+        consumer = consumer_key(company_name, 'features')
         
-        # Scrape the selected URLs
-        feature_data = await self.scrape_feature_pages(company_name, urls_to_scrape)
+        def mark_saved(batch):
+            # Only pages that are committed count as processed, so a crash never hides an unsaved page
+            for feature in batch.values():
+                self.cache.mark_processed(feature.get("final_url", feature["url"]), consumer, feature["content_hash"])
+            if self.journal is not None:
+                self.journal.completed([feature["url"] for feature in batch.values()])
         
-        if feature_data:
-            # Save the data
-            success = self.save_feature_data(company_name, feature_data)
-            if success:
-                print(f"✅ Sitemap analysis completed for {company_name}")
-                print(f"📄 Scraped {len(feature_data)} feature pages")
-            else:
-                print(f"❌ Failed to save feature data for {company_name}")
-            return success
+        # Pages are saved in small batches while the crawl runs instead of all at once at the end
+        writer = FeatureWriter(self.store, company_name, on_saved=mark_saved)
+        try:
+            await self.scrape_feature_pages(company_name, urls_to_scrape, writer=writer, sitemap_url=sitemap_url, lastmods=lastmods,
+                                            journal=self.journal)
+        finally:
+            # Everything already scraped is written, even when the crawl was interrupted or failed
+            saved = await writer.close()
+            self.cache.save()
+        
+        if writer.failed:
+            print(f"❌ Failed to save {writer.failed} feature pages for {company_name}")
+            return False
+        if saved:
+            print(f"💾 Feature data saved to: {self.store.db_path}")
+            print(f"✅ Sitemap analysis completed for {company_name}")
+            print(f"📄 Scraped {saved} feature pages")
+            return True
+        elif self.unchanged_urls:
+            print(f"✅ All {len(self.unchanged_urls)} scraped pages are unchanged; stored data is current")
+            return True
         else:
             print(f"❌ No feature data scraped for {company_name}")
             return False
@@ -0,0 +1,274 @@
+"""
+Concurrent, streaming resolver for nested (and gzipped) sitemap indexes
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from itertools import islice
+from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+from utils.http_cache import HttpCache, normalize_url
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+GZIP_MAGIC = b'\x1f\x8b'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PARSE_BATCH_SIZE = 500
+
+# One <url> (or child <sitemap>) record; lastmod is the raw W3C datetime string
+SitemapEntry = namedtuple('SitemapEntry', ['loc', 'lastmod', 'priority'])
+
+def open_sitemap(path):
+    """Open a stored sitemap body, decompressing .xml.gz files on the fly"""
+    stream = open(path, 'rb')
+    if stream.read(2) == GZIP_MAGIC:
+        stream.close()
+        return gzip.open(path, 'rb')
+    stream.seek(0)
+    return stream
+
+def sitemap_tag(tag):
+    """Local name of a sitemap protocol tag, or None for other namespaces (image:loc, xhtml:link...)"""
+    if tag.startswith(SITEMAP_NS):
+        return tag[len(SITEMAP_NS):]
+    return None if tag.startswith('{') else tag
+
+def iter_sitemap_document(stream):
+    """Stream ('page' | 'sitemap', SitemapEntry) records out of one sitemap document
+
+    Finished records are cleared from the tree as we go, so memory stays flat
+    however many URLs the document holds.
+    """
+    root = None
+    fields = {}
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if root is None:
+            root = elem
+            continue
+        if event != 'end':
+            continue
+
+        tag = sitemap_tag(elem.tag)
+        if tag in ('loc', 'lastmod', 'priority'):
+            fields[tag] = (elem.text or '').strip() or None
+        elif tag in ('url', 'sitemap'):
+            if fields.get('loc'):
+                try:
+                    priority = float(fields['priority']) if fields.get('priority') else None
+                except ValueError:
+                    priority = None
+                kind = 'page' if tag == 'url' else 'sitemap'
+                yield kind, SitemapEntry(fields['loc'], fields.get('lastmod'), priority)
+            fields = {}
+            root.clear()
+
+def next_batch(records):
+    """Pull the next batch of parsed records (runs in a worker thread)"""
+    return list(islice(records, PARSE_BATCH_SIZE))
+
+class SitemapResolver:
+    def __init__(self, max_concurrency=8, max_depth=5, timeout=30, cache=None, queue_size=8):
+        self.max_concurrency = max_concurrency
+        self.max_depth = max_depth
+        self.timeout = timeout
+        # At most queue_size parsed batches wait for the consumer before parsing pauses
+        self.queue_size = queue_size
+        self.cache = cache if cache is not None else HttpCache()
+
+        # One pooled keep-alive session shared by every child fetch
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+
+        self.visited = set()
+        self.errors = {}
+        self.sitemaps_fetched = 0
+        self.urls_found = 0
+
+    def download_sitemap(self, sitemap_url, conditional):
+        """Blocking streamed GET into a temp file, run in a worker thread
+
+        Returns (status code, (temp path, body hash, size) or None, headers).
+        """
+        with self.http.get(sitemap_url, headers=conditional, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return 304, None, None
+            response.raise_for_status()
+
+            self.cache.bodies_dir.mkdir(parents=True, exist_ok=True)
+            fd, part_name = tempfile.mkstemp(dir=self.cache.bodies_dir, suffix='.part')
+            hasher = hashlib.sha256()
+            size = 0
+            try:
+                with os.fdopen(fd, 'wb') as part_file:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        hasher.update(chunk)
+                        part_file.write(chunk)
+                        size += len(chunk)
+            except Exception:
+                os.unlink(part_name)
+                raise
+            return response.status_code, (Path(part_name), hasher.hexdigest(), size), response.headers
+
+    async def fetch_sitemap(self, sitemap_url):
+        """Download one sitemap to disk, revalidating against the local copy; returns the body path"""
+        cached_path = self.cache.body_path(sitemap_url)
+        conditional = self.cache.conditional_headers(sitemap_url) if cached_path is not None else {}
+
+        status, download, headers = await asyncio.to_thread(self.download_sitemap, sitemap_url, conditional)
+        self.sitemaps_fetched += 1
+
+        if status == 304:
+            self.cache.record_not_modified()
+            print(f"♻️ Sitemap not modified, using local copy: {sitemap_url}")
+            return cached_path
+
+        part_path, body_hash, size = download
+        if cached_path is not None and cached_path.name == body_hash:
+            self.cache.record_hit()
+        else:
+            self.cache.record_miss()
+        self.cache.update(sitemap_url, headers, body_hash)
+        body_path = self.cache.store_body_file(sitemap_url, part_path, body_hash)
+
+        print(f"📥 Fetched sitemap: {sitemap_url} ({size} bytes)")
+        return body_path
+
+    async def stream(self, sitemap_url):
+        """Yield a SitemapEntry for every page reachable from a sitemap or sitemap index, as it is parsed"""
+        self.visited = set()
+        self.errors = {}
+        self.sitemaps_fetched = 0
+        self.urls_found = 0
+        limit = asyncio.Semaphore(self.max_concurrency)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def walk():
+            try:
+                await self.visit(sitemap_url, 0, limit, queue)
+            except Exception as e:
+                self.errors[sitemap_url] = str(e)
+            await queue.put(None)
+
+        start = time.perf_counter()
+        walker = asyncio.create_task(walk())
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                for entry in batch:
+                    yield entry
+        finally:
+            # The consumer stopped early; don't leave fetches running behind it
+            if not walker.done():
+                walker.cancel()
+                # Let it unwind before returning; wait() absorbs the walker's CancelledError but not ours
+                await asyncio.wait([walker])
+
+        self.report(time.perf_counter() - start)
+
+    async def resolve(self, sitemap_url):
+        """Return every page URL reachable from a sitemap or sitemap index"""
+        return [entry.loc async for entry in self.stream(sitemap_url)]
+
+    def report(self, elapsed):
+        print(f"📊 Found {self.urls_found} URLs in {self.sitemaps_fetched} sitemap(s) ({elapsed:.1f}s)")
+        if self.errors:
+            print(f"⚠️ {len(self.errors)} sitemap(s) failed and were skipped:")
+            for failed_url, error in self.errors.items():
+                print(f"   ❌ {failed_url}: {error}")
+
+    async def visit(self, sitemap_url, depth, limit, queue):
+        """Stream one sitemap's pages into the queue, then its children; a failing child only loses its own URLs"""
+        # Checked and marked before any await, so a self-referencing index can't loop
+        key = normalize_url(sitemap_url)
+        if key in self.visited:
+            return
+        self.visited.add(key)
+
+        if depth > self.max_depth:
+            self.errors[sitemap_url] = f"deeper than max_depth={self.max_depth}"
+            return
+
+        child_sitemaps = []
+        try:
+            async with limit:
+                body_path = await self.fetch_sitemap(sitemap_url)
+
+            stream = open_sitemap(body_path)
+            try:
+                records = iter_sitemap_document(stream)
+                while True:
+                    batch = await asyncio.to_thread(next_batch, records)
+                    if not batch:
+                        break
+                    pages = []
+                    for kind, entry in batch:
+                        if kind == 'sitemap':
+                            child_sitemaps.append(entry.loc)
+                        else:
+                            pages.append(entry)
+                    if pages:
+                        self.urls_found += len(pages)
+                        await queue.put(pages)
+            finally:
+                stream.close()
+        except ET.ParseError as e:
+            self.errors[sitemap_url] = f"XML parse error: {e}"
+        except Exception as e:
+            self.errors[sitemap_url] = str(e)
+
+        # Children resolve concurrently; any found before a parse error are still followed
+        await asyncio.gather(
+            *(self.visit(child_url, depth + 1, limit, queue) for child_url in child_sitemaps)
+        )
+
+    def close(self):
+        self.http.close()
+
+# Memory check function
+def check_streaming_memory(url_counts=(1_000, 10_000, 50_000)):
+    """Peak parser memory for gzipped sitemaps of growing size; should stay flat"""
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in url_counts:
+            path = Path(tmp_dir) / f"sitemap_{count}.xml.gz"
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                for i in range(count):
+                    f.write(f'<url><loc>https://example.com/features/page-{i}</loc>'
+                            f'<lastmod>2024-01-01</lastmod><priority>0.5</priority></url>\n')
+                f.write('</urlset>\n')
+
+            tracemalloc.start()
+            stream = open_sitemap(path)
+            parsed = sum(1 for _ in iter_sitemap_document(stream))
+            stream.close()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            peaks[count] = peak
+            print(f"🧪 {parsed:>7} URLs: peak {peak / 1024:.0f} KB")
+    return peaks
+
+# Test function
+async def test_sitemap_resolver():
+    """Resolve a real nested sitemap index"""
+    resolver = SitemapResolver()
+    urls = await resolver.resolve("https://exa.ai/sitemap.xml")
+    resolver.close()
+    return urls
+
+if __name__ == "__main__":
+    check_streaming_memory()
+    asyncio.run(test_sitemap_resolver())
@@ -0,0 +1,178 @@
+"""
+URL classifier: compiled keyword filter and batched category rules for large sitemaps
+"""
+
+import io
+import random
+import re
+import time
+import numpy as np
+from collections import Counter
+from contextlib import redirect_stdout
+from urllib.parse import urlparse
+
+# Checked in order; the first category with a matching word wins, as before
+CATEGORY_RULES = [
+    ('features', ['feature', 'capability', 'function']),
+    ('products', ['product', 'service', 'solution']),
+    ('pricing', ['pricing', 'price', 'cost', 'plan']),
+    ('customers', ['customer', 'customers', 'case-study', 'case-studies', 'success-story', 'success-stories',
+                   'testimonial', 'testimonials', 'stories', 'client', 'clients']),
+    ('faq', ['faq', 'frequently-asked-questions', 'frequently-asked', 'questions']),
+    ('api', ['api', 'developer', 'docs', 'documentation']),
+    ('documentation', ['doc', 'guide', 'tutorial', 'help']),
+]
+
+def compile_keyword_pattern(keywords):
+    """One alternation regex for the user's keywords, longest first (matched against lowercased URLs)"""
+    words = sorted({kw.lower() for kw in keywords if kw}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+class URLClassifier:
+    def __init__(self, keywords=None, rules=CATEGORY_RULES):
+        self.keywords = list(keywords or [])
+        self.keyword_pattern = compile_keyword_pattern(self.keywords)
+        self.rules = rules
+        self.category_names = [name for name, _ in rules] + ['other']
+        self.word_patterns = [[re.compile(re.escape(word)) for word in words] for _, words in rules]
+        self.keyword_counts = Counter()
+        self.checked = 0
+        self.examples = []
+
+    def matches(self, url):
+        """True if the URL contains any keyword (always True without keywords)"""
+        self.checked += 1
+        if self.keyword_pattern is None:
+            return True
+        match = self.keyword_pattern.search(url.lower())
+        if match is None:
+            return False
+        self.keyword_counts[match.group(0)] += 1
+        if len(self.examples) < 5:
+            self.examples.append(url)
+        return True
+
+    def category_codes(self, urls):
+        """Category index for every URL, computed over the whole batch at once
+
+        The lowercased URLs are joined into one string and each rule word is scanned over it
+        once; match offsets map back to URLs with a binary search. Rules are applied from
+        lowest to highest priority, so the first matching rule wins, as before.
+        """
+        codes = np.full(len(urls), len(self.rules), dtype=np.int16)
+        if not urls:
+            return codes
+
+        lowered = [url.lower() for url in urls]
+        text = '\n'.join(lowered)
+        lengths = np.fromiter((len(url) + 1 for url in lowered), dtype=np.int64, count=len(lowered))
+        starts = np.cumsum(lengths) - lengths
+
+        for index in range(len(self.rules) - 1, -1, -1):
+            for pattern in self.word_patterns[index]:
+                offsets = np.fromiter((match.start() for match in pattern.finditer(text)), dtype=np.int64)
+                codes[np.searchsorted(starts, offsets, side='right') - 1] = index
+        return codes
+
+    def categorize(self, urls):
+        """Bucket URLs into categories, keeping their order within each category"""
+        urls = list(urls)
+        categories = {name: [] for name in self.category_names}
+        buckets = [categories[name] for name in self.category_names]
+        for url, code in zip(urls, self.category_codes(urls).tolist()):
+            buckets[code].append(url)
+        return categories
+
+    def print_keyword_summary(self, matched):
+        """One summary instead of a line per matching URL"""
+        if self.keyword_pattern is None:
+            return
+        print(f"📊 Filtered to {matched} of {self.checked} URLs matching keywords")
+        for keyword, count in self.keyword_counts.most_common():
+            print(f"   🔑 {keyword}: {count} URLs")
+        for url in self.examples:
+            print(f"   ✅ e.g. {url}")
+
+# Original per-URL loops, kept for the benchmark
+def legacy_filter(urls, keywords):
+    keywords_lower = [kw.lower() for kw in keywords]
+    filtered_urls = []
+    for url in urls:
+        url_lower = url.lower()
+        path = urlparse(url).path.lower()
+        for keyword in keywords_lower:
+            if keyword in url_lower or keyword in path:
+                filtered_urls.append(url)
+                print(f"   ✅ Match: {url} (keyword: {keyword})")
+                break
+    return filtered_urls
+
+def legacy_categorize(urls):
+    categories = {name: [] for name, _ in CATEGORY_RULES}
+    categories['other'] = []
+    for url in urls:
+        url_lower = url.lower()
+        for name, words in CATEGORY_RULES:
+            if any(word in url_lower for word in words):
+                categories[name].append(url)
+                break
+        else:
+            categories['other'].append(url)
+    return categories
+
+def synthetic_urls(count, seed=42):
+    """URLs shaped like a large SaaS sitemap"""
+    rng = random.Random(seed)
+    sections = ['blog', 'features', 'product', 'pricing', 'customers', 'docs', 'guides', 'about',
+                'careers', 'integrations', 'solutions', 'help', 'api', 'changelog', 'legal', 'faq']
+    words = ['analytics', 'workflow', 'team', 'security', 'export', 'dashboard', 'billing', 'search',
+             'sync', 'report', 'alerts', 'sso', 'mobile', 'ai', 'data', 'storage']
+    urls = []
+    for i in range(count):
+        slug = '-'.join(rng.sample(words, 3))
+        urls.append(f"https://www.example.com/{rng.choice(sections)}/{slug}-{i}")
+    return urls
+
+# Benchmark function
+def benchmark_classification(count=1_000_000, keywords=('feature', 'pricing', 'api', 'customer')):
+    """Compare the per-URL loops with the compiled classifier on a synthetic sitemap"""
+    urls = synthetic_urls(count)
+    print(f"⏱️ Classifying {len(urls):,} synthetic URLs with keywords {list(keywords)}")
+
+    # Keyword filter; the old per-match prints go to a buffer so the terminal isn't flooded
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        legacy_filtered = legacy_filter(urls, keywords)
+    legacy_filter_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier = URLClassifier(keywords)
+    filtered = [url for url in urls if classifier.matches(url)]
+    filter_elapsed = time.perf_counter() - start
+    assert filtered == legacy_filtered
+
+    # Categorize every URL (the no-keyword case)
+    start = time.perf_counter()
+    legacy_categories = legacy_categorize(urls)
+    legacy_categorize_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    categories = classifier.categorize(urls)
+    categorize_elapsed = time.perf_counter() - start
+    assert categories == legacy_categories
+
+    print(f"🔍 Filter:     {legacy_filter_elapsed:.2f}s → {filter_elapsed:.2f}s "
+          f"({legacy_filter_elapsed / filter_elapsed:.1f}x, {len(filtered):,} matches)")
+    print(f"🗂️ Categorize: {legacy_categorize_elapsed:.2f}s → {categorize_elapsed:.2f}s "
+          f"({legacy_categorize_elapsed / categorize_elapsed:.1f}x, same buckets)")
+    return {
+        "legacy_filter": legacy_filter_elapsed,
+        "filter": filter_elapsed,
+        "legacy_categorize": legacy_categorize_elapsed,
+        "categorize": categorize_elapsed
+    }
+
+if __name__ == "__main__":
+    benchmark_classification()
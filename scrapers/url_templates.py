@@ -0,0 +1,150 @@
+"""
+Cluster sitemap URLs into path templates (/blog/<slug>, /docs/<id>) and sample from them
+"""
+
+import re
+from urllib.parse import urlparse
+
+# Segments that are always variable: numbers, UUIDs, long hex ids, dates
+ID_SEGMENT_PATTERN = re.compile(
+    r'^(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,}|\d{4}-\d{2}(?:-\d{2})?)$',
+    re.IGNORECASE
+)
+
+def split_path(url):
+    """(host, path segments) with id-like segments already replaced by <id>"""
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    return parsed.netloc.lower(), ['<id>' if ID_SEGMENT_PATTERN.match(segment) else segment for segment in segments]
+
+def cluster_templates(urls, min_children=5):
+    """Group URLs by path template, most common template first
+
+    A path position becomes <slug> when the URLs sharing the prefix before it have at least
+    min_children distinct, sparsely populated values there, e.g. /blog/a, /blog/b, ... -> /blog/<slug>.
+    A value only counts if the paths below it collapse too (it's a leaf, or each path below it
+    also exists under another value): /blog holding /blog/a and /blog/b is a section, not a slug.
+    """
+    items = [(url,) + split_path(url) for url in urls]
+    show_host = len({host for _, host, _ in items}) > 1
+
+    clusters = {}
+    # Depth-first over shared prefixes, without recursion so deep paths are fine
+    stack = [(items, [], 0)]
+    while stack:
+        group, prefix, depth = stack.pop()
+        children = {}
+        for url, host, segments in group:
+            if len(segments) == depth:
+                template = '/' + '/'.join(prefix)
+                key = f"{host}{template}" if show_host else template
+                clusters.setdefault(key, []).append(url)
+            else:
+                children.setdefault((host, segments[depth]), []).append((url, host, segments))
+
+        # Many distinct values with only a few URLs each: treat the position as a variable slug.
+        # Values with plenty of URLs underneath (/blog, /docs) are sections and stay literal.
+        thin = {}
+        for (host, segment), child_items in children.items():
+            if segment != '<id>' and len(child_items) < min_children:
+                thin[(host, segment)] = {tuple(segments[depth + 1:]) for _, _, segments in child_items} - {()}
+        # How many thin values each sub-path appears under (/products/a/overview, /products/b/overview)
+        shared_suffixes = {}
+        for (host, segment), suffixes in thin.items():
+            for suffix in suffixes:
+                shared_suffixes[(host, suffix)] = shared_suffixes.get((host, suffix), 0) + 1
+        slug_values = {key for key, suffixes in thin.items()
+                       if all(shared_suffixes[(key[0], suffix)] > 1 for suffix in suffixes)}
+        slugs_by_host = {}
+        for host, segment in slug_values:
+            slugs_by_host[host] = slugs_by_host.get(host, 0) + 1
+        merged = {}
+        for (host, segment), child_items in children.items():
+            if (host, segment) in slug_values and slugs_by_host[host] >= min_children:
+                segment = '<slug>'
+            merged.setdefault((host, segment), []).extend(child_items)
+
+        for (host, segment), child_items in merged.items():
+            stack.append((child_items, prefix + [segment], depth + 1))
+
+    return dict(sorted(clusters.items(), key=lambda item: len(item[1]), reverse=True))
+
+def spread_pick(urls, count):
+    """Pick count URLs evenly spaced through the list (first one included)"""
+    if count <= 0:
+        return []
+    if count >= len(urls):
+        return list(urls)
+    step = len(urls) / count
+    return [urls[int(i * step)] for i in range(count)]
+
+def sample_per_template(clusters, per_template):
+    """Up to per_template representative URLs from every template"""
+    selected = []
+    for urls in clusters.values():
+        selected.extend(spread_pick(urls, per_template))
+    return selected
+
+def sample_with_budget(clusters, budget):
+    """Spread a total crawl budget across templates
+
+    Every template gets a page before any template gets a second one; small templates are
+    crawled in full and their unused share goes to the larger ones.
+    """
+    if budget <= 0:
+        return []
+    # More templates than budget: one page from each of the largest templates
+    if budget < len(clusters):
+        return [urls[0] for urls in list(clusters.values())[:budget]]
+
+    allocation = {}
+    remaining_budget = budget
+    remaining = sorted(clusters.items(), key=lambda item: len(item[1]))
+    while remaining:
+        share = remaining_budget // len(remaining)
+        template, urls = remaining[0]
+        if len(urls) <= share:
+            allocation[template] = len(urls)
+            remaining_budget -= len(urls)
+            remaining.pop(0)
+        else:
+            # Everything left is bigger than its share; hand out the share (plus leftovers to the largest)
+            extra = remaining_budget - share * len(remaining)
+            for index, (template, urls) in enumerate(reversed(remaining)):
+                allocation[template] = share + (1 if index < extra else 0)
+            break
+
+    selected = []
+    for template, urls in clusters.items():
+        selected.extend(spread_pick(urls, allocation.get(template, 0)))
+    return selected
+
+def print_template_summary(clusters, limit=15):
+    """Show the biggest templates and their URL counts"""
+    print(f"\n🧩 URL Templates: {len(clusters)} templates")
+    for template, urls in list(clusters.items())[:limit]:
+        print(f"   {template}: {len(urls)} URLs")
+    if len(clusters) > limit:
+        others = sum(len(urls) for urls in list(clusters.values())[limit:])
+        print(f"   ... {len(clusters) - limit} more templates ({others} URLs)")
+
+# Test function
+def test_url_templates():
+    """Cluster a synthetic 10k-URL sitemap and sample it down"""
+    urls = ["https://example.com/", "https://example.com/pricing", "https://example.com/about"]
+    urls += [f"https://example.com/blog/post-{i}" for i in range(6000)]
+    urls += [f"https://example.com/customers/customer-{i}" for i in range(300)]
+    urls += [f"https://example.com/integrations/app-{i}" for i in range(200)]
+    urls += [f"https://example.com/docs/{i}/setup" for i in range(3497)]
+
+    clusters = cluster_templates(urls)
+    print_template_summary(clusters)
+
+    per_template = sample_per_template(clusters, 3)
+    budgeted = sample_with_budget(clusters, 300)
+    print(f"🎯 3 per template: {len(per_template)} URLs")
+    print(f"🎯 Budget of 300: {len(budgeted)} URLs")
+    return clusters
+
+if __name__ == "__main__":
+    test_url_templates()
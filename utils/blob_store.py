@@ -0,0 +1,231 @@
+"""
+Content-addressed blob store: large text (page content, analysis results) kept once, zlib-compressed
+"""
+
+import hashlib
+import zlib
+from typing import Dict, Optional
+
+# Text shorter than this stays inline in its record
+BLOB_MIN_CHARS = 1024
+COMPRESSION_LEVEL = 6
+
+BLOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class BlobStore:
+    """Text blobs keyed by their SHA-256, in the company database
+
+    The same text saved for two pages or two companies is stored once. Blobs are never updated,
+    only added; collect_garbage drops the ones nothing refers to any more.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.executescript(BLOB_SCHEMA)
+
+    def put(self, text: str) -> str:
+        """Store text (if it isn't already) and return its hash; call inside the caller's transaction"""
+        blob_hash = text_hash(text)
+        if self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (blob_hash,)).fetchone() is None:
+            raw = text.encode('utf-8')
+            compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, size, stored_size, data) VALUES (?, ?, ?, ?)",
+                (blob_hash, len(text), len(compressed), compressed)
+            )
+        return blob_hash
+
+    def get(self, blob_hash: str) -> Optional[str]:
+        row = self.conn.execute("SELECT data FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+        if row is None:
+            print(f"⚠️ Missing blob {blob_hash[:12]}")
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def stats(self) -> Dict[str, int]:
+        row = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()
+        return {"blobs": row[0], "characters": row[1], "stored_bytes": row[2]}
+
+    def collect_garbage(self, referenced_hashes) -> int:
+        """Delete blobs whose hash isn't in referenced_hashes; returns how many were dropped"""
+        referenced = set(referenced_hashes)
+        orphans = [row[0] for row in self.conn.execute("SELECT hash FROM blobs") if row[0] not in referenced]
+        with self.conn:
+            self.conn.executemany("DELETE FROM blobs WHERE hash = ?", [(blob_hash,) for blob_hash in orphans])
+        return len(orphans)
+
+class LazyRecord(dict):
+    """A stored record whose large text fields are fetched from the blob store on first access
+
+    refs maps field -> {'hash', 'size'}. Until a field is read it isn't in the dict, so listing a
+    company's pages never decompresses their content; iterating the record (items, json.dump,
+    dict(record)) loads everything.
+    """
+
+    def __init__(self, data, refs, blobs):
+        super().__init__(data)
+        self._refs = dict(refs)
+        self._blobs = blobs
+
+    def __missing__(self, key):
+        ref = self._refs.pop(key, None)
+        if ref is None:
+            raise KeyError(key)
+        value = self._blobs.get(ref['hash'])
+        dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._refs
+
+    def load_all(self):
+        for key in list(self._refs):
+            self[key]
+        return self
+
+    def __iter__(self):
+        return iter(dict.keys(self.load_all()))
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._refs)
+
+    def keys(self):
+        return dict.keys(self.load_all())
+
+    def items(self):
+        return dict.items(self.load_all())
+
+    def values(self):
+        return dict.values(self.load_all())
+
+    def copy(self):
+        return dict(self.load_all())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.load_all(), other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return dict.__repr__(self.load_all())
+
+    def __setitem__(self, key, value):
+        self._refs.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def pop(self, key, *default):
+        if key in self._refs:
+            self[key]
+        return dict.pop(self, key, *default)
+
+    def text_size(self, key) -> Optional[int]:
+        """Length of a text field without loading it"""
+        if key in self._refs:
+            return self._refs[key]['size']
+        value = dict.get(self, key)
+        return len(value) if isinstance(value, str) else None
+
+    def unloaded_refs(self):
+        """Fields still only held as references (so a re-save can keep them without loading)"""
+        return dict(self._refs)
+
+def split_blobs(record: Dict, fields, blobs: BlobStore, min_chars: Optional[int] = BLOB_MIN_CHARS):
+    """(record without its large text fields, {field: {'hash', 'size'}}) with the text put in the blob store"""
+    if isinstance(record, LazyRecord):
+        refs = record.unloaded_refs()
+        # Only what's already loaded, read straight from the dict so nothing else gets loaded
+        inline = {key: dict.__getitem__(record, key) for key in dict.keys(record)}
+    else:
+        refs = {}
+        inline = dict(record)
+    if min_chars is None:
+        # Blobs disabled: a lazy record being re-saved still has to be written out whole
+        for field, ref in refs.items():
+            inline[field] = blobs.get(ref['hash'])
+        return inline, {}
+    for field in fields:
+        value = inline.get(field)
+        if isinstance(value, str) and len(value) >= min_chars:
+            refs[field] = {'hash': blobs.put(value), 'size': len(value)}
+            del inline[field]
+    return inline, refs
+
+# Benchmark function
+def benchmark_blob_store(pages=300, page_chars=20000, analyses=5, analysis_chars=400000, work_dir=None):
+    """Two companies with overlapping pages: database size and company load time, inline text vs blobs"""
+    import random
+    import time
+    from pathlib import Path
+    from utils.company_store import CompanyStore
+
+    work_dir = Path(work_dir or "/tmp/blob_store_benchmark")
+    work_dir.mkdir(parents=True, exist_ok=True)
+    words = [f"word{i}" for i in range(5000)]
+    random.seed(1)
+
+    def text(chars):
+        out = []
+        size = 0
+        while size < chars:
+            word = random.choice(words)
+            out.append(word)
+            size += len(word) + 1
+        return ' '.join(out)
+
+    feature_pages = {f"page_{i}": {"url": f"https://example.com/features/{i}", "content": text(page_chars)} for i in range(pages)}
+    analysis_results = {f"analysis_{i}": {"result": text(analysis_chars), "timestamp": "2025-01-01T00:00:00"} for i in range(analyses)}
+
+    results = {}
+    for label, min_chars in (("inline", None), ("blobs", BLOB_MIN_CHARS)):
+        db_path = work_dir / f"{label}.db"
+        for stale in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+            stale.unlink(missing_ok=True)
+        store = CompanyStore(db_path, json_dir=work_dir / "none", blob_min_chars=min_chars)
+        # The second company tracks the same pages (resellers, mirrors, re-imports)
+        for name in ("Alpha", "Beta"):
+            store.import_company({"company_name": name, "features": feature_pages, "analysis_results": analysis_results})
+        store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        start = time.perf_counter()
+        for _ in range(5):
+            store.list_companies()
+            data = store.load_company("Alpha")
+            # What view_company_data reads: URLs and analysis names, not the text
+            [feature.get('url') for feature in data['features'].values()]
+            list(data['analysis_results'])
+        load_elapsed = (time.perf_counter() - start) / 5
+
+        start = time.perf_counter()
+        contents = sum(len(feature.get('content', '')) for feature in store.load_company("Alpha")['features'].values())
+        full_elapsed = time.perf_counter() - start
+        assert contents == sum(len(page['content']) for page in feature_pages.values())
+
+        results[label] = {"bytes": db_path.stat().st_size, "load": load_elapsed, "full": full_elapsed}
+        store.close()
+
+    inline, blobs = results["inline"], results["blobs"]
+    print(f"⏱️ 2 companies x {pages} pages of {page_chars:,} characters + {analyses} analyses of {analysis_chars:,}")
+    print(f"🐢 Inline text: {inline['bytes'] / 1e6:.1f} MB, open company {inline['load'] * 1000:.0f} ms, read all content {inline['full'] * 1000:.0f} ms")
+    print(f"⚡ Blob store:  {blobs['bytes'] / 1e6:.1f} MB, open company {blobs['load'] * 1000:.0f} ms, read all content {blobs['full'] * 1000:.0f} ms")
+    print(f"📉 {inline['bytes'] / blobs['bytes']:.1f}x smaller, {inline['load'] / blobs['load']:.1f}x faster to open")
+    return results
+
+if __name__ == "__main__":
+    benchmark_blob_store()
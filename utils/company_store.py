@@ -0,0 +1,646 @@
+"""
+Company store: SQLite (WAL) backend for everything scraped and analysed per company
+"""
+
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.blob_store import BLOB_MIN_CHARS, BlobStore, LazyRecord, split_blobs
+
+DB_PATH = Path("data/companies/companies.db")
+JSON_DIR = Path("data/companies")
+
+# Page kinds in the pages table, and the JSON section each one is exported as
+PAGE_SECTIONS = {'homepage': 'homepage', 'feature': 'features', 'profile_extras': 'profile_extras'}
+# Snapshot tables keep every save; the latest per page is the current value
+SNAPSHOT_SECTIONS = {'pricing_snapshots': 'pricing_data', 'seo_snapshots': 'seo_data'}
+# Page fields big enough to live in the blob store
+PAGE_BLOB_FIELDS = ('content',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    created_at TEXT,
+    last_updated TEXT,
+    extra TEXT,
+    has_homepage INTEGER NOT NULL DEFAULT 0,
+    feature_count INTEGER NOT NULL DEFAULT 0,
+    analysis_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS companies_name ON companies (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS pages (
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    url TEXT,
+    scraped_at TEXT,
+    content_hash TEXT,
+    removed INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    PRIMARY KEY (company_id, kind, page_id)
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (company_id, url);
+CREATE TABLE IF NOT EXISTS pricing_snapshots (
+    id INTEGER PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    page_id TEXT NOT NULL,
+    url TEXT,
+    scraped_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pricing_snapshots_page ON pricing_snapshots (company_id, page_id, id);
+CREATE TABLE IF NOT EXISTS seo_snapshots (
+    id INTEGER PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    page_id TEXT NOT NULL,
+    url TEXT,
+    scraped_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seo_snapshots_page ON seo_snapshots (company_id, page_id, id);
+CREATE TABLE IF NOT EXISTS analyses (
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    result TEXT,
+    timestamp TEXT,
+    result_hash TEXT,
+    result_size INTEGER,
+    PRIMARY KEY (company_id, name)
+);
+CREATE TABLE IF NOT EXISTS json_files (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+# Manifest: per-company summary columns kept current by the database on every insert/delete,
+# so listing companies reads one row each however much is stored
+MANIFEST_VERSION = 1
+MANIFEST_COLUMNS = {
+    'has_homepage': 'INTEGER NOT NULL DEFAULT 0',
+    'feature_count': 'INTEGER NOT NULL DEFAULT 0',
+    'analysis_count': 'INTEGER NOT NULL DEFAULT 0'
+}
+MANIFEST_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS manifest_page_added AFTER INSERT ON pages BEGIN
+    UPDATE companies SET
+        has_homepage = CASE WHEN NEW.kind = 'homepage' THEN 1 ELSE has_homepage END,
+        feature_count = feature_count + (NEW.kind = 'feature')
+    WHERE id = NEW.company_id;
+END;
+CREATE TRIGGER IF NOT EXISTS manifest_page_removed AFTER DELETE ON pages BEGIN
+    UPDATE companies SET
+        has_homepage = CASE WHEN OLD.kind = 'homepage' THEN 0 ELSE has_homepage END,
+        feature_count = feature_count - (OLD.kind = 'feature')
+    WHERE id = OLD.company_id;
+END;
+CREATE TRIGGER IF NOT EXISTS manifest_analysis_added AFTER INSERT ON analyses BEGIN
+    UPDATE companies SET analysis_count = analysis_count + 1 WHERE id = NEW.company_id;
+END;
+CREATE TRIGGER IF NOT EXISTS manifest_analysis_removed AFTER DELETE ON analyses BEGIN
+    UPDATE companies SET analysis_count = analysis_count - 1 WHERE id = OLD.company_id;
+END;
+"""
+
+def company_slug(company_name: str) -> str:
+    """Same key the <company>_data.json file names use"""
+    return company_name.lower().replace(' ', '_')
+
+def to_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+class CompanyStore:
+    """One repository API over the company database
+
+    Saves are row-level upserts (one row per page, snapshot or analysis) in a single transaction,
+    so the cost of a save doesn't grow with the company and two writers touching different pages
+    don't overwrite each other. WAL mode lets readers run while a write is in progress.
+
+    Page content and analysis results of blob_min_chars or more go to the blob store
+    (utils/blob_store.py): stored once however many pages share them, compressed, and only
+    loaded when a record's field is actually read. None keeps all text inline.
+
+    Each company row doubles as its manifest entry (has_homepage, feature_count,
+    analysis_count), kept current by triggers and rebuilt when an older database is opened.
+
+    <company>_data.json files in json_dir are imported when the database is first created;
+    after that only on request (import, or sync for files changed since the store last read or
+    wrote them). Imports merge and never delete what's stored. export_json writes the same
+    shape back out.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, json_dir: Path = JSON_DIR, blob_min_chars: Optional[int] = BLOB_MIN_CHARS):
+        self.db_path = Path(db_path)
+        self.json_dir = Path(json_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.add_missing_columns('analyses', {'result_hash': 'TEXT', 'result_size': 'INTEGER'})
+        self.add_missing_columns('companies', MANIFEST_COLUMNS)
+        self.conn.executescript(MANIFEST_TRIGGERS)
+        self.blobs = BlobStore(self.conn)
+        self.blob_min_chars = blob_min_chars
+
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < MANIFEST_VERSION:
+            self.rebuild_manifest()
+        # Migrate existing JSON files into a brand-new database; an existing one is never re-imported behind the caller's back
+        if is_new and self.json_dir.exists() and any(self.json_dir.glob("*_data.json")):
+            self.import_json_files()
+
+    def close(self):
+        self.conn.close()
+
+    def add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """Bring a database created by an older version up to the current schema"""
+        existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in columns.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        self.conn.commit()
+
+    def page_data(self, page: Dict) -> str:
+        """A page row's JSON, with large text swapped for blob references"""
+        inline, refs = split_blobs(page, PAGE_BLOB_FIELDS, self.blobs, self.blob_min_chars)
+        if refs:
+            inline['_blobs'] = refs
+        return to_json(inline)
+
+    def record(self, data: str) -> Dict:
+        """A stored page from its row JSON; blob-backed fields load on first access"""
+        entry = json.loads(data)
+        refs = entry.pop('_blobs', None)
+        return LazyRecord(entry, refs, self.blobs) if refs else entry
+
+    def analysis_row(self, company_id: int, analysis_name: str, result: Optional[str], timestamp: Optional[str]):
+        if isinstance(result, str) and self.blob_min_chars is not None and len(result) >= self.blob_min_chars:
+            return (company_id, analysis_name, None, timestamp, self.blobs.put(result), len(result))
+        return (company_id, analysis_name, result, timestamp, None, None)
+
+    # Companies
+
+    def company_id(self, company_name: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM companies WHERE slug = ?", (company_slug(company_name),)).fetchone()
+        return row["id"] if row else None
+
+    def company_exists(self, company_name: str) -> bool:
+        return self.company_id(company_name) is not None
+
+    def add_company(self, company_name: str, created_at: Optional[str] = None) -> bool:
+        """Create the company; False if it already exists"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO companies (slug, name, created_at, last_updated) VALUES (?, ?, ?, NULL)",
+                (company_slug(company_name), company_name, created_at or datetime.now().isoformat())
+            )
+        return cursor.rowcount == 1
+
+    def list_companies(self) -> List[Dict]:
+        """Name, dates and counts per company, read from the manifest columns (one row per company)"""
+        rows = self.conn.execute("""
+            SELECT name, created_at, last_updated, has_homepage, feature_count, analysis_count
+            FROM companies ORDER BY name COLLATE NOCASE
+        """).fetchall()
+        return [dict(row) for row in rows]
+
+    def rebuild_manifest(self):
+        """Recount every company's summary columns from the stored rows"""
+        with self.conn:
+            self.conn.execute("""
+                UPDATE companies SET
+                    has_homepage = EXISTS (SELECT 1 FROM pages p WHERE p.company_id = companies.id AND p.kind = 'homepage'),
+                    feature_count = (SELECT COUNT(*) FROM pages p WHERE p.company_id = companies.id AND p.kind = 'feature'),
+                    analysis_count = (SELECT COUNT(*) FROM analyses a WHERE a.company_id = companies.id)
+            """)
+            self.conn.execute(f"PRAGMA user_version = {MANIFEST_VERSION}")
+
+    def require_company(self, company_name: str) -> Optional[int]:
+        company_id = self.company_id(company_name)
+        if company_id is None:
+            print(f"❌ Company not found: {company_name}")
+        return company_id
+
+    def touch(self, company_id: int):
+        self.conn.execute("UPDATE companies SET last_updated = ? WHERE id = ?", (datetime.now().isoformat(), company_id))
+
+    # Writes
+
+    def upsert_pages(self, company_id: int, kind: str, pages: Dict[str, Dict], newer_only: bool = False):
+        """Insert or replace pages; with newer_only a stored page is kept unless the new one was scraped at or after it"""
+        newer = "WHERE pages.scraped_at IS NULL OR excluded.scraped_at >= pages.scraped_at" if newer_only else ""
+        self.conn.executemany(f"""
+            INSERT INTO pages (company_id, kind, page_id, url, scraped_at, content_hash, removed, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (company_id, kind, page_id) DO UPDATE SET
+                url = excluded.url, scraped_at = excluded.scraped_at, content_hash = excluded.content_hash,
+                removed = excluded.removed, data = excluded.data
+            {newer}
+        """, [
+            (company_id, kind, page_id, page.get("url"), page.get("scraped_at"), page.get("content_hash"),
+             1 if page.get("removed") else 0, self.page_data(page))
+            for page_id, page in pages.items()
+        ])
+
+    def save_pages(self, company_name: str, kind: str, pages: Dict[str, Dict]) -> bool:
+        """Upsert page entries of one kind ('homepage', 'feature', 'profile_extras')"""
+        company_id = self.require_company(company_name)
+        if company_id is None:
+            return False
+        with self.conn:
+            self.upsert_pages(company_id, kind, pages)
+            self.touch(company_id)
+        return True
+
+    def save_homepage(self, company_name: str, homepage: Dict) -> bool:
+        return self.save_pages(company_name, 'homepage', {'homepage': homepage})
+
+    def save_features(self, company_name: str, features: Dict[str, Dict]) -> bool:
+        return self.save_pages(company_name, 'feature', features)
+
+    def insert_snapshots(self, company_id: int, table: str, snapshots: Dict[str, Dict], skip_existing: bool = False):
+        """Append snapshots; with skip_existing one already in the history (same page and scraped_at) isn't added again"""
+        rows = [(company_id, page_id, entry.get("url"), entry.get("scraped_at"), to_json(entry)) for page_id, entry in snapshots.items()]
+        if not skip_existing:
+            self.conn.executemany(f"INSERT INTO {table} (company_id, page_id, url, scraped_at, data) VALUES (?, ?, ?, ?, ?)", rows)
+            return
+        self.conn.executemany(f"""
+            INSERT INTO {table} (company_id, page_id, url, scraped_at, data)
+            SELECT :company_id, :page_id, :url, :scraped_at, :data
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} WHERE company_id = :company_id AND page_id = :page_id
+                AND (scraped_at = :scraped_at OR (scraped_at IS NULL AND :scraped_at IS NULL AND data = :data))
+            )
+        """, [dict(zip(("company_id", "page_id", "url", "scraped_at", "data"), row)) for row in rows])
+
+    def save_snapshots(self, company_name: str, table: str, snapshots: Dict[str, Dict]) -> bool:
+        company_id = self.require_company(company_name)
+        if company_id is None:
+            return False
+        with self.conn:
+            self.insert_snapshots(company_id, table, snapshots)
+            self.touch(company_id)
+        return True
+
+    def save_pricing(self, company_name: str, pricing_data: Dict[str, Dict]) -> bool:
+        return self.save_snapshots(company_name, 'pricing_snapshots', pricing_data)
+
+    def save_seo(self, company_name: str, seo_data: Dict[str, Dict]) -> bool:
+        return self.save_snapshots(company_name, 'seo_snapshots', seo_data)
+
+    def save_analysis(self, company_name: str, analysis_name: str, result: str, timestamp: Optional[str] = None) -> bool:
+        company_id = self.require_company(company_name)
+        if company_id is None:
+            return False
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO analyses (company_id, name, result, timestamp, result_hash, result_size) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (company_id, name) DO UPDATE SET
+                    result = excluded.result, timestamp = excluded.timestamp,
+                    result_hash = excluded.result_hash, result_size = excluded.result_size
+            """, self.analysis_row(company_id, analysis_name, result, timestamp or datetime.now().isoformat()))
+            self.touch(company_id)
+        return True
+
+    def save_profile(self, company_name: str, page_id: str, page_kind: str, page: Dict, pricing: Dict, seo: Dict,
+                     extras: Optional[Dict] = None) -> bool:
+        """Page, pricing and SEO entries of one profiled URL in one transaction"""
+        company_id = self.require_company(company_name)
+        if company_id is None:
+            return False
+        with self.conn:
+            self.upsert_pages(company_id, page_kind, {('homepage' if page_kind == 'homepage' else page_id): page})
+            self.insert_snapshots(company_id, 'pricing_snapshots', {page_id: pricing})
+            self.insert_snapshots(company_id, 'seo_snapshots', {page_id: seo})
+            if extras:
+                self.upsert_pages(company_id, 'profile_extras', {page_id: extras})
+            self.touch(company_id)
+        return True
+
+    # Reads
+
+    def pages(self, company_name: str, kind: str) -> Dict[str, Dict]:
+        """page_id -> stored entry for one kind of page"""
+        company_id = self.company_id(company_name)
+        if company_id is None:
+            return {}
+        rows = self.conn.execute(
+            "SELECT page_id, data FROM pages WHERE company_id = ? AND kind = ? ORDER BY rowid", (company_id, kind)
+        ).fetchall()
+        return {row["page_id"]: self.record(row["data"]) for row in rows}
+
+    def features(self, company_name: str) -> Dict[str, Dict]:
+        return self.pages(company_name, 'feature')
+
+    def features_by_url(self, company_name: str) -> Dict[str, Dict]:
+        """URL -> stored feature entry"""
+        return {feature["url"]: feature for feature in self.features(company_name).values() if feature.get("url")}
+
+    def latest_snapshots(self, company_id: int, table: str) -> Dict[str, Dict]:
+        rows = self.conn.execute(f"""
+            SELECT page_id, data FROM {table}
+            WHERE id IN (SELECT MAX(id) FROM {table} WHERE company_id = ? GROUP BY page_id)
+            ORDER BY id
+        """, (company_id,)).fetchall()
+        return {row["page_id"]: json.loads(row["data"]) for row in rows}
+
+    def snapshot_history(self, company_name: str, table: str, page_id: str) -> List[Dict]:
+        """Every saved snapshot of one page, oldest first"""
+        company_id = self.company_id(company_name)
+        if company_id is None:
+            return []
+        rows = self.conn.execute(
+            f"SELECT data FROM {table} WHERE company_id = ? AND page_id = ? ORDER BY id", (company_id, page_id)
+        ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def analyses(self, company_name: str) -> Dict[str, Dict]:
+        company_id = self.company_id(company_name)
+        if company_id is None:
+            return {}
+        rows = self.conn.execute(
+            "SELECT name, result, timestamp, result_hash, result_size FROM analyses WHERE company_id = ? ORDER BY rowid", (company_id,)
+        ).fetchall()
+        analyses = {}
+        for row in rows:
+            if row["result_hash"]:
+                # The result text (up to 128K output tokens) loads only when it's read
+                analyses[row["name"]] = LazyRecord({'timestamp': row["timestamp"]},
+                                                   {'result': {'hash': row["result_hash"], 'size': row["result_size"]}}, self.blobs)
+            else:
+                analyses[row["name"]] = {'result': row["result"], 'timestamp': row["timestamp"]}
+        return analyses
+
+    def load_company(self, company_name: str) -> Optional[Dict]:
+        """Everything stored for a company, in the <company>_data.json shape"""
+        row = self.conn.execute("SELECT * FROM companies WHERE slug = ?", (company_slug(company_name),)).fetchone()
+        if row is None:
+            return None
+
+        data = {
+            "company_name": row["name"],
+            "created_at": row["created_at"],
+            "last_updated": row["last_updated"],
+            "homepage": None,
+            "features": {},
+            "analysis_results": {}
+        }
+        if row["extra"]:
+            data.update(json.loads(row["extra"]))
+
+        page_rows = self.conn.execute(
+            "SELECT kind, page_id, data FROM pages WHERE company_id = ? ORDER BY rowid", (row["id"],)
+        ).fetchall()
+        for page_row in page_rows:
+            entry = self.record(page_row["data"])
+            if page_row["kind"] == 'homepage':
+                data["homepage"] = entry
+            else:
+                data.setdefault(PAGE_SECTIONS[page_row["kind"]], {})[page_row["page_id"]] = entry
+
+        for table, section in SNAPSHOT_SECTIONS.items():
+            snapshots = self.latest_snapshots(row["id"], table)
+            if snapshots:
+                data[section] = snapshots
+
+        data["analysis_results"] = self.analyses(company_name)
+        return data
+
+    # JSON import / export
+
+    def import_company(self, data: Dict) -> bool:
+        """Merge one <company>_data.json document into the store
+
+        Nothing stored is deleted: a page or analysis is only replaced by the file's copy when that
+        is at least as new, and pricing/SEO snapshots the history doesn't hold yet are added to it.
+        An old export, a checkout or a touched file therefore can't roll newer data back.
+        """
+        company_name = data.get("company_name")
+        if not company_name:
+            return False
+
+        known = {"company_name", "created_at", "last_updated", "homepage", "features", "analysis_results",
+                 "profile_extras"} | set(SNAPSHOT_SECTIONS.values())
+        extra = {key: value for key, value in data.items() if key not in known}
+
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO companies (slug, name, created_at, last_updated, extra) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (slug) DO UPDATE SET
+                    created_at = COALESCE(companies.created_at, excluded.created_at),
+                    last_updated = NULLIF(MAX(COALESCE(companies.last_updated, ''), COALESCE(excluded.last_updated, '')), ''),
+                    extra = COALESCE(excluded.extra, companies.extra)
+            """, (company_slug(company_name), company_name, data.get("created_at"), data.get("last_updated"),
+                  to_json(extra) if extra else None))
+            company_id = self.company_id(company_name)
+            if data.get("homepage"):
+                self.upsert_pages(company_id, 'homepage', {'homepage': data["homepage"]}, newer_only=True)
+            self.upsert_pages(company_id, 'feature', data.get("features") or {}, newer_only=True)
+            self.upsert_pages(company_id, 'profile_extras', data.get("profile_extras") or {}, newer_only=True)
+            for table, section in SNAPSHOT_SECTIONS.items():
+                self.insert_snapshots(company_id, table, data.get(section) or {}, skip_existing=True)
+            self.conn.executemany("""
+                INSERT INTO analyses (company_id, name, result, timestamp, result_hash, result_size) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (company_id, name) DO UPDATE SET
+                    result = excluded.result, timestamp = excluded.timestamp,
+                    result_hash = excluded.result_hash, result_size = excluded.result_size
+                WHERE analyses.timestamp IS NULL OR excluded.timestamp >= analyses.timestamp
+            """, [self.analysis_row(company_id, name, entry.get('result'), entry.get('timestamp'))
+                  for name, entry in (data.get("analysis_results") or {}).items()])
+        return True
+
+    def import_json_files(self, json_dir: Optional[Path] = None, files=None) -> int:
+        """Import <company>_data.json files (every one in json_dir unless files is given); the files are left in place"""
+        json_dir = Path(json_dir or self.json_dir)
+        imported = 0
+        for company_file in sorted(files if files is not None else json_dir.glob("*_data.json")):
+            try:
+                with open(company_file, 'r', encoding='utf-8') as f:
+                    if self.import_company(json.load(f)):
+                        imported += 1
+                self.record_json_file(company_file)
+            except Exception as e:
+                print(f"❌ Error importing {company_file}: {e}")
+        print(f"📥 Imported {imported} company JSON files into {self.db_path}")
+        return imported
+
+    def record_json_file(self, company_file: Path):
+        """Remember a JSON file's size and mtime as in sync with the database"""
+        stat = company_file.stat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO json_files (name, mtime_ns, size) VALUES (?, ?, ?)",
+                (company_file.name, stat.st_mtime_ns, stat.st_size)
+            )
+
+    def sync_json_files(self) -> int:
+        """Import (merge) JSON files that are new or changed since last seen (a stat per file, no parsing)"""
+        if not self.json_dir.exists():
+            return 0
+        known = {row["name"]: (row["mtime_ns"], row["size"]) for row in self.conn.execute("SELECT * FROM json_files")}
+        changed = []
+        for company_file in self.json_dir.glob("*_data.json"):
+            stat = company_file.stat()
+            if known.get(company_file.name) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(company_file)
+        if not changed:
+            return 0
+        return self.import_json_files(files=changed)
+
+    def export_json(self, company_name: str, path: Optional[Path] = None) -> Optional[Path]:
+        """Write a company out as <company>_data.json (same shape the scrapers used to write)"""
+        data = self.load_company(company_name)
+        if data is None:
+            print(f"❌ Company not found: {company_name}")
+            return None
+        path = Path(path or self.json_dir / f"{company_slug(company_name)}_data.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Our own export isn't a change for the next sync to pick up
+        if path.parent.resolve() == self.json_dir.resolve():
+            self.record_json_file(path)
+        return path
+
+    def compact(self) -> Dict[str, int]:
+        """Move inline text written before the blob store (or with blobs off) into blobs, then drop unreferenced blobs"""
+        moved = 0
+        with self.conn:
+            rows = self.conn.execute("SELECT rowid, data FROM pages").fetchall()
+            for row in rows:
+                page = json.loads(row["data"])
+                if any(isinstance(page.get(field), str) for field in PAGE_BLOB_FIELDS):
+                    data = self.page_data(page)
+                    if data != row["data"]:
+                        self.conn.execute("UPDATE pages SET data = ? WHERE rowid = ?", (data, row["rowid"]))
+                        moved += 1
+            rows = self.conn.execute("SELECT company_id, name, result, timestamp FROM analyses WHERE result IS NOT NULL").fetchall()
+            for row in rows:
+                new_row = self.analysis_row(row["company_id"], row["name"], row["result"], row["timestamp"])
+                if new_row[4]:
+                    self.conn.execute("UPDATE analyses SET result = NULL, result_hash = ?, result_size = ? WHERE company_id = ? AND name = ?",
+                                      (new_row[4], new_row[5], row["company_id"], row["name"]))
+                    moved += 1
+        dropped = self.blobs.collect_garbage(self.referenced_blobs())
+        return {"moved": moved, "dropped": dropped, **self.blobs.stats()}
+
+    def referenced_blobs(self):
+        """Every blob hash a page or analysis still points at"""
+        hashes = {row[0] for row in self.conn.execute("SELECT result_hash FROM analyses WHERE result_hash IS NOT NULL")}
+        for row in self.conn.execute("SELECT data FROM pages WHERE data LIKE '%\"_blobs\"%'"):
+            hashes.update(ref['hash'] for ref in json.loads(row[0]).get('_blobs', {}).values())
+        return hashes
+
+    def export_all(self, json_dir: Optional[Path] = None) -> List[Path]:
+        json_dir = Path(json_dir or self.json_dir)
+        json_dir.mkdir(parents=True, exist_ok=True)
+        rows = self.conn.execute("SELECT name, slug FROM companies ORDER BY name").fetchall()
+        return [self.export_json(row["name"], json_dir / f"{row['slug']}_data.json") for row in rows]
+
+# Benchmark function
+def benchmark_company_store(pages=500, page_chars=8000, work_dir=Path("/tmp/company_store_benchmark")):
+    """Save pages one at a time: read-modify-write JSON file vs row upserts"""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    company_file = work_dir / "bench_data.json"
+    db_path = work_dir / "bench.db"
+    for stale in (company_file, db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+        stale.unlink(missing_ok=True)
+
+    content = ("Feature description text. " * (page_chars // 26 + 1))[:page_chars]
+    entries = [{f"page_{i}": {"url": f"https://example.com/features/{i}", "content": content,
+                              "scraped_at": datetime.now().isoformat(), "content_length": page_chars}}
+               for i in range(pages)]
+
+    # Old behaviour: every save loads the whole file and rewrites it
+    with open(company_file, 'w', encoding='utf-8') as f:
+        json.dump({"company_name": "Bench", "features": {}}, f)
+    start = time.perf_counter()
+    for entry in entries:
+        with open(company_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['features'].update(entry)
+        data['last_updated'] = datetime.now().isoformat()
+        with open(company_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    json_elapsed = time.perf_counter() - start
+
+    store = CompanyStore(db_path, json_dir=work_dir / "none")
+    store.add_company("Bench")
+    start = time.perf_counter()
+    for entry in entries:
+        store.save_features("Bench", entry)
+    store_elapsed = time.perf_counter() - start
+    assert len(store.features("Bench")) == pages
+    store.close()
+
+    print(f"⏱️ {pages} feature saves of {page_chars:,} characters each")
+    print(f"🐢 JSON read-modify-write: {json_elapsed:.2f}s ({json_elapsed / pages * 1000:.1f} ms per save, growing with the file)")
+    print(f"⚡ SQLite row upserts:     {store_elapsed:.2f}s ({json_elapsed / store_elapsed:.1f}x)")
+    return {"json": json_elapsed, "sqlite": store_elapsed}
+
+# Benchmark function
+def benchmark_company_listing(companies=100, features=100, page_chars=5000, work_dir=Path("/tmp/company_listing_benchmark")):
+    """Option 8's listing: glob and json.load every company file vs reading the manifest"""
+    import shutil
+    shutil.rmtree(work_dir, ignore_errors=True)
+    json_dir = work_dir / "json"
+    json_dir.mkdir(parents=True)
+
+    content = ("Feature description text. " * (page_chars // 26 + 1))[:page_chars]
+    for i in range(companies):
+        data = {"company_name": f"Company {i}", "created_at": datetime.now().isoformat(), "last_updated": None,
+                "homepage": {"url": f"https://company{i}.com", "content": content},
+                "features": {f"page_{j}": {"url": f"https://company{i}.com/{j}", "content": content} for j in range(features)},
+                "analysis_results": {}}
+        with open(json_dir / f"company_{i}_data.json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    store = CompanyStore(work_dir / "bench.db", json_dir=json_dir)
+
+    # Old behaviour: parse every file to print four fields
+    start = time.perf_counter()
+    summaries = []
+    for company_file in json_dir.glob("*_data.json"):
+        with open(company_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        summaries.append((data.get('company_name'), data.get('last_updated'), bool(data.get('homepage')), len(data.get('features', {}))))
+    json_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    listed = store.list_companies()
+    manifest_elapsed = time.perf_counter() - start
+    assert sorted(summary[3] for summary in summaries) == sorted(company['feature_count'] for company in listed)
+    store.close()
+
+    print(f"⏱️ {companies} companies x {features} pages")
+    print(f"🐢 Load every JSON file: {json_elapsed * 1000:.0f} ms")
+    print(f"⚡ Manifest:             {manifest_elapsed * 1000:.1f} ms ({json_elapsed / manifest_elapsed:.0f}x)")
+    return {"json": json_elapsed, "manifest": manifest_elapsed}
+
+if __name__ == "__main__":
+    # python -m utils.company_store [import|sync|export|compact|listing|benchmark]
+    command = sys.argv[1] if len(sys.argv) > 1 else "benchmark"
+    if command == "compact":
+        stats = CompanyStore().compact()
+        print(f"🗜️ Moved {stats['moved']} texts into blobs, dropped {stats['dropped']} unused blobs; "
+              f"{stats['blobs']} blobs, {stats['characters']:,} characters in {stats['stored_bytes']:,} bytes")
+    elif command == "listing":
+        benchmark_company_listing()
+    elif command == "import":
+        CompanyStore().import_json_files()
+    elif command == "sync":
+        CompanyStore().sync_json_files()
+    elif command == "export":
+        for path in CompanyStore().export_all():
+            print(f"📤 {path}")
+    else:
+        benchmark_company_store()
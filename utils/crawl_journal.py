@@ -0,0 +1,186 @@
+"""
+Crawl jobs: an append-only JSONL journal per sitemap crawl, so a stopped crawl can be resumed
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.company_store import company_slug
+
+JOBS_DIR = Path("data/jobs")
+
+class CrawlJournal:
+    """One crawl job: its parameters, URL frontier and the outcome of every URL, as JSONL events
+
+    Events are only ever appended and each line is flushed to disk when written, so a Ctrl-C,
+    outage or browser crash loses at most the line being written (a torn last line is ignored
+    on replay). A URL counts as done once its page is committed to the company store, or it was
+    unchanged or screened out; failed URLs stay pending and are retried on resume.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.job_id = self.path.stem
+        self.params: Dict = {}
+        self.frontier: List[str] = []
+        self.lastmods: Dict[str, str] = {}
+        self.done: Dict[str, str] = {}
+        self.failed: Dict[str, str] = {}
+        self.runs = 0
+        self.file = None
+        if self.path.exists():
+            self.replay()
+
+    @classmethod
+    def create(cls, company_name: str, sitemap_url: str, keywords=None, incremental=False, jobs_dir: Path = JOBS_DIR) -> 'CrawlJournal':
+        jobs_dir = Path(jobs_dir)
+        jobs_dir.mkdir(parents=True, exist_ok=True)
+        job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{company_slug(company_name)}"
+        suffix = 1
+        while (jobs_dir / f"{job_id}.jsonl").exists():
+            suffix += 1
+            job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{company_slug(company_name)}-{suffix}"
+        journal = cls(jobs_dir / f"{job_id}.jsonl")
+        journal.params = {"company_name": company_name, "sitemap_url": sitemap_url, "keywords": keywords, "incremental": incremental}
+        journal.append("job", **journal.params)
+        return journal
+
+    @classmethod
+    def open(cls, job_id: str, jobs_dir: Path = JOBS_DIR) -> Optional['CrawlJournal']:
+        path = Path(jobs_dir) / f"{job_id}.jsonl"
+        if not path.exists():
+            print(f"❌ No crawl job {job_id} in {jobs_dir}")
+            return None
+        return cls(path)
+
+    def replay(self):
+        """Rebuild the job's state from its events"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: everything before it still counts
+                    continue
+                kind = event.pop("event", None)
+                url = event.get("url")
+                if kind == "job":
+                    event.pop("at", None)
+                    self.params = event
+                elif kind == "frontier":
+                    self.frontier = event.get("urls", [])
+                    self.lastmods = event.get("lastmods", {})
+                elif kind == "run":
+                    self.runs += 1
+                elif kind == "done":
+                    self.done[url] = event.get("outcome", "saved")
+                    self.failed.pop(url, None)
+                elif kind == "failed":
+                    self.failed[url] = event.get("error", "")
+
+    def append(self, event: str, **fields):
+        self.write([{"event": event, **fields}])
+
+    def write(self, events: List[Dict]):
+        """Append events and fsync once for the lot"""
+        if self.file is None:
+            torn = False
+            if self.path.exists() and self.path.stat().st_size:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self.file = open(self.path, 'a', encoding='utf-8')
+            if torn:
+                # Start on a fresh line so the next event isn't glued to the torn one
+                self.file.write("\n")
+        at = datetime.now().isoformat()
+        self.file.write("".join(json.dumps({**event, "at": at}, ensure_ascii=False) + "\n" for event in events))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def record_frontier(self, urls: List[str], lastmods: Dict[str, str]):
+        """The URLs this job is to crawl, chosen once; resumes never re-fetch the sitemap"""
+        self.frontier = list(urls)
+        self.lastmods = {url: lastmods[url] for url in self.frontier if url in lastmods}
+        self.append("frontier", urls=self.frontier, lastmods=self.lastmods)
+
+    def start_run(self):
+        self.runs += 1
+        self.append("run", number=self.runs, pending=len(self.pending_urls()))
+
+    def completed(self, urls, outcome: str = "saved"):
+        """Mark one URL or a batch of URLs done"""
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        for url in urls:
+            self.done[url] = outcome
+            self.failed.pop(url, None)
+        self.write([{"event": "done", "url": url, "outcome": outcome} for url in urls])
+
+    def record_failure(self, url: str, error: str):
+        self.failed[url] = error
+        self.append("failed", url=url, error=error)
+
+    def pending_urls(self) -> List[str]:
+        return [url for url in self.frontier if url not in self.done]
+
+    @property
+    def status(self) -> str:
+        if not self.frontier:
+            return "no frontier"
+        return "complete" if not self.pending_urls() else "resumable"
+
+    def summary(self) -> str:
+        return (f"{self.job_id}: {self.params.get('company_name')} {self.params.get('sitemap_url')} — "
+                f"{len(self.done)}/{len(self.frontier)} done, {len(self.failed)} failed, {self.runs} runs ({self.status})")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def list_jobs(jobs_dir: Path = JOBS_DIR, company_name: Optional[str] = None) -> List[CrawlJournal]:
+    """All crawl jobs, newest first (optionally one company's)"""
+    jobs_dir = Path(jobs_dir)
+    if not jobs_dir.exists():
+        return []
+    jobs = [CrawlJournal(path) for path in sorted(jobs_dir.glob("*.jsonl"), reverse=True)]
+    if company_name:
+        jobs = [job for job in jobs if job.params.get("company_name") == company_name]
+    return jobs
+
+# Test function
+def test_crawl_journal(jobs_dir="/tmp/crawl_journal_test"):
+    """Write a job, cut it off mid-line, and check what a resume would crawl"""
+    import shutil
+    shutil.rmtree(jobs_dir, ignore_errors=True)
+    journal = CrawlJournal.create("Acme Corp", "https://acme.com/sitemap.xml", ["docs"], jobs_dir=jobs_dir)
+    urls = [f"https://acme.com/docs/{i}" for i in range(10)]
+    journal.record_frontier(urls, {urls[0]: "2026-01-01"})
+    journal.start_run()
+    journal.completed(urls[:4])
+    journal.completed(urls[4], "unchanged")
+    journal.record_failure(urls[5], "timeout")
+    journal.close()
+    # A crash halfway through writing the next event
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "done", "url": "https://acme.com/do')
+
+    resumed = CrawlJournal.open(journal.job_id, jobs_dir)
+    print(f"📒 {resumed.summary()}")
+    print(f"🔁 Resume would crawl {len(resumed.pending_urls())} URLs, starting at {resumed.pending_urls()[0]}")
+    return resumed.pending_urls() == urls[5:]
+
+if __name__ == "__main__":
+    # python -m utils.crawl_journal [list|test]
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "test":
+        test_crawl_journal()
+    else:
+        jobs = list_jobs()
+        if not jobs:
+            print(f"📭 No crawl jobs in {JOBS_DIR}")
+        for job in jobs:
+            print(f"📒 {job.summary()}")
@@ -0,0 +1,81 @@
+"""
+Process pool for CPU-bound HTML extraction, so parsing doesn't block the crawl's event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from scrapers.content_extractor import extract_content, load_pages
+
+class ExtractionPool:
+    """Run module-level extraction functions in worker processes
+
+    HTML goes in and compact results (dicts, strings) come out. Functions must be importable
+    module-level functions so they can be pickled. workers=0 runs them inline on the event
+    loop, as before.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.executor = None
+        self.tasks_run = 0
+
+    def start(self):
+        """Start the worker processes on first use"""
+        if self.executor is None and self.workers > 0:
+            # spawn, not fork: the crawl process has browser and HTTP threads running
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in a worker and await its result"""
+        self.tasks_run += 1
+        executor = self.start()
+        if executor is None:
+            return fn(*args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            print("⚠️ Extraction pool crashed; extracting in-process from now on")
+            await self.close()
+            self.workers = 0
+            return fn(*args)
+
+    async def close(self):
+        """Stop the workers; waiting for them happens in a thread so the event loop keeps running"""
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+# Benchmark function
+async def benchmark_extraction_pool(page_dir=None, copies=4, workers=None):
+    """Extract every page (copies times over) inline vs in the pool, all submitted at once
+
+    Uses saved pages in page_dir, or synthetic ones; pooled output must match inline output.
+    """
+    pages = list(load_pages(page_dir).values()) * copies
+
+    timings, outputs = {}, {}
+    for label, pool_workers in (("inline", 0), ("pool", workers)):
+        pool = ExtractionPool(pool_workers)
+        pool.start()
+        # Warm the workers up so process start-up isn't counted
+        if pool.executor is not None:
+            await asyncio.gather(*(pool.run(os.getpid) for _ in range(pool.workers)))
+        start = time.perf_counter()
+        outputs[label] = await asyncio.gather(*(pool.run(extract_content, page) for page in pages))
+        timings[label] = time.perf_counter() - start
+        await pool.close()
+
+    assert outputs["pool"] == outputs["inline"], "pooled extraction differs from inline extraction"
+    print(f"⏱️ {len(pages)} pages: inline {timings['inline']:.2f}s, "
+          f"pool of {ExtractionPool(workers).workers} {timings['pool']:.2f}s "
+          f"({timings['inline'] / timings['pool']:.1f}x), same output")
+    return timings
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_extraction_pool())
@@ -0,0 +1,154 @@
+"""
+Local HTTP revalidation cache: ETag/Last-Modified validators and content hashes per URL
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share one cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    # Tracking parameters never change the page, and parameter order doesn't either
+    query_params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if not key.lower().startswith('utm_')]
+    query = urlencode(sorted(query_params))
+
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def content_hash(body: Union[str, bytes]) -> str:
+    """Stable hash of a response body"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
+
+def consumer_key(company_name: str, kind: str) -> str:
+    """Cache consumer id for one kind of extraction saved for one company"""
+    return f"{company_name.lower().replace(' ', '_')}:{kind}"
+
+class HttpCache:
+    def __init__(self, cache_dir: Path = Path("data/cache")):
+        self.cache_dir = cache_dir
+        self.cache_file = cache_dir / "http_cache.json"
+        self.bodies_dir = cache_dir / "bodies"
+        self.entries = self.load()
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+
+    def load(self) -> Dict:
+        """Load cache entries from disk"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable HTTP cache {self.cache_file}: {e}")
+            return {}
+
+    def save(self) -> bool:
+        """Write cache entries to disk"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving HTTP cache: {e}")
+            return False
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.entries.get(normalize_url(url))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a revalidation request"""
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url: str, headers=None, body_hash: Optional[str] = None):
+        """Remember the validators and body hash from a fresh response"""
+        entry = self.entries.setdefault(normalize_url(url), {'processed': {}})
+        if headers is not None:
+            entry['etag'] = headers.get('ETag')
+            entry['last_modified'] = headers.get('Last-Modified')
+        if body_hash:
+            entry['content_hash'] = body_hash
+        entry['fetched_at'] = datetime.now().isoformat()
+
+    def is_processed(self, url: str, consumer: str, body_hash: Optional[str] = None) -> bool:
+        """Has this consumer already extracted and saved this exact content?
+
+        Without a body_hash, checks against the last hash seen for the URL.
+        """
+        entry = self.get(url)
+        if not entry:
+            return False
+        body_hash = body_hash or entry.get('content_hash')
+        return bool(body_hash) and entry.get('processed', {}).get(consumer) == body_hash
+
+    def mark_processed(self, url: str, consumer: str, body_hash: Optional[str]):
+        """Record that a consumer saved the content with this hash"""
+        if not body_hash:
+            return
+        entry = self.entries.setdefault(normalize_url(url), {'processed': {}})
+        entry.setdefault('processed', {})[consumer] = body_hash
+        entry['content_hash'] = body_hash
+
+    def store_body_file(self, url: str, part_path: Path, body_hash: str) -> Path:
+        """Keep a downloaded body so a 304 can be answered locally (used for sitemaps)
+
+        The body is streamed to part_path first and moved into place under its hash.
+        """
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        body_file = self.bodies_dir / body_hash
+        if body_file.exists():
+            part_path.unlink()
+        else:
+            part_path.replace(body_file)
+        entry = self.entries.setdefault(normalize_url(url), {'processed': {}})
+        entry['body_hash'] = body_hash
+        return body_file
+
+    def body_path(self, url: str) -> Optional[Path]:
+        """Where the stored body for a URL lives, if we still have it"""
+        entry = self.get(url)
+        if not entry or not entry.get('body_hash'):
+            return None
+        body_file = self.bodies_dir / entry['body_hash']
+        return body_file if body_file.exists() else None
+
+    def record_not_modified(self):
+        self.hits += 1
+        self.not_modified += 1
+
+    def record_hit(self):
+        self.hits += 1
+
+    def record_miss(self):
+        self.misses += 1
+
+    def print_summary(self):
+        """Report hit/miss counts for this run"""
+        total = self.hits + self.misses
+        if not total:
+            return
+        print(f"\n🗄️ HTTP cache: {self.hits} hits / {self.misses} misses ({self.hits / total:.0%} hit rate)")
+        print(f"   ↩️ 304 Not Modified: {self.not_modified}")
+        print(f"   🟰 Unchanged content hash: {self.hits - self.not_modified}")
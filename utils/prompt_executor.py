@@ -2,16 +2,17 @@
 Prompt executor for running analysis prompts on company data
 """
 
-import json
 import os
 from openai import OpenAI
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
+from utils.company_store import CompanyStore
 
 class PromptExecutor:
     def __init__(self):
         self.data_dir = Path("data/companies")
+        self.store = CompanyStore()
         # Initialize OpenAI client (you'll need to set OPENAI_API_KEY environment variable)
         self.openai_client = None
         try:
@@ -23,16 +24,13 @@ class PromptExecutor:
             print("💡 Set OPENAI_API_KEY environment variable to enable AI analysis with GPT-5-mini")
         
     def load_company_data(self, company_name: str) -> Optional[Dict]:
-        """Load company data from JSON file"""
+        """Load company data from the company store"""
         try:
-            company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
+            data = self.store.load_company(company_name)
             
-            if not company_file.exists():
-                print(f"❌ Company file not found: {company_file}")
+            if data is None:
+                print(f"❌ Company not found: {company_name}")
                 return None
-                
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
             
             return data
             
@@ -43,24 +41,8 @@ class PromptExecutor:
     def save_analysis_result(self, company_name: str, analysis_name: str, result: str) -> bool:
         """Save analysis result to company data and markdown file"""
         try:
-            company_file = self.data_dir / f"{company_name.lower().replace(' ', '_')}_data.json"
-            
-            # Load existing data
-            with open(company_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Add analysis result
-            if 'analysis_results' not in data:
-                data['analysis_results'] = {}
-            
-            data['analysis_results'][analysis_name] = {
-                'result': result,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Save updated data
-            with open(company_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if not self.store.save_analysis(company_name, analysis_name, result):
+                return False
             
             # Save to markdown file
             self.save_to_markdown_report(company_name, analysis_name, result)
@@ -352,20 +334,11 @@ Please provide a comprehensive, detailed analysis based on the user's request. U
     
     def list_analysis_results(self, company_name: str) -> List[str]:
         """List all analysis results for a company"""
-        company_data = self.load_company_data(company_name)
-        if not company_data:
-            return []
-        
-        analysis_results = company_data.get('analysis_results', {})
-        return list(analysis_results.keys())
+        return list(self.store.analyses(company_name))
     
     def get_analysis_result(self, company_name: str, analysis_name: str) -> Optional[str]:
         """Get specific analysis result"""
-        company_data = self.load_company_data(company_name)
-        if not company_data:
-            return None
-        
-        analysis_results = company_data.get('analysis_results', {})
+        analysis_results = self.store.analyses(company_name)
         if analysis_name in analysis_results:
             return analysis_results[analysis_name].get('result', '')
         
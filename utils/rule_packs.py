@@ -0,0 +1,154 @@
+"""
+Keyword rule packs: JSON keyword lists in rules/, compiled once per process into one matcher
+"""
+
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+
+def term_key(text: str) -> str:
+    """Lowercase with whitespace removed, so 'Contact  Sales' and 'contact sales' are one term"""
+    return ''.join(text.lower().split())
+
+def term_regex(term: str) -> str:
+    """Regex source for one lowercase term; a space matches any run of whitespace"""
+    return r'\s*'.join(re.escape(part) for part in term.lower().split())
+
+class RuleMatcher:
+    """Find which terms of which rules occur in a text, in one scan
+
+    rules maps a rule name to its terms. Matching is by case-insensitive substring, like the
+    `keyword in text.lower()` checks it replaces. The scan runs over lowercased text and finds
+    overlapping terms; a term that is a prefix of a longer one ('enterprise' in 'enterprise
+    ready') still counts when the longer one matches.
+    """
+
+    def __init__(self, rules: Dict[str, List[str]]):
+        self.rules = rules
+        self.term_rules = {}
+        for rule, terms in rules.items():
+            for term in terms:
+                rule_names = self.term_rules.setdefault(term_key(term), [])
+                if rule not in rule_names:
+                    rule_names.append(rule)
+
+        sources = {}
+        for rule, terms in rules.items():
+            for term in terms:
+                sources.setdefault(term_key(term), term_regex(term))
+        keys = sorted(sources, key=len, reverse=True)
+        self.term_patterns = {key: re.compile(sources[key]) for key in keys}
+        self.prefix_terms = {key: [other for other in keys if other != key and key.startswith(other)] for key in keys}
+
+        if keys:
+            # Only positions holding a possible first character are worth trying the alternation at
+            first_chars = ''.join(sorted({re.escape(key[0]) for key in keys}))
+            alternation = '|'.join(sources[key] for key in keys)
+            self.pattern = re.compile(rf'(?=[{first_chars}])(?=({alternation}))')
+        else:
+            self.pattern = None
+
+    def scan(self, text: str) -> Dict[str, Dict[str, List[str]]]:
+        """{rule: {term: [matched text, ...]}} for every rule, terms in order of first match"""
+        found = {rule: {} for rule in self.rules}
+        if self.pattern is None or not text:
+            return found
+        text = text.lower()
+        for match in self.pattern.finditer(text):
+            matched = match.group(1)
+            key = term_key(matched)
+            self.record(found, key, matched)
+            for prefix in self.prefix_terms.get(key, ()):
+                prefix_match = self.term_patterns[prefix].match(text, match.start())
+                if prefix_match:
+                    self.record(found, prefix, prefix_match.group(0))
+        return found
+
+    def record(self, found, key, matched):
+        for rule in self.term_rules.get(key, ()):
+            found[rule].setdefault(key, []).append(matched)
+
+def load_rule_pack(name: str, rules_dir: Path = RULES_DIR) -> Dict[str, List[str]]:
+    """The rules of rules/<name>.json: {rule name: [terms]}"""
+    with open(rules_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+        pack = json.load(f)
+    return {rule: [term for term in terms if term.strip()] for rule, terms in pack.get('rules', {}).items()}
+
+@lru_cache(maxsize=None)
+def page_matcher(rules_dir: Path = RULES_DIR) -> RuleMatcher:
+    """One matcher over every pack in rules/, with rules named '<pack>.<rule>' (compiled once per process)"""
+    rules = {}
+    for pack_file in sorted(rules_dir.glob("*.json")):
+        try:
+            for rule, terms in load_rule_pack(pack_file.stem, rules_dir).items():
+                rules[f"{pack_file.stem}.{rule}"] = terms
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"❌ Could not load rule pack {pack_file}: {e}")
+    return RuleMatcher(rules)
+
+def rule_terms(matches, rule):
+    """Distinct terms of one rule that matched"""
+    return list(matches.get(rule, {}))
+
+def rule_texts(matches, rule):
+    """Distinct matched texts of one rule, whitespace collapsed"""
+    texts = []
+    for matched_texts in matches.get(rule, {}).values():
+        for text in matched_texts:
+            text = ' '.join(text.split())
+            if text not in texts:
+                texts.append(text)
+    return texts
+
+# Original checks, kept for the benchmark
+LEGACY_TRUST_SIGNALS = ['security', 'compliance', 'soc2', 'iso', 'gdpr', 'hipaa', 'enterprise', 'certified']
+LEGACY_AVAILABILITY_PATTERNS = [
+    r'(?:available\s*now|ready\s*for\s*deployment|live\s*service)',
+    r'(?:coming\s*soon|beta|preview|early\s*access)',
+    r'(?:contact\s*sales|request\s*demo|schedule\s*call)',
+    r'(?:enterprise\s*ready|production\s*ready|scalable)',
+    r'(?:cloud|saas|on-premise|hybrid|self-hosted)',
+    r'(?:api\s*access|sdk|integration|webhook)',
+    r'(?:white-label|custom\s*deployment|dedicated)',
+    r'(?:contact\s*sales|speak\s*to\s*sales|sales\s*team)',
+    r'(?:request\s*quote|get\s*quote|custom\s*pricing)',
+    r'(?:enterprise\s*contact|business\s*inquiry)'
+]
+
+def legacy_scan(text):
+    text_lower = text.lower()
+    trust_signal_count = sum(1 for signal in LEGACY_TRUST_SIGNALS if signal in text_lower)
+    matches = [re.findall(pattern, text, re.IGNORECASE) for pattern in LEGACY_AVAILABILITY_PATTERNS]
+    return trust_signal_count, matches
+
+# Benchmark function
+def benchmark_rule_packs(page_dir=None, copies=20):
+    """Keyword checks on every saved (or synthetic) page: per-keyword scans vs one compiled scan"""
+    from scrapers.content_extractor import load_pages
+    from scrapers.parsed_page import ParsedPage
+
+    texts = [ParsedPage(html_content).text for html_content in load_pages(page_dir).values()] * copies
+    matcher = page_matcher()
+
+    start = time.perf_counter()
+    legacy_counts = [legacy_scan(text)[0] for text in texts]
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = [len(rule_terms(matcher.scan(text), 'seo.trust_signals')) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    assert counts == legacy_counts
+    characters = sum(len(text) for text in texts)
+    print(f"⏱️ {len(texts)} pages, {characters:,} characters, {len(matcher.term_patterns)} terms")
+    print(f"🐢 Per-keyword scans: {legacy_elapsed:.2f}s")
+    print(f"⚡ One compiled scan: {elapsed:.2f}s ({legacy_elapsed / elapsed:.1f}x, same trust-signal counts)")
+    return {"legacy": legacy_elapsed, "compiled": elapsed}
+
+if __name__ == "__main__":
+    benchmark_rule_packs()
@@ -0,0 +1,116 @@
+"""
+Write-behind persistence: save crawled pages in small batches while the crawl is still running
+"""
+
+import asyncio
+import time
+from utils.company_store import CompanyStore
+
+class FeatureWriter:
+    """Queue finished feature pages and write them to the company store in batches
+
+    add() hands a page over and returns at once, unless max_pending pages are already waiting,
+    in which case the crawl waits for the writer (so memory stays bounded however long the
+    crawl is). A batch is written when it reaches batch_size pages or flush_interval seconds
+    after its first page, in a worker thread with its own database connection. on_saved is
+    called with each committed batch. close() writes whatever is still queued, so an
+    interrupted crawl keeps every page it finished.
+    """
+
+    def __init__(self, store, company_name, batch_size=20, max_pending=100, flush_interval=2.0, on_saved=None):
+        # A second connection to the same WAL database, only ever used from the writer thread
+        self.store = CompanyStore(store.db_path, store.json_dir, store.blob_min_chars)
+        self.company_name = company_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_saved = on_saved
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.saved = 0
+        self.failed = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        return self
+
+    async def add(self, page_id, entry):
+        self.start()
+        await self.queue.put((page_id, entry))
+
+    async def run(self):
+        """Background task: gather batches from the queue and write them"""
+        done = False
+        while not done:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = {item[0]: item[1]}
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch[item[0]] = item[1]
+            await self.write(batch)
+
+    async def write(self, batch):
+        start = time.perf_counter()
+        try:
+            success = await asyncio.to_thread(self.store.save_features, self.company_name, batch)
+        except Exception as e:
+            print(f"❌ Error saving {len(batch)} feature pages: {e}")
+            success = False
+        self.write_seconds += time.perf_counter() - start
+        self.batches += 1
+        if not success:
+            self.failed += len(batch)
+            return
+        self.saved += len(batch)
+        print(f"💾 Saved {len(batch)} pages ({self.saved} so far)")
+        if self.on_saved:
+            self.on_saved(batch)
+
+    async def close(self):
+        """Write everything still queued and stop the writer"""
+        if self.task is not None:
+            await self.queue.put(None)
+            await self.task
+            self.task = None
+        self.store.close()
+        if self.batches:
+            print(f"💾 Write-behind: {self.saved} pages in {self.batches} batches, {self.write_seconds:.2f}s writing"
+                  + (f", {self.failed} failed" if self.failed else ""))
+        return self.saved
+
+# Test function
+async def test_feature_writer(pages=55, db_path="/tmp/write_behind_test.db"):
+    """Feed pages in while the writer flushes batches, then stop halfway through a batch"""
+    from pathlib import Path
+    for stale in (Path(db_path), Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+        stale.unlink(missing_ok=True)
+    store = CompanyStore(db_path, json_dir=Path("/tmp/write_behind_none"))
+    store.add_company("Writer Test")
+
+    writer = FeatureWriter(store, "Writer Test", batch_size=20, max_pending=10, flush_interval=0.5)
+    for i in range(pages):
+        await writer.add(f"page_{i}", {"url": f"https://example.com/{i}", "content": f"Page {i} " * 300})
+        await asyncio.sleep(0.005)
+    saved = await writer.close()
+
+    stored = len(store.features("Writer Test"))
+    print(f"✅ {saved} pages written, {stored} in the store")
+    store.close()
+    return stored == pages
+
+if __name__ == "__main__":
+    asyncio.run(test_feature_writer())